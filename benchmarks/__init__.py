@@ -0,0 +1 @@
+"""Benchmarks for the Epic Events CLI. Run each module with `python -m benchmarks.<name>`."""
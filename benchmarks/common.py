@@ -0,0 +1,61 @@
+"""Helpers shared by the benchmarks."""
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+
+
+def create_database(url: str, clients: int = 100, contracts_per_client: int = 2, events_per_contract: int = 2):
+    """Create the schema at `url` and fill it with simple, deterministic rows.
+
+    Users: 1 Admin, 2 Commercial, 3 Support, 4 Gestion (ids match role ids).
+    """
+    from epic_events.config import Base
+    from epic_events.models import Role, User, Client, Contract, Event
+
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    start = datetime(2025, 1, 1, 9, 0)
+    with engine.begin() as conn:
+        conn.execute(insert(Role), [
+            {"id": 1, "name": "Admin"}, {"id": 2, "name": "Commercial"},
+            {"id": 3, "name": "Support"}, {"id": 4, "name": "Gestion"},
+        ])
+        conn.execute(insert(User), [
+            {"id": role_id, "full_name": f"Bench {name}", "email": f"{name.lower()}@bench.local",
+             "role_id": role_id, "password_hash": "!"}
+            for role_id, name in [(1, "Admin"), (2, "Commercial"), (3, "Support"), (4, "Gestion")]
+        ])
+        conn.execute(insert(Client), [
+            {"id": i, "full_name": f"Client {i}", "email": f"client{i}@bench.local", "phone": "0100000000",
+             "company_name": f"Company {i % 50}", "sales_contact_id": 2}
+            for i in range(1, clients + 1)
+        ])
+        contracts = clients * contracts_per_client
+        conn.execute(insert(Contract), [
+            {"id": i, "client_id": (i - 1) // contracts_per_client + 1, "sales_contact_id": 2,
+             "total_amount": 1000.0 + i, "amount_due": float(i % 100), "signed": i % 3 != 0}
+            for i in range(1, contracts + 1)
+        ])
+        events = contracts * events_per_contract
+        conn.execute(insert(Event), [
+            {"id": i, "contract_id": (i - 1) // events_per_contract + 1,
+             "support_contact_id": 3 if i % 2 else None,
+             "start_date": start + timedelta(hours=3 * i), "end_date": start + timedelta(hours=3 * i + 2),
+             "location": f"City {i % 30}", "attendees": 10 + i % 90, "notes": None}
+            for i in range(1, events + 1)
+        ])
+    engine.dispose()
+    return engine.url
+
+
+def bench_env(home: str, **overrides):
+    """Environment for a CLI subprocess using an isolated HOME and database."""
+    env = dict(
+        os.environ,
+        HOME=home,
+        DATABASE_URL=f"sqlite:///{os.path.join(home, 'bench.db')}",
+        PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    env.update(overrides)
+    return env
@@ -0,0 +1,100 @@
+"""Scheduling conflict detection on a large database.
+
+Builds a temporary SQLite database (by default 100,000 clients and 400,000
+events spread over 200 Support users, 2 to 8 hours long, over two years),
+then times:
+
+    - the `conflicts` audit: streaming every assigned event and sweeping them,
+    - the overlap check `add_event`/`update_event` run before a write,
+    - for comparison, the same audit done as a pairwise self-join in SQL.
+
+Usage:
+    python -m benchmarks.conflicts [--clients 100000] [--support-users 200]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from rich.console import Console
+from rich.table import Table
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import Session
+
+from benchmarks.common import create_database
+
+FIRST_SUPPORT_ID = 100
+SCHEDULE_SQL = """
+UPDATE events SET
+    support_contact_id = CASE WHEN id % 5 = 0 THEN NULL ELSE {first} + (id * 7919) % {users} END,
+    start_date = datetime('2025-01-01', '+' || ((id * 104729) % (730 * 24)) || ' hours'),
+    end_date = datetime('2025-01-01', '+' || ((id * 104729) % (730 * 24) + 2 + id % 7) || ' hours')
+"""
+PAIRWISE_SQL = """
+SELECT count(*) FROM events a JOIN events b
+  ON a.support_contact_id = b.support_contact_id AND a.id < b.id
+ AND a.start_date < b.end_date AND b.start_date < a.end_date
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scheduling conflicts benchmark")
+    parser.add_argument("--clients", type=int, default=100_000, help="Clients (each has 2 contracts with 2 events)")
+    parser.add_argument("--support-users", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=200, help="Overlap checks timed")
+    parser.add_argument("--pairwise", action="store_true", help="Also time the pairwise self-join (slow)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        create_database(url, clients=args.clients)
+
+        from epic_events.models import User
+        from epic_events.scheduling import find_conflicts, find_overlap
+
+        engine = create_engine(url)
+        with engine.begin() as conn:
+            conn.execute(insert(User), [
+                {"id": FIRST_SUPPORT_ID + i, "full_name": f"Support Agent {i}", "email": f"support{i}@bench.local",
+                 "role_id": 3, "password_hash": "!"}
+                for i in range(args.support_users)
+            ])
+            conn.exec_driver_sql(SCHEDULE_SQL.format(first=FIRST_SUPPORT_ID, users=args.support_users))
+            conn.exec_driver_sql("ANALYZE")
+
+        rows = []
+        with Session(engine) as session:
+            assigned = session.execute(text("SELECT count(*) FROM events WHERE support_contact_id IS NOT NULL")).scalar()
+
+            start = time.perf_counter()
+            pairs = sum(1 for _ in find_conflicts(session))
+            rows.append(("conflicts audit (sort and sweep)", f"{(time.perf_counter() - start) * 1000:.0f}", f"{pairs:,} pairs"))
+
+            timings = []
+            for i in range(args.runs):
+                begin = datetime(2025, 1, 1) + timedelta(hours=(i * 37) % (730 * 24))
+                tick = time.perf_counter()
+                find_overlap(session, FIRST_SUPPORT_ID + i % args.support_users, begin, begin + timedelta(hours=4))
+                timings.append((time.perf_counter() - tick) * 1000)
+            rows.append(("overlap check on write (median)", f"{statistics.median(timings):.3f}", f"{args.runs} checks"))
+
+            if args.pairwise:
+                start = time.perf_counter()
+                count = session.execute(text(PAIRWISE_SQL)).scalar()
+                rows.append(("pairwise self-join", f"{(time.perf_counter() - start) * 1000:.0f}", f"{count:,} pairs"))
+        engine.dispose()
+
+    table = Table(title=f"{assigned:,} assigned events, {args.support_users} Support users",
+                  show_header=True, header_style="bold magenta")
+    table.add_column("Operation")
+    table.add_column("Time (ms)", justify="right")
+    table.add_column("Result", justify="right")
+    for row in rows:
+        table.add_row(*row)
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Sequential CLI calls with and without the daemon.
+
+Runs `python -m epic_events list-events --limit 20` the given number of times
+as separate processes, the way a script or cron job would: first with
+forwarding disabled (every call starts Python, imports SQLAlchemy, connects
+and authenticates), then with `serve` running (each call is a thin client
+forwarding to the daemon).
+
+Usage:
+    python -m benchmarks.daemon [--calls 1000]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from rich.console import Console
+from rich.table import Table
+
+from benchmarks.common import bench_env, create_database
+
+COMMAND = [sys.executable, "-m", "epic_events", "list-events", "--limit", "20"]
+
+
+def run_calls(env: dict, calls: int) -> float:
+    """Total seconds for `calls` sequential commands."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        subprocess.run(COMMAND, env=env, stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+def login(env: dict):
+    """Save a token for the bench admin (its password is not usable)."""
+    code = (
+        "from epic_events.auth import create_token, save_token;"
+        "save_token(create_token('admin@bench.local', 'Admin', 1, 1))"
+    )
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)
+
+
+def wait_for_socket(path: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if time.monotonic() > deadline:
+            raise RuntimeError("the daemon did not start")
+        time.sleep(0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Daemon vs in-process CLI calls")
+    parser.add_argument("--calls", type=int, default=1000, help="Sequential list-events calls per mode")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        env = bench_env(home, TELEMETRY="off", SQL_ECHO="0")
+        create_database(env["DATABASE_URL"], clients=500)
+        login(env)
+
+        in_process = run_calls(dict(env, EPIC_EVENTS_NO_DAEMON="1"), args.calls)
+
+        daemon = subprocess.Popen([sys.executable, "-m", "epic_events", "serve"], env=env, stdout=subprocess.DEVNULL)
+        try:
+            wait_for_socket(os.path.join(home, ".epic_events", "daemon.sock"))
+            forwarded = run_calls(env, args.calls)
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+    table = Table(title=f"{args.calls} sequential list-events calls", show_header=True, header_style="bold magenta")
+    table.add_column("Mode")
+    table.add_column("Total (s)", justify="right")
+    table.add_column("Per call (ms)", justify="right")
+    table.add_column("Speedup", justify="right")
+    table.add_row("in-process", f"{in_process:.1f}", f"{in_process / args.calls * 1000:.1f}", "1.0x")
+    table.add_row("daemon", f"{forwarded:.1f}", f"{forwarded / args.calls * 1000:.1f}", f"{in_process / forwarded:.1f}x")
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Per-command latency saved by the identity cache.
+
+Compares resolving the logged-in user the way write commands do
+(get_current_user: token + database query) with the way read-only commands do
+(get_current_identity: token + identity cache). Each iteration starts from a
+fresh connection and an empty in-process memo, like a new CLI process.
+
+Usage:
+    python -m benchmarks.identity [--iterations 500]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from rich.console import Console
+from rich.table import Table
+
+from benchmarks.common import create_database
+
+
+def measure(resolve, engine, session_factory, auth, iterations: int):
+    timings = []
+    for _ in range(iterations):
+        engine.dispose()  # a new process opens a new connection
+        auth._identity_memo = None
+        session = session_factory()
+        start = time.perf_counter()
+        user = resolve(session)
+        timings.append((time.perf_counter() - start) * 1000)
+        session.close()
+        assert user is not None
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Identity cache benchmark")
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        # auth and config read these when imported
+        os.environ.update(HOME=home, DATABASE_URL=f"sqlite:///{os.path.join(home, 'bench.db')}", TELEMETRY="off", SQL_ECHO="0")
+        create_database(os.environ["DATABASE_URL"], clients=10)
+
+        from epic_events import auth
+        from epic_events.config import get_engine, get_session_factory
+        from epic_events.models import User
+
+        engine, session_factory = get_engine(), get_session_factory()
+        with session_factory() as session:
+            user = session.get(User, 1)
+            token = auth.create_token(user.email, user.role.name, user.id, user.role_id)
+            auth.save_token(token)
+            auth.cache_identity(auth.Identity.from_user(user), token)
+
+        database = measure(auth.get_current_user, engine, session_factory, auth, args.iterations)
+        cached = measure(auth.get_current_identity, engine, session_factory, auth, args.iterations)
+
+    table = Table(title=f"Resolving the current user (median of {args.iterations})", show_header=True, header_style="bold magenta")
+    table.add_column("Path")
+    table.add_column("Latency (ms)", justify="right")
+    table.add_column("Queries", justify="right")
+    table.add_row("get_current_user (database)", f"{database:.3f}", "1")
+    table.add_row("get_current_identity (cache)", f"{cached:.3f}", "0")
+    table.add_row("Saved per read-only command", f"{database - cached:.3f}", "1")
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    main()
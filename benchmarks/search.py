@@ -0,0 +1,100 @@
+"""Full-text search latency on a large database.
+
+Builds a temporary SQLite database (by default 250,000 clients and
+1,000,000 events, with notes drawn from a small vocabulary), installs the
+FTS5 search index, then times `search` queries of different selectivity
+against the equivalent LIKE scans.
+
+Usage:
+    python -m benchmarks.search [--clients 250000] [--runs 20]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from rich.console import Console
+from rich.table import Table
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from benchmarks.common import create_database
+
+QUERIES = [
+    ("client name", "Client 123456"),
+    ("rare word in notes", "vegan"),
+    ("common word in notes", "catering"),
+    ("prefix", "proj"),
+    ("two words", "briefing city"),
+]
+
+NOTES_SQL = """
+UPDATE events SET notes = 'Briefing ' || (id % 997) || ' ' || CASE id % 7
+    WHEN 0 THEN 'catering and stage setup'
+    WHEN 1 THEN 'projector rental'
+    WHEN 2 THEN 'VIP guests, parking reserved'
+    WHEN 3 THEN 'live band, catering'
+    WHEN 4 THEN 'shuttle from the station'
+    WHEN 5 THEN 'outdoor, rain plan needed'
+    ELSE CASE WHEN id % 1000 = 6 THEN 'vegan menu' ELSE 'standard menu' END
+END
+"""
+
+
+def median_ms(run, runs: int) -> float:
+    run()
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search benchmark")
+    parser.add_argument("--clients", type=int, default=250_000, help="Clients (each has 2 contracts with 2 events)")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        create_database(url, clients=args.clients)
+
+        from epic_events.search import install_search, find
+
+        engine = create_engine(url)
+        with engine.begin() as conn:
+            conn.exec_driver_sql(NOTES_SQL)
+        start = time.perf_counter()
+        install_search(engine)
+        index_s = time.perf_counter() - start
+
+        with Session(engine) as session:
+            events = session.execute(text("SELECT count(*) FROM events")).scalar()
+            rows = []
+            for name, terms in QUERIES:
+                hits = len(find(session, terms))
+                fts = median_ms(lambda: find(session, terms), args.runs)
+                # What a LIKE '%word%' filter costs: every row is read
+                like = median_ms(lambda: session.execute(
+                    text("SELECT count(*) FROM events WHERE notes LIKE :p OR location LIKE :p"),
+                    {"p": f"%{terms.split()[0]}%"}).all(), max(args.runs // 4, 1))
+                rows.append((name, terms, hits, fts, like))
+        engine.dispose()
+
+    table = Table(title=f"search on {args.clients:,} clients / {events:,} events (index built in {index_s:.1f} s)",
+                  show_header=True, header_style="bold magenta")
+    table.add_column("Query")
+    table.add_column("Terms")
+    table.add_column("Hits", justify="right")
+    table.add_column("FTS5 (ms)", justify="right")
+    table.add_column("LIKE scan (ms)", justify="right")
+    for name, terms, hits, fts, like in rows:
+        table.add_row(name, terms, str(hits), f"{fts:.2f}", f"{like:.2f}")
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    main()
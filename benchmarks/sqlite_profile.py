@@ -0,0 +1,137 @@
+"""Concurrent read/write throughput under each SQLite profile.
+
+For each profile in config.SQLITE_PROFILES, builds a temporary SQLite
+database (by default 20,000 clients and 80,000 events), then runs for a
+few seconds, each in its own process:
+
+    - readers doing what `list-events` does: fetch a page of events,
+    - one writer updating one event per transaction, like `update-event`.
+
+and counts the operations done and those that failed with "database is
+locked".
+
+Usage:
+    python -m benchmarks.sqlite_profile [--clients 20000] [--readers 4] [--seconds 5]
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from rich.console import Console
+from rich.table import Table
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from benchmarks.common import create_database
+
+PAGE = 100
+READ_SQL = text(
+    "SELECT events.id, events.start_date, events.location, users.full_name FROM events "
+    "LEFT JOIN users ON users.id = events.support_contact_id "
+    f"WHERE events.id > :after ORDER BY events.id LIMIT {PAGE}"
+)
+WRITE_SQL = text("UPDATE events SET notes = :notes, attendees = attendees + 1 WHERE id = :id")
+
+
+def _engine(url: str, profile: str):
+    from epic_events.config import apply_sqlite_pragmas, sqlite_pragmas
+
+    engine = create_engine(url)
+    apply_sqlite_pragmas(engine, sqlite_pragmas(profile))
+    return engine
+
+
+def _reader(url, profile, events, start_at, seconds, results):
+    engine = _engine(url, profile)
+    done = locked = 0
+    with engine.connect() as conn:
+        while time.time() < start_at:
+            time.sleep(0.001)
+        while time.time() < start_at + seconds:
+            try:
+                conn.execute(READ_SQL, {"after": (done * 7919) % max(events - PAGE, 1)}).all()
+                conn.rollback()
+                done += 1
+            except OperationalError:
+                conn.rollback()
+                locked += 1
+    engine.dispose()
+    results.put(("read", done, locked))
+
+
+def _writer(url, profile, events, start_at, seconds, results):
+    engine = _engine(url, profile)
+    done = locked = 0
+    with engine.connect() as conn:
+        while time.time() < start_at:
+            time.sleep(0.001)
+        while time.time() < start_at + seconds:
+            try:
+                conn.execute(WRITE_SQL, {"id": (done * 104729) % events + 1, "notes": f"edit {done}"})
+                conn.commit()
+                done += 1
+            except OperationalError:
+                conn.rollback()
+                locked += 1
+    engine.dispose()
+    results.put(("write", done, locked))
+
+
+def run(url: str, profile: str, events: int, readers: int, seconds: float):
+    """(reads/s, writes/s, locked errors) with `readers` readers and one writer."""
+    # Set the journal mode in the file before the workers start
+    engine = _engine(url, profile)
+    engine.connect().close()
+    engine.dispose()
+
+    results = multiprocessing.Queue()
+    start_at = time.time() + 1  # after every process has started
+    processes = [
+        multiprocessing.Process(target=_reader, args=(url, profile, events, start_at, seconds, results))
+        for _ in range(readers)
+    ]
+    processes.append(multiprocessing.Process(target=_writer, args=(url, profile, events, start_at, seconds, results)))
+    for process in processes:
+        process.start()
+    totals = {"read": 0, "write": 0, "locked": 0}
+    for _ in processes:
+        kind, done, locked = results.get()
+        totals[kind] += done
+        totals["locked"] += locked
+    for process in processes:
+        process.join()
+    return totals["read"] / seconds, totals["write"] / seconds, totals["locked"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite profile benchmark")
+    parser.add_argument("--clients", type=int, default=20_000, help="Clients (each has 2 contracts with 2 events)")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent reader processes")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration of each run")
+    args = parser.parse_args()
+
+    from epic_events.config import SQLITE_PROFILES
+
+    rows = []
+    for profile in SQLITE_PROFILES:
+        with tempfile.TemporaryDirectory() as directory:
+            url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+            create_database(url, clients=args.clients)
+            events = args.clients * 4
+            rows.append((profile, *run(url, profile, events, args.readers, args.seconds)))
+
+    table = Table(title=f"{args.readers} readers and 1 writer for {args.seconds:g} s, {args.clients * 4:,} events",
+                  show_header=True, header_style="bold magenta")
+    table.add_column("Profile")
+    table.add_column(f"Pages of {PAGE} read/s", justify="right")
+    table.add_column("Commits/s", justify="right")
+    table.add_column('"database is locked"', justify="right")
+    for profile, reads, writes, locked in rows:
+        table.add_row(profile, f"{reads:,.0f}", f"{writes:,.0f}", f"{locked:,}")
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Cold-start latency of the CLI, per command.
+
+Each command is run in a fresh interpreter with `python -X importtime`, with an
+isolated HOME (not logged in) and an empty SQLite database, so the numbers
+cover interpreter start, imports and argument parsing up to the login check.
+
+Usage:
+    python -m benchmarks.startup [--runs 5] [--json startup.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from rich.console import Console
+from rich.table import Table
+
+COMMANDS = [
+    ["--help"],
+    ["logout"],
+    ["login", "--help"],
+    ["list-clients"],
+    ["list-events"],
+    ["filter-events"],
+    ["export", "clients"],
+]
+
+
+def parse_importtime(stderr: str):
+    """Return (total import µs, [(cumulative µs, module)] for top-level imports)."""
+    top_level = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented below their parent
+        if not name[1:].startswith(" "):
+            top_level.append((int(cumulative), name.strip()))
+    return sum(us for us, _ in top_level), sorted(top_level, reverse=True)
+
+
+def time_command(args, env, runs: int):
+    """Run `python -m epic_events.cli <args>` `runs` times; return timings in ms."""
+    walls, imports, top = [], [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-m", "epic_events.cli", *args],
+            env=env, capture_output=True, text=True
+        )
+        walls.append((time.perf_counter() - start) * 1000)
+        total, top = parse_importtime(proc.stderr)
+        imports.append(total / 1000)
+    return {
+        "command": " ".join(args),
+        "wall_ms": round(statistics.median(walls), 1),
+        "import_ms": round(statistics.median(imports), 1),
+        "top_imports": [name for _, name in top[:3]],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI cold-start latency per command")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per command (median is reported)")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        env = dict(
+            os.environ,
+            HOME=home,
+            DATABASE_URL=f"sqlite:///{os.path.join(home, 'bench.db')}",
+            PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+        results = [time_command(command, env, args.runs) for command in COMMANDS]
+
+    table = Table(title=f"CLI cold start (median of {args.runs})", show_header=True, header_style="bold magenta")
+    table.add_column("Command")
+    table.add_column("Wall (ms)", justify="right")
+    table.add_column("Imports (ms)", justify="right")
+    table.add_column("Heaviest top-level imports")
+    for result in results:
+        table.add_row(result["command"], f"{result['wall_ms']:.1f}", f"{result['import_ms']:.1f}", ", ".join(result["top_imports"]))
+    Console().print(table)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"python": sys.version.split()[0], "runs": args.runs, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""Every main command at several data scales, compared against a baseline.
+
+For each scale, seeds a temporary SQLite database with `epic_events.seeding`
+(10k, 100k or 1M events, with about half as many contracts and a quarter as
+many clients), then measures each operation as an Admin:
+
+    - end to end: `python -m epic_events <command>` in a new process, the way
+      a user runs it (interpreter start, imports, token, query, output),
+    - function level: the crud.py function alone, in a new process, after
+      the imports and the login.
+
+and records the median wall time, the number of SQL statements (SQLProfiler,
+see --profile-sql) and the peak RSS of the process. The lists are limited to
+LIST_LIMIT rows, so the times reflect the queries rather than printing a
+million rows. Each write adds a new event on its own day, or rewrites a
+contract with its current values, so the data stays comparable between runs.
+
+With --baseline, each measure is compared with the same one in that file: a
+measure is a regression when it is more than --tolerance slower or larger,
+or when it runs more statements. The exit status is 1 if there is one.
+
+Usage:
+    python -m benchmarks.suite [--scales 10k,100k,1m] [--repeat 3]
+        [--save-baseline baseline.json] [--baseline baseline.json] [--tolerance 0.25]
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from rich.console import Console
+from rich.table import Table
+from sqlalchemy import create_engine, text
+
+from benchmarks.common import bench_env
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Clients seeded per scale: about 4.2 events per client
+SCALES = {"10k": 2_400, "100k": 24_000, "1m": 240_000}
+ADMIN_EMAIL, ADMIN_PASSWORD = "admin@email.com", "securepassword"
+LIST_LIMIT = 1000
+FILTER_LIMIT = 100
+FILTER_START, FILTER_END = datetime(2025, 6, 1), datetime(2025, 7, 1)
+# New events go on a day of their own after this one, away from the seeded events
+NEW_EVENTS_FROM = datetime(2030, 1, 1, 9, 0)
+# Below this difference, a slower wall time is noise rather than a regression
+NOISE_MS = 5.0
+
+SETUP = (
+    "from init_db import init_database; init_database();"
+    "from epic_events.config import engine; from epic_events.seeding import seed_database;"
+    "seed_database(engine, {clients})"
+)
+
+
+def seed(env: dict, clients: int):
+    """Create the database of `env` with the admin user and `clients` seeded clients."""
+    subprocess.run([sys.executable, "-c", SETUP.format(clients=clients)], env=env, cwd=ROOT,
+                   stdout=subprocess.DEVNULL, check=True)
+
+
+def fixtures(url: str) -> dict:
+    """Ids the write operations work on."""
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        contract = conn.execute(text(
+            "SELECT id, total_amount, amount_due FROM contracts WHERE signed ORDER BY id LIMIT 1"
+        )).one()
+        support_id = conn.execute(text("SELECT min(id) FROM users WHERE role_id = 3")).scalar()
+    engine.dispose()
+    return {
+        "contract_id": contract.id,
+        # Money columns store cents
+        "total_amount": Decimal(contract.total_amount) / 100,
+        "amount_due": Decimal(contract.amount_due) / 100,
+        "support_id": support_id,
+    }
+
+
+def operations(data: dict, day: int) -> dict:
+    """{operation: (CLI arguments, crud call)}; `day` places the new event on a free day."""
+    from epic_events import crud
+
+    start = NEW_EVENTS_FROM + timedelta(days=day)
+    end = start + timedelta(days=1)
+    return {
+        "login": (
+            ["login", ADMIN_EMAIL, ADMIN_PASSWORD],
+            lambda session, user: crud.authenticate_user(session, ADMIN_EMAIL, ADMIN_PASSWORD),
+        ),
+        "list-clients": (
+            ["list-clients", "--limit", str(LIST_LIMIT)],
+            lambda session, user: crud.get_all_clients(session, user, limit=LIST_LIMIT),
+        ),
+        "list-events": (
+            ["list-events", "--limit", str(LIST_LIMIT)],
+            lambda session, user: crud.get_all_events(session, user, limit=LIST_LIMIT),
+        ),
+        "filter-events": (
+            ["filter-events", "--start", f"{FILTER_START:%Y-%m-%d}", "--end", f"{FILTER_END:%Y-%m-%d}",
+             "--limit", str(FILTER_LIMIT)],
+            lambda session, user: crud.filter_events_by_role(
+                session, user, limit=FILTER_LIMIT, start_date=FILTER_START, end_date=FILTER_END),
+        ),
+        "filter-contracts": (
+            ["filter-contracts", "--unsigned", "--limit", str(FILTER_LIMIT)],
+            lambda session, user: crud.filter_contracts(session, user, signed=False, limit=FILTER_LIMIT),
+        ),
+        "add-new-event": (
+            ["add-new-event", "--contract-id", str(data["contract_id"]),
+             "--support-contact-id", str(data["support_id"]),
+             "--start-date", f"{start:%d/%m/%Y}", "--end-date", f"{end:%d/%m/%Y}",
+             "--location", "Benchmark", "--attendees", "50", "--notes", ""],
+            lambda session, user: crud.add_event(
+                session, user, data["contract_id"], data["support_id"], start, end, "Benchmark", 50),
+        ),
+        "update-contract": (
+            ["update-contract", "--contract-id", str(data["contract_id"]),
+             "--total-amount", str(data["total_amount"]), "--amount-due", str(data["amount_due"]), "--signed"],
+            lambda session, user: crud.update_contract(
+                session, user, data["contract_id"], data["total_amount"], data["amount_due"], True),
+        ),
+    }
+
+
+def _check_output(operation: str, output: str):
+    if any(failure in output for failure in ("Error", "Login failed", "Please login first")):
+        raise RuntimeError(f"{operation} failed:\n{output[-2000:]}")
+
+
+def run_command(env: dict, operation: str, args: list, profile_path: str) -> dict:
+    """One end-to-end run of the CLI."""
+    command = [sys.executable, "-m", "epic_events", "--profile-sql-json", profile_path, *args]
+    with tempfile.TemporaryFile("w+") as output:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, env=env, cwd=ROOT, stdout=output, stderr=subprocess.STDOUT)
+        # wait4 rather than wait(): it also returns the resource usage of this process alone
+        _, status, usage = os.wait4(process.pid, 0)
+        wall_ms = (time.perf_counter() - start) * 1000
+        process.returncode = os.waitstatus_to_exitcode(status)
+        output.seek(0)
+        text_output = output.read()
+    if process.returncode:
+        raise RuntimeError(f"{operation} exited with {process.returncode}:\n{text_output[-2000:]}")
+    _check_output(operation, text_output)
+    with open(profile_path) as f:
+        statements = json.loads(f.readlines()[-1])["statements"]
+    return {"wall_ms": wall_ms, "queries": statements, "peak_rss_mb": usage.ru_maxrss / 1024}
+
+
+def _run_function(env: dict, operation: str, data: dict, day: int, results):
+    """Child process of run_function."""
+    os.environ.update(env)  # read by epic_events.config when imported
+    from epic_events.config import SessionLocal
+    from epic_events.models import User
+    from epic_events.profiling import SQLProfiler
+
+    call = operations(data, day)[operation][1]
+    session = SessionLocal()
+    user = session.query(User).filter_by(email=ADMIN_EMAIL).one()
+    output = io.StringIO()
+    profiler = SQLProfiler()
+    profiler.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        call(session, user)
+    wall_ms = (time.perf_counter() - start) * 1000
+    profiler.stop()
+    session.close()
+    results.put((
+        output.getvalue(), wall_ms, sum(row["count"] for row in profiler.summary()),
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    ))
+
+
+def run_function(env: dict, operation: str, data: dict, day: int) -> dict:
+    """One run of the crud.py function, in a new process so its peak RSS is its own."""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_run_function, args=(env, operation, data, day, results))
+    process.start()
+    output, wall_ms, statements, peak_rss_mb = results.get()
+    process.join()
+    _check_output(operation, output)
+    return {"wall_ms": wall_ms, "queries": statements, "peak_rss_mb": peak_rss_mb}
+
+
+def measure(scale: str, repeat: int, console: Console) -> list:
+    """Results of every operation, end to end and function level, at `scale`."""
+    with tempfile.TemporaryDirectory() as home:
+        # A fixed JWT key: otherwise each process draws its own and rejects the token of `login`
+        env = bench_env(home, TELEMETRY="off", SQL_ECHO="0", EPIC_EVENTS_NO_DAEMON="1",
+                        JWT_SECRET_KEY="benchmark-secret")
+        with console.status(f"Seeding {scale} events..."):
+            seed(env, SCALES[scale])
+        data = fixtures(env["DATABASE_URL"])
+        profile_path = os.path.join(home, "profile.jsonl")
+        # login first: the other commands need its token
+        names = list(operations(data, 0))
+        results, day = [], 0
+        for level in ("cli", "function"):
+            for operation in names:
+                runs = []
+                with console.status(f"{scale} {level} {operation}..."):
+                    for _ in range(repeat):
+                        day += 1
+                        if level == "cli":
+                            runs.append(run_command(env, operation, operations(data, day)[operation][0], profile_path))
+                        else:
+                            runs.append(run_function(env, operation, data, day))
+                results.append({
+                    "scale": scale,
+                    "level": level,
+                    "operation": operation,
+                    "wall_ms": round(statistics.median(run["wall_ms"] for run in runs), 1),
+                    "queries": max(run["queries"] for run in runs),
+                    "peak_rss_mb": round(max(run["peak_rss_mb"] for run in runs), 1),
+                })
+    return results
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    """The regressions of `result` against its baseline measure, as text."""
+    regressions = []
+    if result["wall_ms"] > baseline["wall_ms"] * (1 + tolerance) and result["wall_ms"] - baseline["wall_ms"] > NOISE_MS:
+        regressions.append(f"time +{result['wall_ms'] / baseline['wall_ms'] - 1:.0%}")
+    if result["queries"] > baseline["queries"]:
+        regressions.append(f"queries {baseline['queries']} -> {result['queries']}")
+    if result["peak_rss_mb"] > baseline["peak_rss_mb"] * (1 + tolerance):
+        regressions.append(f"RSS +{result['peak_rss_mb'] / baseline['peak_rss_mb'] - 1:.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite of the main commands")
+    parser.add_argument("--scales", default=",".join(SCALES), help=f"Comma-separated scales among {', '.join(SCALES)}")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measure (the median time is kept)")
+    parser.add_argument("--baseline", help="Compare with the results saved in this file")
+    parser.add_argument("--save-baseline", help="Write the results to this file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Slowdown or growth allowed before a regression")
+    args = parser.parse_args()
+
+    scales = [scale.strip().lower() for scale in args.scales.split(",")]
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        parser.error(f"unknown scales: {', '.join(unknown)}")
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {(row["scale"], row["level"], row["operation"]): row for row in json.load(f)["results"]}
+
+    console = Console()
+    results = [result for scale in scales for result in measure(scale, args.repeat, console)]
+
+    table = Table(title=f"Benchmark suite (median of {args.repeat})", show_header=True, header_style="bold magenta")
+    table.add_column("Scale")
+    table.add_column("Level")
+    table.add_column("Operation")
+    table.add_column("Wall (ms)", justify="right")
+    table.add_column("Queries", justify="right")
+    table.add_column("Peak RSS (MB)", justify="right")
+    if baseline:
+        table.add_column("Baseline (ms)", justify="right")
+        table.add_column("Status")
+    regressions = 0
+    for result in results:
+        row = [result["scale"], result["level"], result["operation"], f"{result['wall_ms']:,.1f}",
+               str(result["queries"]), f"{result['peak_rss_mb']:.1f}"]
+        if baseline:
+            base = baseline.get((result["scale"], result["level"], result["operation"]))
+            found = compare(result, base, args.tolerance) if base else []
+            regressions += bool(found)
+            row += [f"{base['wall_ms']:,.1f}" if base else "-",
+                    "[red]" + ", ".join(found) + "[/red]" if found else ("ok" if base else "new")]
+        table.add_row(*row)
+    console.print(table)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"python": sys.version.split()[0], "repeat": args.repeat,
+                       "created_at": datetime.now().isoformat(timespec="seconds"), "results": results}, f, indent=2)
+    if baseline:
+        console.print(f"{regressions} regression(s) against {args.baseline} (tolerance {args.tolerance:.0%})")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
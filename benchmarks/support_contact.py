@@ -0,0 +1,115 @@
+"""Support-scoped event queries: support contact name string vs foreign key.
+
+Builds a temporary SQLite database (by default 100,000 clients and 400,000
+events shared by 50 Support users), adds back the old `support_contact` name
+column, then times what a Support user's commands run: the first page of
+their events and the count of them, filtered on
+
+    - the name, without an index (the original schema),
+    - the name, with a (support_contact, start_date) index,
+    - support_contact_id, with its (support_contact_id, start_date) index,
+      joining users for the name shown in the table.
+
+Usage:
+    python -m benchmarks.support_contact [--clients 100000] [--runs 50]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from rich.console import Console
+from rich.table import Table
+from sqlalchemy import create_engine, insert, text
+
+from benchmarks.common import create_database
+
+SUPPORT_USERS = 50
+FIRST_SUPPORT_ID = 100
+PAGE = 50
+
+LEGACY_SQL = [
+    "ALTER TABLE events ADD COLUMN support_contact VARCHAR",
+    f"UPDATE events SET support_contact_id = CASE WHEN id % 4 = 0 THEN NULL ELSE {FIRST_SUPPORT_ID} + id % {SUPPORT_USERS} END",
+    "UPDATE events SET support_contact = (SELECT full_name FROM users WHERE users.id = events.support_contact_id)",
+]
+
+VARIANTS = {
+    "name, no index": (
+        "SELECT events.id, events.start_date, events.support_contact FROM events "
+        f"WHERE support_contact = :name ORDER BY start_date LIMIT {PAGE}",
+        "SELECT count(*) FROM events WHERE support_contact = :name",
+    ),
+    "name, indexed": (
+        "SELECT events.id, events.start_date, events.support_contact FROM events INDEXED BY ix_legacy_support_start "
+        f"WHERE support_contact = :name ORDER BY start_date LIMIT {PAGE}",
+        "SELECT count(*) FROM events INDEXED BY ix_legacy_support_start WHERE support_contact = :name",
+    ),
+    "support_contact_id, indexed": (
+        "SELECT events.id, events.start_date, users.full_name FROM events "
+        "LEFT JOIN users ON users.id = events.support_contact_id "
+        f"WHERE support_contact_id = :id ORDER BY start_date LIMIT {PAGE}",
+        "SELECT count(*) FROM events WHERE support_contact_id = :id",
+    ),
+}
+
+
+def median_ms(run, runs: int) -> float:
+    run()
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Support contact name vs foreign key benchmark")
+    parser.add_argument("--clients", type=int, default=100_000, help="Clients (each has 2 contracts with 2 events)")
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        create_database(url, clients=args.clients)
+
+        from epic_events.models import User
+
+        engine = create_engine(url)
+        with engine.begin() as conn:
+            conn.execute(insert(User), [
+                {"id": FIRST_SUPPORT_ID + i, "full_name": f"Support Agent {i}", "email": f"support{i}@bench.local",
+                 "role_id": 3, "password_hash": "!"}
+                for i in range(SUPPORT_USERS)
+            ])
+            for statement in LEGACY_SQL:
+                conn.exec_driver_sql(statement)
+            conn.exec_driver_sql("ANALYZE")
+
+        params = {"id": FIRST_SUPPORT_ID + 7, "name": "Support Agent 7"}
+        rows = []
+        with engine.connect() as conn:
+            events = conn.execute(text("SELECT count(*) FROM events")).scalar()
+            own = conn.execute(text(VARIANTS["support_contact_id, indexed"][1]), params).scalar()
+            for name, (page_sql, count_sql) in VARIANTS.items():
+                if name == "name, indexed":
+                    conn.exec_driver_sql("CREATE INDEX ix_legacy_support_start ON events (support_contact, start_date)")
+                page = median_ms(lambda: conn.execute(text(page_sql), params).all(), args.runs)
+                count = median_ms(lambda: conn.execute(text(count_sql), params).scalar(), args.runs)
+                rows.append((name, page, count))
+        engine.dispose()
+
+    table = Table(title=f"One Support user's events ({own:,} of {events:,}), median of {args.runs}",
+                  show_header=True, header_style="bold magenta")
+    table.add_column("Filter")
+    table.add_column(f"First page of {PAGE} (ms)", justify="right")
+    table.add_column("Count (ms)", justify="right")
+    for name, page, count in rows:
+        table.add_row(name, f"{page:.3f}", f"{count:.3f}")
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    main()
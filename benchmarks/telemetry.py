@@ -0,0 +1,95 @@
+"""Per-command overhead of each telemetry level.
+
+Every level runs in its own interpreter (Sentry is process-global) against
+the same temporary SQLite database. A "command" is what list-events does:
+open a session, run the role-scoped events query, close the session, inside
+a Sentry transaction. No DSN is configured, so the cost of sending events
+over the network is not included.
+
+Usage:
+    python -m benchmarks.telemetry [--iterations 300]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from rich.console import Console
+from rich.table import Table
+
+from benchmarks.common import bench_env, create_database
+
+LEVELS = {
+    "off": {"TELEMETRY": "off", "SQL_ECHO": "0"},
+    "errors only": {"TELEMETRY": "on", "SENTRY_TRACES_SAMPLE_RATE": "0", "SENTRY_PROFILES_SAMPLE_RATE": "0", "SQL_ECHO": "0"},
+    "production": {"TELEMETRY": "on", "ENVIRONMENT": "production"},
+    "staging": {"TELEMETRY": "on", "ENVIRONMENT": "staging"},
+    "development": {"TELEMETRY": "on", "ENVIRONMENT": "development", "SQL_ECHO": "0"},
+    "development + SQL echo": {"TELEMETRY": "on", "ENVIRONMENT": "development", "SQL_ECHO": "1"},
+}
+
+
+def worker(iterations: int):
+    """Run the workload in this process and print the timings as JSON."""
+    start = time.perf_counter()
+    from epic_events import telemetry
+    from epic_events.config import get_session_factory
+    from epic_events.crud import build_events_query
+    from epic_events.models import User
+
+    session_factory = get_session_factory()
+    startup_ms = (time.perf_counter() - start) * 1000
+
+    user = User(id=1, full_name="Bench Admin", role_id=1)
+    timings = []
+    for _ in range(iterations):
+        begin = time.perf_counter()
+        with telemetry.start_transaction(op="command", name="list_events"):
+            session = session_factory()
+            build_events_query(session, user).limit(100).all()
+            session.close()
+        timings.append((time.perf_counter() - begin) * 1000)
+
+    print(json.dumps({"startup_ms": startup_ms, "command_ms": statistics.median(timings)}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Telemetry overhead per level")
+    parser.add_argument("--iterations", type=int, default=300, help="Commands per level")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.iterations)
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as home:
+        env = bench_env(home, SENTRY_DSN="")
+        create_database(env["DATABASE_URL"], clients=500)
+        for level, overrides in LEVELS.items():
+            level_env = dict(env, **overrides)
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.telemetry", "--worker", "--iterations", str(args.iterations)],
+                env=level_env, capture_output=True, text=True, check=True
+            )
+            results[level] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    baseline = results["off"]["command_ms"]
+    table = Table(title=f"Telemetry overhead (median of {args.iterations} commands)", show_header=True, header_style="bold magenta")
+    table.add_column("Level")
+    table.add_column("Startup (ms)", justify="right")
+    table.add_column("Per command (ms)", justify="right")
+    table.add_column("Overhead vs off", justify="right")
+    for level, result in results.items():
+        overhead = (result["command_ms"] / baseline - 1) * 100 if baseline else 0
+        table.add_row(level, f"{result['startup_ms']:.1f}", f"{result['command_ms']:.3f}", f"{overhead:+.0f}%")
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""PostgreSQL checks.
+
+Starts a throwaway PostgreSQL server in a temporary data directory (initdb and
+pg_ctl, listening on a Unix socket in that directory only, fsync off), creates
+the schema the way init_db.py does, then runs the crud.py, transfer.py,
+reports.py and scheduling.py functions the commands use against it and checks
+what they wrote and read back:
+
+    - amounts round-trip as exact Decimal,
+    - overlapping events are refused, role scoping and keyset pages hold,
+    - list views and export stream through a server-side cursor,
+    - a connection killed on the server is replaced by the pool (pre-ping),
+    - DB_STATEMENT_TIMEOUT cancels long statements.
+
+The script exits with a non-zero status if any check fails.
+
+Requires the PostgreSQL server binaries on PATH (or in PG_BIN), a non-root
+user (initdb refuses to run as root), and `pip install -r requirements-postgres.txt`.
+
+Usage:
+    python check_postgres.py                      # throwaway server
+    python check_postgres.py --database-url URL   # an existing, empty database
+"""
+import argparse
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from rich.console import Console
+from rich.table import Table
+from sqlalchemy import create_engine, event, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from epic_events import config
+from epic_events.config import Base, engine_options
+from epic_events.crud import (
+    add_client, add_contract, add_event, update_event, create_user,
+    build_events_query, build_contracts_query, get_all_clients, get_all_events,
+    keyset_query, _fetch_page, EVENT_PAGE_KEYS,
+)
+from epic_events.migrations import upgrade_database
+from epic_events.models import Role, User, Client, Contract, Event
+from epic_events.reports import sales_contact_totals_query, monthly_totals_query, support_totals_query
+from epic_events.scheduling import auto_assign, find_conflicts
+from epic_events.scoping import scope
+from epic_events.transfer import export_rows, import_rows
+
+START = datetime(2025, 3, 1, 10, 0)
+
+
+@contextmanager
+def throwaway_server():
+    """URL of a PostgreSQL server running in a temporary directory until the block exits."""
+    bin_dir = os.getenv("PG_BIN", "")
+
+    def tool(name):
+        return os.path.join(bin_dir, name) if bin_dir else name
+
+    if not shutil.which(tool("initdb")):
+        sys.exit("initdb not found: install the PostgreSQL server, or set PG_BIN to its bin directory.")
+
+    quiet = {"stdout": subprocess.DEVNULL, "check": True}
+    with tempfile.TemporaryDirectory(prefix="pg") as directory:
+        data = os.path.join(directory, "data")
+        subprocess.run([tool("initdb"), "-D", data, "-U", "postgres", "-A", "trust", "--no-sync"], **quiet)
+        subprocess.run([
+            tool("pg_ctl"), "-D", data, "-l", os.path.join(directory, "server.log"), "-w",
+            "-o", f"-k {directory} -c listen_addresses='' -F", "start",
+        ], **quiet)
+        try:
+            yield f"postgresql+psycopg2://postgres@/postgres?host={directory}"
+        finally:
+            subprocess.run([tool("pg_ctl"), "-D", data, "-m", "immediate", "-w", "stop"], stdout=subprocess.DEVNULL)
+
+
+def silent(function, *args, **kwargs):
+    """Call a command function, returning what it printed."""
+    out = io.StringIO()
+    with redirect_stdout(out):
+        function(*args, **kwargs)
+    return out.getvalue()
+
+
+def setup(engine):
+    """Schema, roles and users, as init_db.py creates them; return the users by role name."""
+    Base.metadata.create_all(engine)
+    silent(upgrade_database, engine)
+    with Session(engine) as session:
+        session.add_all([Role(id=1, name="Admin"), Role(id=2, name="Commercial"),
+                         Role(id=3, name="Support"), Role(id=4, name="Gestion")])
+        session.commit()
+        for name, role_id in [("Admin", 1), ("Commercial", 2), ("Support", 3), ("Support2", 3), ("Gestion", 4)]:
+            silent(create_user, session, f"Check {name}", f"{name.lower()}@check.local", "password", role_id)
+        return {user.full_name.split()[1]: user.id for user in session.query(User)}
+
+
+def check_write_paths(session, users):
+    admin, commercial, support = (session.get(User, users[name]) for name in ("Admin", "Commercial", "Support"))
+    silent(add_client, session, commercial, "Ada Client", "ada@check.local", "0100000000", "Ada Corp")
+    client = session.query(Client).filter_by(email="ada@check.local").one()
+    silent(add_contract, session, commercial, client.id, Decimal("1234.56"), Decimal("0.10"), signed=True)
+    contract = session.query(Contract).filter_by(client_id=client.id).one()
+    session.expire_all()
+    assert (contract.total_amount, contract.amount_due) == (Decimal("1234.56"), Decimal("0.10")), \
+        f"amounts read back as {contract.total_amount!r}, {contract.amount_due!r}"
+
+    two_hours = timedelta(hours=2)
+    silent(add_event, session, admin, contract.id, support.id, START, START + two_hours, "Paris", 50)
+    refused = silent(add_event, session, admin, contract.id, support.id, START + timedelta(hours=1),
+                     START + timedelta(hours=3), "Lyon", 20)
+    silent(add_event, session, admin, contract.id, support.id, START + two_hours, START + 2 * two_hours, "Nice", 30)
+    silent(add_event, session, admin, contract.id, None, START + 2 * two_hours, START + 3 * two_hours, "Lille", 10)
+    events = session.query(Event).order_by(Event.start_date).all()
+    assert [event.location for event in events] == ["Paris", "Nice", "Lille"], [event.location for event in events]
+    assert "overlaps" in refused.lower() or "already" in refused.lower(), refused
+
+    silent(update_event, session, support, events[1].id, start_date=START + timedelta(hours=1))
+    session.refresh(events[1])
+    assert events[1].start_date == START + two_hours, "an overlapping reschedule was accepted"
+    silent(update_event, session, support, events[1].id, location="Marseille")
+    session.refresh(events[1])
+    assert events[1].location == "Marseille"
+    return f"{len(events)} events, amounts {contract.total_amount} / {contract.amount_due}"
+
+
+def check_scoped_reads(session, users):
+    commercial, support, gestion = (session.get(User, users[name]) for name in ("Commercial", "Support", "Gestion"))
+    support2 = session.get(User, users["Support2"])
+    assert build_events_query(session, support).count() == 2
+    assert build_events_query(session, support2).count() == 0
+    assert build_events_query(session, commercial).count() == 3
+    assert build_contracts_query(session, commercial).count() == 1
+    assert scope(session.query(Client), support2, Client).count() == 0
+    assert build_events_query(session, gestion).count() == 1  # Gestion: unassigned events
+
+    first, cursor = _fetch_page(build_events_query(session, commercial), EVENT_PAGE_KEYS, limit=2)
+    rest, last_cursor = _fetch_page(build_events_query(session, commercial), EVENT_PAGE_KEYS, limit=2, after=cursor)
+    pages = [event.location for event in first + rest]
+    assert pages == [event.location for event in keyset_query(build_events_query(session, commercial), EVENT_PAGE_KEYS)]
+    assert last_cursor is None and len(pages) == 3, pages
+    return "role predicates and keyset pages"
+
+
+def check_server_side_cursors(session, users):
+    admin = session.get(User, users["Admin"])
+    named = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            named.append(getattr(cursor, "name", None) is not None)
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        silent(get_all_events, session, admin)
+        events_view = any(named)
+        named.clear()
+        silent(get_all_clients, session, admin)
+        clients_view = any(named)
+        named.clear()
+        rows = export_rows(session, admin, "events", io.StringIO())
+        export = any(named)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert events_view and clients_view, "list views used a client-side cursor"
+    assert export and rows == 3, f"export used a client-side cursor or wrote {rows} rows"
+    return "list-events, list-clients, export"
+
+
+def check_import(session, users):
+    commercial = session.get(User, users["Commercial"])
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "clients.csv")
+        with open(path, "w") as file:
+            file.write("full_name,email,phone,company_name\n")
+            file.write("Bob Client,bob@check.local,0200000000,Bob Corp\n")
+            file.write("Ada Again,ada@check.local,0300000000,Ada Corp\n")  # duplicate email
+        result = None
+        with redirect_stdout(io.StringIO()):
+            result = import_rows(session, commercial, "clients", path, rejects_path=os.path.join(directory, "rejects"))
+    assert result == (1, 1), f"import returned {result}"
+    return "1 imported, 1 rejected"
+
+
+def check_reports(session, users):
+    admin = session.get(User, users["Admin"])
+    totals = session.execute(sales_contact_totals_query(session, admin)).all()
+    assert len(totals) == 1 and totals[0].total_amount == Decimal("1234.56"), totals
+    months = session.execute(monthly_totals_query(session, admin)).all()
+    assert len(months) == 1, months
+    support = session.execute(support_totals_query(session, admin)).all()
+    assert sorted(row.events for row in support) == [1, 2], support
+    return f"month {months[0][0]}"
+
+
+def check_scheduling(session, users):
+    admin = session.get(User, users["Admin"])
+    assert not list(find_conflicts(session))
+    silent(auto_assign, session, admin, since=START - timedelta(days=1))
+    assert session.scalar(select(Event.id).where(Event.support_contact_id == None)) is None, "event left unassigned"
+    assert not list(find_conflicts(session)), "auto-assign created a conflict"
+
+    # A conflict written behind the application's back is found by the audit
+    session.execute(text("UPDATE events SET support_contact_id = :id"), {"id": users["Support"]})
+    session.execute(text("UPDATE events SET start_date = :start"), {"start": START})
+    pairs = len(list(find_conflicts(session)))
+    session.rollback()
+    assert pairs == 3, f"{pairs} conflicting pairs instead of 3"
+    return "auto-assign, conflicts audit"
+
+
+def check_pre_ping(session, users):
+    engine = session.get_bind()
+    first, second = engine.connect(), engine.connect()
+    pid = first.exec_driver_sql("SELECT pg_backend_pid()").scalar()
+    first.close()
+    second.exec_driver_sql(f"SELECT pg_terminate_backend({pid})")
+    second.close()
+    # Both pooled connections are checked out again, the killed one included
+    first, second = engine.connect(), engine.connect()
+    assert first.exec_driver_sql("SELECT 1").scalar() == second.exec_driver_sql("SELECT 1").scalar() == 1
+    first.close()
+    second.close()
+    return f"backend {pid} killed and replaced"
+
+
+def check_statement_timeout(session, users):
+    url = session.get_bind().url
+    timeout, config.DB_STATEMENT_TIMEOUT = config.DB_STATEMENT_TIMEOUT, 100
+    try:
+        engine = create_engine(url, **engine_options(url.render_as_string(hide_password=False)))
+    finally:
+        config.DB_STATEMENT_TIMEOUT = timeout
+    try:
+        with engine.connect() as conn:
+            conn.exec_driver_sql("SELECT pg_sleep(1)")
+        raise AssertionError("a 1 s statement ran with DB_STATEMENT_TIMEOUT=100")
+    except DBAPIError as e:
+        assert "statement timeout" in str(e), str(e)
+    finally:
+        engine.dispose()
+    return "cancelled after 100 ms"
+
+
+CHECKS = [
+    ("write paths", check_write_paths),
+    ("scoped reads", check_scoped_reads),
+    ("server-side cursors", check_server_side_cursors),
+    ("import", check_import),
+    ("reports", check_reports),
+    ("scheduling", check_scheduling),
+    ("pool pre-ping", check_pre_ping),
+    ("statement timeout", check_statement_timeout),
+]
+
+
+def run_checks(url):
+    """Run every check against the empty database at `url`; return (name, detail, ok) results."""
+    engine = create_engine(url, **engine_options(url))
+    users = setup(engine)
+    results = []
+    with Session(engine) as session:
+        for name, check in CHECKS:
+            try:
+                results.append((name, check(session, users), True))
+            except Exception as e:
+                session.rollback()
+                results.append((name, f"{type(e).__name__}: {e}", False))
+    engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="Existing, empty PostgreSQL database (default: a throwaway server)")
+    args = parser.parse_args()
+
+    if args.database_url:
+        results = run_checks(args.database_url)
+    else:
+        with throwaway_server() as url:
+            results = run_checks(url)
+
+    table = Table(title="PostgreSQL checks", show_header=True, header_style="bold magenta")
+    table.add_column("Check")
+    table.add_column("Result")
+    table.add_column("Status")
+    for name, detail, ok in results:
+        table.add_row(name, detail, "[green]ok[/green]" if ok else "[red]FAILED[/red]")
+    Console().print(table)
+    return 0 if all(ok for _, _, ok in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""Query regression checks.
+
+Runs `EXPLAIN QUERY PLAN` for every role-scoped filter built in crud.py and
+fails if one of them falls back to a full table scan, e.g. after an index was
+dropped from models.py or a filter was rewritten so it can no longer use one.
+
+Also runs every list view against a small and a larger database and fails if
+the number of SQL statements differs, i.e. if a view lazy-loads related rows
+one by one (N+1) instead of eager loading them.
+
+Usage:
+    python check_queries.py                      # fresh in-memory schema
+    python check_queries.py --database-url URL   # an existing SQLite database
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from datetime import datetime
+
+from rich.console import Console
+from rich.table import Table
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from benchmarks.common import create_database
+from epic_events.config import Base
+from epic_events.crud import (
+    build_events_query, build_contracts_query, build_unsigned_contracts_query,
+    keyset_query, encode_cursor, EVENT_PAGE_KEYS, CONTRACT_PAGE_KEYS,
+    get_all_clients, get_all_contracts, get_all_events,
+    filter_events_by_role, filter_contracts_by_role, filter_contracts,
+)
+from epic_events.models import Client, Contract, Event, User
+from epic_events.scoping import scope
+from epic_events.profiling import SQLProfiler
+
+# Users are only read for their id/role/name, so they don't need to exist
+ADMIN = User(id=1, full_name="Check Admin", role_id=1)
+COMMERCIAL = User(id=2, full_name="Check Commercial", role_id=2)
+SUPPORT = User(id=3, full_name="Check Support", role_id=3)
+GESTION = User(id=4, full_name="Check Gestion", role_id=4)
+
+SINCE = datetime(2024, 1, 1)
+UNTIL = datetime(2024, 12, 31)
+
+# Cursors of a next page, as printed by filter-events / filter-contracts --limit
+EVENT_CURSOR = encode_cursor(Event(id=1, start_date=SINCE), EVENT_PAGE_KEYS)
+CONTRACT_CURSOR = encode_cursor(Contract(id=1, created_at=SINCE), CONTRACT_PAGE_KEYS)
+
+# Clients in the databases the statement counts are compared on (each has
+# 2 contracts with 2 events each)
+SIZES = (10, 200)
+
+
+def access_paths(session):
+    """(name, query) pairs for every hot filter in crud.py."""
+    return [
+        ("events: Support (own events)", build_events_query(session, SUPPORT)),
+        ("events: Gestion (unassigned)", build_events_query(session, GESTION)),
+        ("events: Support + start date", build_events_query(session, SUPPORT, start_date=SINCE)),
+        ("events: start date", build_events_query(session, ADMIN, start_date=SINCE)),
+        ("events: contract", build_events_query(session, ADMIN, contract_id=1)),
+        ("events: support contact", build_events_query(session, ADMIN, support_contact_id=SUPPORT.id)),
+        ("contracts: Commercial unsigned", build_unsigned_contracts_query(session, COMMERCIAL)),
+        ("contracts: Admin unsigned", build_unsigned_contracts_query(session, ADMIN)),
+        ("contracts: Commercial", build_contracts_query(session, COMMERCIAL)),
+        ("contracts: client", build_contracts_query(session, ADMIN, client_id=1)),
+        ("contracts: created between", build_contracts_query(session, ADMIN, date_min=SINCE, date_max=UNTIL)),
+        ("contracts: Commercial signed since", build_contracts_query(session, COMMERCIAL, signed=True, date_min=SINCE)),
+        ("clients: Commercial (list)", scope(session.query(Client), COMMERCIAL, Client).order_by(Client.id)),
+        ("clients: Support (list)", scope(session.query(Client), SUPPORT, Client).order_by(Client.id)),
+        ("contracts: Commercial (list)", scope(session.query(Contract), COMMERCIAL, Contract).order_by(Contract.id)),
+        ("contracts: Support (list)", scope(session.query(Contract), SUPPORT, Contract).order_by(Contract.id)),
+        ("events: Commercial (list)", scope(session.query(Event), COMMERCIAL, Event).order_by(Event.id)),
+        ("events: Support (list)", scope(session.query(Event), SUPPORT, Event).order_by(Event.id)),
+        ("events: Commercial", build_events_query(session, COMMERCIAL)),
+        ("events: overlap check", session.query(Event).filter(
+            Event.support_contact_id == SUPPORT.id, Event.start_date < UNTIL, Event.end_date > SINCE)),
+        ("events: next page", keyset_query(build_events_query(session, ADMIN), EVENT_PAGE_KEYS, EVENT_CURSOR)),
+        ("events: Support next page", keyset_query(build_events_query(session, SUPPORT), EVENT_PAGE_KEYS, EVENT_CURSOR)),
+        ("contracts: next page", keyset_query(build_contracts_query(session, ADMIN), CONTRACT_PAGE_KEYS, CONTRACT_CURSOR)),
+        ("contracts: Commercial next page", keyset_query(build_contracts_query(session, COMMERCIAL), CONTRACT_PAGE_KEYS, CONTRACT_CURSOR)),
+    ]
+
+
+def explain(session, query):
+    """Return the EXPLAIN QUERY PLAN details of a query.
+
+    The query is executed once to capture the exact SQL and parameters sent
+    to the driver, which are then explained.
+    """
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        query.all()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    statement, parameters = captured[-1]
+    plan = session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return [row[3] for row in plan]
+
+
+def is_scan(detail: str) -> bool:
+    """Full table (or full index) scans, as opposed to SEARCH ... USING INDEX."""
+    return detail.startswith("SCAN ")
+
+
+def check_query_plans(session):
+    """Explain every access path; return the list of (name, plan, ok) results."""
+    results = []
+    for name, query in access_paths(session):
+        plan = explain(session, query)
+        results.append((name, plan, not any(is_scan(detail) for detail in plan)))
+    return results
+
+
+def list_views(session):
+    """(name, callable) pairs for every view that prints related rows."""
+    return [
+        ("list-clients", lambda: get_all_clients(session, ADMIN)),
+        ("list-contracts", lambda: get_all_contracts(session, ADMIN)),
+        ("list-events", lambda: get_all_events(session, ADMIN)),
+        ("list-clients: Support", lambda: get_all_clients(session, SUPPORT)),
+        ("list-events: Commercial", lambda: get_all_events(session, COMMERCIAL)),
+        ("filter-events: Gestion", lambda: filter_events_by_role(session, GESTION)),
+        ("filter-contracts: Admin", lambda: filter_contracts_by_role(session, ADMIN)),
+        ("filter-contracts: signed", lambda: filter_contracts(session, ADMIN, signed=True)),
+    ]
+
+
+def count_statements(url):
+    """Number of statements each list view runs against the database at `url`."""
+    engine = create_engine(url)
+    counts = {}
+    with Session(engine) as session:
+        for name, view in list_views(session):
+            profiler = SQLProfiler()
+            profiler.start()
+            try:
+                with redirect_stdout(io.StringIO()):
+                    view()
+            finally:
+                profiler.stop()
+            counts[name] = sum(row["count"] for row in profiler.summary())
+            # Objects loaded by one view must not hide the lazy loads of the next
+            session.expunge_all()
+    engine.dispose()
+    return counts
+
+
+def check_statement_counts():
+    """Run the list views at every size; return (name, counts, ok) results."""
+    counts_by_size = []
+    for clients in SIZES:
+        with tempfile.TemporaryDirectory() as directory:
+            url = f"sqlite:///{os.path.join(directory, 'check.db')}"
+            create_database(url, clients=clients)
+            counts_by_size.append(count_statements(url))
+    return [
+        (name, [counts[name] for counts in counts_by_size], len({counts[name] for counts in counts_by_size}) == 1)
+        for name in counts_by_size[0]
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default="sqlite://", help="SQLite database to check (default: in-memory)")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    if not args.database_url.startswith("sqlite"):
+        print("EXPLAIN QUERY PLAN checks only support SQLite databases.")
+        return 2
+    Base.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        results = check_query_plans(session)
+    statement_results = check_statement_counts()
+
+    table = Table(title="Query plans", show_header=True, header_style="bold magenta")
+    table.add_column("Access path")
+    table.add_column("Plan")
+    table.add_column("Status")
+    for name, plan, ok in results:
+        table.add_row(name, "\n".join(plan), "[green]index[/green]" if ok else "[red]SCAN[/red]")
+    Console().print(table)
+
+    table = Table(title="Statements per list view", show_header=True, header_style="bold magenta")
+    table.add_column("View")
+    for clients in SIZES:
+        table.add_column(f"{clients} clients", justify="right")
+    table.add_column("Status")
+    for name, counts, ok in statement_results:
+        table.add_row(name, *map(str, counts), "[green]constant[/green]" if ok else "[red]N+1[/red]")
+    Console().print(table)
+
+    status = 0
+    failures = [name for name, _, ok in results if not ok]
+    if failures:
+        print(f"{len(failures)} access path(s) regressed to a table scan: {', '.join(failures)}")
+        status = 1
+    failures = [name for name, _, ok in statement_results if not ok]
+    if failures:
+        print(f"{len(failures)} list view(s) run more statements as rows grow: {', '.join(failures)}")
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,4 @@
+"""`python -m epic_events`: forward to the daemon if it is running, else run the CLI."""
+from epic_events.daemon import main
+
+main()
@@ -0,0 +1,178 @@
+"""asyncio variants of the core operations, for bulk jobs.
+
+Each operation runs the same function as the CLI (crud.py, transfer.py,
+scheduling.py) through `AsyncSession.run_sync`, so permissions and
+validation are shared rather than duplicated: the function runs in a
+greenlet and every statement it sends awaits on the event loop. Bulk jobs
+open one session per unit of work and keep up to `concurrency` of them in
+flight, so one process drives several statements at once while it parses
+the next batch.
+
+On PostgreSQL (asyncpg) the statements run in parallel on the server. SQLite
+(aiosqlite) still has a single writer: concurrent writes wait for each other
+(busy_timeout, see config.py), reads run in parallel in WAL mode.
+
+Requires `pip install -r requirements-async.txt`.
+
+    import asyncio
+    from epic_events.config import get_async_session_factory
+    from epic_events import async_crud
+
+    asyncio.run(async_crud.import_rows(get_async_session_factory(), user, "clients", "clients.csv"))
+"""
+import asyncio
+import functools
+from collections import defaultdict
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from epic_events import crud, scheduling, transfer
+from epic_events.config import DEFAULT_BATCH_SIZE
+from epic_events.models import Event
+
+# Units of work (sessions) in flight at once
+DEFAULT_CONCURRENCY = 4
+
+
+def _run_sync(function):
+    """`function(session, ...)` as a coroutine taking an AsyncSession."""
+    @functools.wraps(function)
+    async def run(session: AsyncSession, *args, **kwargs):
+        return await session.run_sync(function, *args, **kwargs)
+    return run
+
+
+add_client = _run_sync(crud.add_client)
+update_client = _run_sync(crud.update_client)
+delete_client = _run_sync(crud.delete_client)
+add_contract = _run_sync(crud.add_contract)
+update_contract = _run_sync(crud.update_contract)
+add_event = _run_sync(crud.add_event)
+update_event = _run_sync(crud.update_event)
+auto_assign = _run_sync(scheduling.auto_assign)
+
+
+async def _bounded(jobs, concurrency: int) -> list:
+    """Await the coroutines of `jobs`, at most `concurrency` at a time; return their results in order.
+
+    `jobs` is consumed lazily, so building the next job (e.g. parsing a batch)
+    overlaps the ones running. The first failure cancels the rest.
+    """
+    slots = asyncio.Semaphore(concurrency)
+    tasks, errors = [], []
+
+    def finished(task):
+        slots.release()
+        if not task.cancelled() and task.exception():
+            errors.append(task.exception())
+
+    try:
+        for job in jobs:
+            await slots.acquire()
+            if errors:
+                job.close()
+                break
+            task = asyncio.ensure_future(job)
+            task.add_done_callback(finished)
+            tasks.append(task)
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    if errors:
+        raise errors[0]
+    return results
+
+
+async def import_rows(session_factory: async_sessionmaker, user, entity: str, path: str,
+                      file_format: str = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                      rejects_path: str = None, concurrency: int = DEFAULT_CONCURRENCY):
+    """Import clients, contracts or events like transfer.import_rows, `concurrency` batches at a time.
+
+    Each batch is checked and inserted in its own session and transaction.
+    Returns (imported, rejected) counts, or None if the import could not start.
+    """
+    file_format = transfer.start_import(user, entity, path, file_format)
+    if file_format is None:
+        return None
+
+    rejects = transfer.RejectsWriter(rejects_path or f"{path}.rejects.jsonl")
+    # Shared by the batches: the duplicate and overlap checks of a batch run
+    # without awaiting, after its queries, so they see the rows accepted by
+    # the batches still in flight
+    seen_emails, booked = set(), {}
+
+    async def insert(batch, unparsed):
+        async with session_factory() as session:
+            inserted, rejected = await session.run_sync(transfer.import_batch, entity, batch, seen_emails, booked)
+        rejects.write_batch(unparsed + rejected)
+        return inserted
+
+    try:
+        batches = transfer.parsed_batches(user, entity, path, file_format, batch_size)
+        imported = sum(await _bounded((insert(batch, unparsed) for batch, unparsed in batches), concurrency))
+    finally:
+        rejects.close()
+
+    transfer.print_import_summary(entity, imported, rejects)
+    return imported, rejects.count
+
+
+async def update_events(session_factory: async_sessionmaker, user, updates: Iterable[dict],
+                        concurrency: int = DEFAULT_CONCURRENCY):
+    """Apply crud.update_event to many events, e.g. to reassign them.
+
+    `updates` are dicts of update_event's arguments, with `event_id`. The
+    updates that concern the same support contact run one after the other in
+    one session, so each overlap check sees the events placed before it;
+    different support contacts are updated concurrently.
+    """
+    updates = list(updates)
+    async with session_factory() as session:
+        current = dict((await session.execute(
+            select(Event.id, Event.support_contact_id).where(Event.id.in_({update["event_id"] for update in updates}))
+        )).all())
+
+    by_contact = defaultdict(list)
+    for update in updates:
+        contact = update.get("support_contact_id")
+        by_contact[contact if contact is not None else current.get(update["event_id"])].append(update)
+
+    async def apply(contact_updates):
+        async with session_factory() as session:
+            for update in contact_updates:
+                await session.run_sync(crud.update_event, user, **update)
+
+    await _bounded((apply(contact_updates) for contact_updates in by_contact.values()), concurrency)
+
+
+async def find_conflicts(session_factory: async_sessionmaker, user=None,
+                         concurrency: int = DEFAULT_CONCURRENCY) -> list:
+    """Every overlapping pair of events `user` may read, as scheduling.find_conflicts yields them.
+
+    The support contacts are split into `concurrency` ranges swept at the
+    same time, each in its own session. Unlike the `conflicts` command, the
+    pairs are returned as a list, ordered by support contact.
+    """
+    async with session_factory() as session:
+        contacts = (await session.execute(
+            select(Event.support_contact_id).where(Event.support_contact_id != None)
+            .distinct().order_by(Event.support_contact_id)
+        )).scalars().all()
+    if not contacts:
+        return []
+
+    size = -(-len(contacts) // concurrency)
+
+    async def sweep(contact_ids):
+        async with session_factory() as session:
+            return await session.run_sync(
+                lambda sync_session: list(scheduling.find_conflicts(sync_session, user, support_contact_ids=contact_ids))
+            )
+
+    ranges = (contacts[start:start + size] for start in range(0, len(contacts), size))
+    return [pair for pairs in await _bounded((sweep(contact_ids) for contact_ids in ranges), concurrency)
+            for pair in pairs]
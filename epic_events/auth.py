@@ -1,20 +1,57 @@
+import hashlib
+import json
 import os
+import time
+from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Optional
-from jose import JWTError, jwt
-from epic_events.models import User
-from epic_events.config import JWT_SECRET_KEY
+from typing import Optional, TYPE_CHECKING
+from epic_events.config import JWT_SECRET_KEY, IDENTITY_CACHE_TTL
+
+# jose and the models are imported inside the functions that use them, so
+# commands like logout start without loading them
+if TYPE_CHECKING:
+    from epic_events.models import User
 
 # Configuration
 SECRET_KEY = JWT_SECRET_KEY
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 h
 TOKEN_FILE = os.path.expanduser("~/.epic_events/token")
+IDENTITY_FILE = os.path.expanduser("~/.epic_events/identity.json")
+
+
+@dataclass(frozen=True)
+class Identity:
+    """The logged-in user, as last validated against the database.
+
+    Has the attributes the read paths in crud.py use (id, full_name, role_id),
+    so read-only commands can run without loading the User row.
+    """
+    id: int
+    email: str
+    full_name: str
+    role_id: int
+    role_name: str
+
+    @classmethod
+    def from_user(cls, user: "User", role_name: str = None) -> "Identity":
+        return cls(user.id, user.email, user.full_name, user.role_id, role_name or user.role.name)
+
+
+# Identity already validated in this process (avoids re-reading the cache file)
+_identity_memo = None
+# Claims of the last token verified in this process (the shell verifies it once)
+_claims_memo = None
+
+
+def create_token(user_email: str, role: str, user_id: int = None, role_id: int = None) -> str:
+    from jose import jwt
 
-def create_token(user_email: str, role: str) -> str:
     data = {
         "sub": user_email,
         "role": role,
+        "uid": user_id,
+        "rid": role_id,
         "exp": datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     }
     return jwt.encode(data, SECRET_KEY, algorithm=ALGORITHM)
@@ -28,29 +65,128 @@ def save_token(token: str):
         f.write(token)
     os.chmod(TOKEN_FILE, 0o600)  # User read/write only
 
-def set_current_user(user: User):
+def set_current_user(user: "User"):
     """Store current user email in environment"""
     os.environ['EPIC_EVENTS_USER'] = user.email
 
-def get_current_user(session) -> Optional[User]:
-    """Get current user from token"""
+def _read_token() -> Optional[str]:
     try:
-        if not os.path.exists(TOKEN_FILE):
-            return None
-        
         with open(TOKEN_FILE) as f:
-            token = f.read().strip()
-            
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_email = payload.get("sub")
-        if not user_email:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+def _decode_token(token: str) -> Optional[dict]:
+    """Return the token claims, or None if the token is invalid or expired."""
+    global _claims_memo
+    if _claims_memo and _claims_memo[0] == token and _claims_memo[1]["exp"] > time.time():
+        return _claims_memo[1]
+
+    from jose import JWTError, jwt
+
+    try:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    _claims_memo = (token, claims)
+    return claims
+
+def _token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def cache_identity(identity: Identity, token: str = None):
+    """Record `identity` as validated now, for the token currently saved."""
+    global _identity_memo
+    token = token or _read_token()
+    if not token:
+        return
+    validated_at = time.time()
+    _identity_memo = (_token_hash(token), identity, validated_at)
+    cache = {"token": _token_hash(token), "validated_at": validated_at, "identity": asdict(identity)}
+    os.makedirs(os.path.dirname(IDENTITY_FILE), exist_ok=True)
+    with open(IDENTITY_FILE, "w") as f:
+        json.dump(cache, f)
+    os.chmod(IDENTITY_FILE, 0o600)  # User read/write only
+
+def invalidate_identity_cache():
+    """Forget the cached identity, so the next command re-reads the user from the database."""
+    global _identity_memo
+    _identity_memo = None
+    if os.path.exists(IDENTITY_FILE):
+        os.remove(IDENTITY_FILE)
+
+def _cached_identity(token: str, claims: dict) -> Optional[Identity]:
+    """Return the cached identity if it belongs to `token` and is recent enough.
+
+    The cache file is not signed, so it is only a hint: it is used only when
+    its user and role ids match the signed `uid` and `rid` claims of the token.
+    """
+    token_hash = _token_hash(token)
+    identity = None
+    # Long-running processes (shell, daemon) also honour the TTL and notice
+    # when another process invalidated the cache
+    if (_identity_memo and _identity_memo[0] == token_hash
+            and time.time() - _identity_memo[2] <= IDENTITY_CACHE_TTL
+            and os.path.exists(IDENTITY_FILE)):
+        identity = _identity_memo[1]
+    else:
+        try:
+            with open(IDENTITY_FILE) as f:
+                cache = json.load(f)
+            if cache["token"] == token_hash and time.time() - cache["validated_at"] <= IDENTITY_CACHE_TTL:
+                identity = Identity(**cache["identity"])
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
             return None
-            
-        return session.query(User).filter(User.email == user_email).first()
-    except (JWTError, FileNotFoundError):
+    if identity is None or (identity.id, identity.role_id) != (claims.get("uid"), claims.get("rid")):
+        return None
+    return identity
+
+def get_current_user(session) -> Optional["User"]:
+    """Get current user from token (always reads the database, use for writes)"""
+    from sqlalchemy.orm import joinedload
+    from epic_events.models import User
+
+    token = _read_token()
+    if not token:
+        return None
+    payload = _decode_token(token)
+    if not payload:
         return None
 
+    # Load the role in the same query, it is needed for the identity cache
+    if payload.get("uid"):
+        user = session.get(User, payload["uid"], options=[joinedload(User.role)])
+    elif payload.get("sub"):  # tokens issued before user ids were added
+        user = session.query(User).options(joinedload(User.role)).filter(User.email == payload["sub"]).first()
+    else:
+        return None
+
+    if user:
+        cache_identity(Identity.from_user(user), token)
+    return user
+
+def get_current_identity(session) -> Optional[Identity]:
+    """Get the current user for read-only commands.
+
+    Uses the identity cache when it matches the saved token, agrees with its
+    signed claims and was validated less than IDENTITY_CACHE_TTL seconds ago,
+    so no query is needed; otherwise reads the user from the database and
+    refreshes the cache.
+    """
+    token = _read_token()
+    claims = _decode_token(token) if token else None
+    if not claims:
+        return None
+
+    identity = _cached_identity(token, claims)
+    if identity:
+        return identity
+
+    user = get_current_user(session)
+    return Identity.from_user(user) if user else None
+
 def clear_current_user():
     """Remove token file"""
+    invalidate_identity_cache()
     if os.path.exists(TOKEN_FILE):
-        os.remove(TOKEN_FILE)
\ No newline at end of file
+        os.remove(TOKEN_FILE)
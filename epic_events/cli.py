@@ -1,35 +1,94 @@
+import click
 import typer
-from rich import print
-from rich.console import Console
-from epic_events.config import SessionLocal
-from epic_events.crud import (
-    add_client, get_all_clients, add_contract, get_all_contracts, 
-    add_event, get_all_events, create_user, authenticate_user,
-    update_client as crud_update_client,
-    update_contract as crud_update_contract,
-    update_event as crud_update_event,
-    filter_events_by_role,
-    filter_contracts_by_role,
-    update_user_details 
-)
-from epic_events.auth import ( 
-    get_current_user, clear_current_user, 
-    create_token, save_token
-)
+# Typer already imports rich for its help output, so this costs nothing extra
+from epic_events.console import print
 from datetime import datetime
-import sentry_sdk
+from decimal import Decimal, InvalidOperation
+from epic_events.config import AMOUNT_PLACES, DEFAULT_PAGE_SIZE, DEFAULT_BATCH_SIZE, MAX_AMOUNT
 
-
-console = Console() 
+# crud, auth, the database engine and Sentry (telemetry) are imported inside the commands
+# that need them, so `logout` or `--help` start without loading SQLAlchemy,
+# Sentry or jose.
 
 """Initialize the Typer app.
 This is the entry point of the CLI.
 """
 app = typer.Typer()  
 
+def parse_amount(value) -> Decimal:
+    """Amounts are read as Decimal, so 0.1 is exactly 10 cents (no float rounding)."""
+    try:
+        amount = Decimal(value)
+    except InvalidOperation:
+        raise typer.BadParameter(f"{value!r} is not an amount")
+    if not amount.is_finite():
+        raise typer.BadParameter(f"{value!r} is not an amount")
+    if abs(amount) > MAX_AMOUNT:
+        raise typer.BadParameter(f"{value!r} is too large (at most {MAX_AMOUNT})")
+    if amount != round(amount, AMOUNT_PLACES):
+        raise typer.BadParameter(f"{value!r} has more than {AMOUNT_PLACES} decimal places")
+    return amount
+
+def parse_optional_id(value):
+    """A user ID, or None for an empty answer (so Enter can skip the prompt)."""
+    if value is None or not str(value).strip():
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise typer.BadParameter(f"{value!r} is not an ID")
+
+@app.callback()
+def main(
+    ctx: typer.Context,
+    profile_sql: bool = typer.Option(False, "--profile-sql", help="Print SQL statement counts, timings and rows changed after the command"),
+    profile_sql_json: str = typer.Option(None, "--profile-sql-json", help="Append the SQL profile as a JSON line to this file"),
+    profile: bool = typer.Option(False, "--profile", help="Profile the command: write .pstats and flamegraph (.collapsed) files, print hotspots"),
+    profile_output: str = typer.Option(None, "--profile-output", help="Path prefix for the profile files (default: profile-<command>)"),
+    profile_top: int = typer.Option(15, "--profile-top", min=1, help="Number of hotspots to print")
+):
+    """Epic Events CRM."""
+    if profile:
+        from epic_events.profiling import PythonProfiler
+
+        python_profiler = PythonProfiler()
+        python_profiler.start()
+
+        def report_python():
+            python_profiler.stop()
+            command = ctx.invoked_subcommand
+            paths = python_profiler.write(profile_output or f"profile-{command}")
+            python_profiler.print_hotspots(command, profile_top)
+            typer.echo(f"Profile written to {paths[0]} and {paths[1]}", err=True)
+
+        ctx.call_on_close(report_python)
+
+    if profile_sql or profile_sql_json:
+        from epic_events.profiling import SQLProfiler
+
+        profiler = SQLProfiler()
+        profiler.start()
+
+        def report():
+            profiler.stop()
+            if profile_sql:
+                profiler.print_summary(ctx.invoked_subcommand)
+            if profile_sql_json:
+                profiler.write_json(profile_sql_json, ctx.invoked_subcommand)
+
+        ctx.call_on_close(report)
+
 def get_db():
-    """Get a new database session."""
+    """Get a new database session, closed when the command finishes."""
+    from epic_events.config import SessionLocal
+
     session = SessionLocal()
+    # Commands keep the session from `next(get_db())` after the generator is
+    # discarded: close it with the command, so a long-running shell returns
+    # the connection to the pool instead of waiting for garbage collection
+    ctx = click.get_current_context(silent=True)
+    if ctx is not None:
+        ctx.call_on_close(session.close)
     try:
         yield session
     finally:
@@ -38,24 +97,33 @@ def get_db():
 @app.command()
 def register(full_name: str, email: str, password: str, role_id: int):
     """Create a new user."""
+    from epic_events.crud import create_user
+
     session = next(get_db())
     create_user(session, full_name, email, password, role_id)
 
 @app.command()
 def login(email: str, password: str):
     """Authenticate a user."""
+    from epic_events.crud import authenticate_user, get_role_names
+    from epic_events.auth import create_token, save_token, cache_identity, Identity
+
     session = next(get_db())
     user = authenticate_user(session, email, password)
     if user:
-        token = create_token(user.email, user.role.name)
+        role_name = get_role_names(session)[user.role_id]
+        token = create_token(user.email, role_name, user.id, user.role_id)
         save_token(token)
-        print(f"[bold green]Logged in as: {user.full_name} (Role: {user.role.name})[/bold green]")
+        cache_identity(Identity.from_user(user, role_name), token)
+        print(f"[bold green]Logged in as: {user.full_name} (Role: {role_name})[/bold green]")
     else:
         print("[bold red]Login failed.[/bold red]")
 
 @app.command()
 def logout():
     """Logout current user"""
+    from epic_events.auth import clear_current_user
+
     clear_current_user()
     print("[bold green]Logged out successfully![/bold green]")
 
@@ -67,6 +135,9 @@ def add_new_client(
     company_name: str = typer.Option(..., prompt=True)
 ):
     """Add a new client (Requires Admin or Commercial role)."""
+    from epic_events.crud import add_client
+    from epic_events.auth import get_current_user
+
     session = next(get_db())
     user = get_current_user(session)
     
@@ -77,26 +148,36 @@ def add_new_client(
     add_client(session, user, full_name, email, phone, company_name)
 
 @app.command()
-def list_clients():
+def list_clients(
+    limit: int = typer.Option(None, "--limit", min=1, help="Maximum number of clients to show (default: all)"),
+    page_size: int = typer.Option(DEFAULT_PAGE_SIZE, "--page-size", min=1, help="Rows fetched and printed at a time")
+):
     """List all clients (Read-Only for unauthorized users)."""
-    with sentry_sdk.start_transaction(op="command", name="list_clients"):
+    from epic_events import telemetry
+    from epic_events.crud import get_all_clients
+    from epic_events.auth import get_current_identity
+
+    with telemetry.start_transaction(op="command", name="list_clients"):
         session = next(get_db())
-        user = get_current_user(session)
+        user = get_current_identity(session)
         
         if not user:
             print("[bold red]Please login first: epic-events login[/bold red]")
             return
             
-        get_all_clients(session, user)
+        get_all_clients(session, user, limit=limit, page_size=page_size)
 
 @app.command()
 def add_new_contract(
     client_id: int = typer.Option(..., prompt=True),
-    total_amount: float = typer.Option(..., prompt=True),
-    amount_due: float = typer.Option(..., prompt=True),
+    total_amount: Decimal = typer.Option(..., prompt=True, parser=parse_amount),
+    amount_due: Decimal = typer.Option(..., prompt=True, parser=parse_amount),
     signed: bool = typer.Option(False, prompt=True)
 ):
     """Add a new contract (Requires Admin or Commercial role)."""
+    from epic_events.crud import add_contract
+    from epic_events.auth import get_current_user
+
     session = next(get_db())
     user = get_current_user(session)
     
@@ -107,21 +188,27 @@ def add_new_contract(
     add_contract(session, user, client_id, total_amount, amount_due, signed)
 
 @app.command()
-def list_contracts():
+def list_contracts(
+    limit: int = typer.Option(None, "--limit", min=1, help="Maximum number of contracts to show (default: all)"),
+    page_size: int = typer.Option(DEFAULT_PAGE_SIZE, "--page-size", min=1, help="Rows fetched and printed at a time")
+):
     """List all contracts (Read-Only for all users)."""
+    from epic_events.crud import get_all_contracts
+    from epic_events.auth import get_current_identity
+
     session = next(get_db())
-    user = get_current_user(session)
+    user = get_current_identity(session)
     
     if not user:
         print("[bold red]Please login first: epic-events login[/bold red]")
         return
     
-    get_all_contracts(session, user)
+    get_all_contracts(session, user, limit=limit, page_size=page_size)
 
 @app.command()
 def add_new_event(
     contract_id: int = typer.Option(..., prompt=True),
-    support_contact: str = typer.Option(..., prompt=True),
+    support_contact_id: int = typer.Option("", prompt="Support Contact ID (press Enter to leave unassigned)", parser=parse_optional_id, metavar="ID", help="User ID of a Support user"),
     start_date: str = typer.Option(..., prompt=True, help="Format: DD/MM/YYYY HH:MM"),
     end_date: str = typer.Option(..., prompt=True, help="Format: DD/MM/YYYY HH:MM"),
     location: str = typer.Option(..., prompt=True),
@@ -129,6 +216,9 @@ def add_new_event(
     notes: str = typer.Option("", prompt=True, help="Optional notes about the event")
 ):
     """Add a new event (Requires Admin, Support, or Gestion role)."""
+    from epic_events.crud import add_event
+    from epic_events.auth import get_current_user
+
     session = next(get_db())
     user = get_current_user(session)
     
@@ -148,7 +238,7 @@ def add_new_event(
             session=session,
             user=user,
             contract_id=contract_id,
-            support_contact=support_contact,
+            support_contact_id=support_contact_id,
             start_date=start_datetime,
             end_date=end_datetime,
             location=location,
@@ -161,16 +251,22 @@ def add_new_event(
         print(f"[bold red]Error creating event: {str(e)}[/bold red]")
 
 @app.command()
-def list_events():
+def list_events(
+    limit: int = typer.Option(None, "--limit", min=1, help="Maximum number of events to show (default: all)"),
+    page_size: int = typer.Option(DEFAULT_PAGE_SIZE, "--page-size", min=1, help="Rows fetched and printed at a time")
+):
     """List all events (Read-Only for all users)."""
+    from epic_events.crud import get_all_events
+    from epic_events.auth import get_current_identity
+
     session = next(get_db())
-    user = get_current_user(session)
+    user = get_current_identity(session)
     
     if not user:
         print("[bold red]Please login first: epic-events login[/bold red]")
         return
     
-    get_all_events(session, user)
+    get_all_events(session, user, limit=limit, page_size=page_size)
       
 @app.command()
 def update_client(
@@ -181,6 +277,9 @@ def update_client(
     company_name: str = typer.Option(..., prompt=True)
 ):
     """Update an existing client (Requires Admin or Commercial role)."""
+    from epic_events.crud import update_client as crud_update_client
+    from epic_events.auth import get_current_user
+
     session = next(get_db())
     user = get_current_user(session)
     
@@ -201,11 +300,14 @@ def update_client(
 @app.command()
 def update_contract(
     contract_id: int = typer.Option(..., prompt=True),
-    total_amount: float = typer.Option(..., prompt=True),
-    amount_due: float = typer.Option(..., prompt=True),
+    total_amount: Decimal = typer.Option(..., prompt=True, parser=parse_amount),
+    amount_due: Decimal = typer.Option(..., prompt=True, parser=parse_amount),
     signed: bool = typer.Option(..., prompt=True)
 ):
     """Update contract details (Requires Admin, Gestion, or assigned Commercial role)."""
+    from epic_events.crud import update_contract as crud_update_contract
+    from epic_events.auth import get_current_user
+
     session = next(get_db())
     user = get_current_user(session)
     
@@ -225,7 +327,7 @@ def update_contract(
 @app.command()
 def update_event(
     event_id: int = typer.Option(..., prompt=True),
-    support_contact: str = typer.Option(None, prompt="New Support Contact (press Enter to skip)"),
+    support_contact_id: int = typer.Option("", prompt="New Support Contact ID (press Enter to skip)", parser=parse_optional_id, metavar="ID"),
     start_date: str = typer.Option(None, prompt="New Start Date (YYYY-MM-DD, press Enter to skip)"),
     end_date: str = typer.Option(None, prompt="New End Date (YYYY-MM-DD, press Enter to skip)"),
     location: str = typer.Option(None, prompt="New Location (press Enter to skip)"),
@@ -233,6 +335,9 @@ def update_event(
     notes: str = typer.Option(None, prompt="New Notes (press Enter to skip)")
 ):
     """Update event details (Requires Admin or assigned Support role)."""
+    from epic_events.crud import update_event as crud_update_event
+    from epic_events.auth import get_current_user
+
     session = next(get_db())
     user = get_current_user(session)
     
@@ -246,7 +351,6 @@ def update_event(
         end_datetime = datetime.strptime(end_date, "%Y-%m-%d") if end_date else None
 
         # Convert empty strings to None
-        support_contact = support_contact if support_contact and support_contact.strip() else None
         location = location if location and location.strip() else None
         notes = notes if notes and notes.strip() else None
         
@@ -254,7 +358,7 @@ def update_event(
             session=session,
             user=user,
             event_id=event_id,
-            support_contact=support_contact,
+            support_contact_id=support_contact_id,
             start_date=start_datetime,
             end_date=end_datetime,
             location=location,
@@ -270,15 +374,20 @@ def update_event(
 def filter_events(
     event_id: int = typer.Option(None, "--id", help="Filter by event ID"),
     contract_id: int = typer.Option(None, "--contract", help="Filter by contract ID"),
-    support_contact: str = typer.Option(None, "--support", help="Filter by support contact"),
+    support_contact_id: int = typer.Option(None, "--support", help="Filter by support contact (user ID)"),
     start_date: str = typer.Option(None, "--start", help="Filter by start date (YYYY-MM-DD)"),
     end_date: str = typer.Option(None, "--end", help="Filter by end date (YYYY-MM-DD)"),
     location: str = typer.Option(None, "--location", help="Filter by location"),
-    attendees: int = typer.Option(None, "--attendees", help="Filter by number of attendees")
+    attendees: int = typer.Option(None, "--attendees", help="Filter by number of attendees"),
+    limit: int = typer.Option(None, "--limit", min=1, help="Show at most this many events, with a cursor for the next page"),
+    after: str = typer.Option(None, "--after", help="Cursor printed by the previous page")
 ):
-    """Filter events by any criteria."""
+    """Filter events by any criteria (sorted by start date)."""
+    from epic_events.crud import filter_events_by_role
+    from epic_events.auth import get_current_identity
+
     session = next(get_db())
-    user = get_current_user(session)
+    user = get_current_identity(session)
     
     if not user:
         print("[bold red]Please login first: epic-events login[/bold red]")
@@ -292,7 +401,7 @@ def filter_events(
     filters = {
         'event_id': event_id,
         'contract_id': contract_id,
-        'support_contact': support_contact,
+        'support_contact_id': support_contact_id,
         'start_date': start,
         'end_date': end,
         'location': location,
@@ -302,29 +411,300 @@ def filter_events(
     # Remove None values
     filters = {k: v for k, v in filters.items() if v is not None}
 
-    filter_events_by_role(session=session, user=user, **filters)
+    filter_events_by_role(session=session, user=user, limit=limit, after=after, **filters)
+
+@app.command()
+def filter_contracts(
+    contract_id: int = typer.Option(None, "--id", help="Filter by contract ID"),
+    client_id: int = typer.Option(None, "--client", help="Filter by client ID"),
+    total_amount_min: Decimal = typer.Option(None, "--min-amount", parser=parse_amount, help="Minimum total amount"),
+    total_amount_max: Decimal = typer.Option(None, "--max-amount", parser=parse_amount, help="Maximum total amount"),
+    signed: bool = typer.Option(None, "--signed/--unsigned", help="Only signed or only unsigned contracts"),
+    date_min: str = typer.Option(None, "--since", help="Created on or after (YYYY-MM-DD)"),
+    date_max: str = typer.Option(None, "--until", help="Created on or before (YYYY-MM-DD)"),
+    limit: int = typer.Option(None, "--limit", min=1, help="Show at most this many contracts, with a cursor for the next page"),
+    after: str = typer.Option(None, "--after", help="Cursor printed by the previous page")
+):
+    """Filter contracts based on role (Commercial → Unsigned contracts), or by any criteria."""
+    from epic_events.crud import filter_contracts_by_role, filter_contracts as crud_filter_contracts
+    from epic_events.auth import get_current_identity
+
+    session = next(get_db())
+    user = get_current_identity(session)
+
+    if not user:
+        print("[bold red]Please login first: epic-events login[/bold red]")
+        return
+
+    filters = {
+        'contract_id': contract_id,
+        'client_id': client_id,
+        'total_amount_min': total_amount_min,
+        'total_amount_max': total_amount_max,
+        'signed': signed,
+        'date_min': datetime.strptime(date_min, "%Y-%m-%d") if date_min else None,
+        'date_max': datetime.strptime(date_max, "%Y-%m-%d") if date_max else None,
+        'limit': limit,
+        'after': after
+    }
+    filters = {k: v for k, v in filters.items() if v is not None}
+
+    # Without criteria, keep the role-based overview
+    if not filters:
+        filter_contracts_by_role(session, user)
+        return
+
+    crud_filter_contracts(session, user, **filters)
+
+@app.command("import")
+def import_data(
+    entity: str = typer.Argument(..., help="What to import: clients, contracts or events"),
+    path: str = typer.Argument(..., help="CSV or JSONL file"),
+    file_format: str = typer.Option(None, "--format", help="csv or jsonl (default: from the file extension)"),
+    batch_size: int = typer.Option(DEFAULT_BATCH_SIZE, "--batch-size", min=1, help="Rows inserted per transaction"),
+    rejects: str = typer.Option(None, "--rejects", help="File for rejected rows (default: <file>.rejects.jsonl)")
+):
+    """Bulk import clients, contracts or events from a CSV/JSONL file."""
+    from epic_events.transfer import import_rows
+    from epic_events.auth import get_current_user
+
+    session = next(get_db())
+    user = get_current_user(session)
+
+    if not user:
+        print("[bold red]Please login first: epic-events login[/bold red]")
+        return
+
+    import_rows(session, user, entity, path, file_format=file_format, batch_size=batch_size, rejects_path=rejects)
+
+@app.command()
+def export(
+    entity: str = typer.Argument(..., help="What to export: clients, contracts or events"),
+    output: str = typer.Option("-", "--output", "-o", help="Output file ('-' for stdout)"),
+    file_format: str = typer.Option(None, "--format", help="csv or jsonl (default: from the file extension, csv on stdout)"),
+    batch_size: int = typer.Option(DEFAULT_BATCH_SIZE, "--batch-size", min=1, help="Rows fetched from the database at a time")
+):
+    """Export clients, contracts or events as CSV/JSONL."""
+    from epic_events.transfer import export_to_path
+    from epic_events.auth import get_current_identity
+
+    session = next(get_db())
+    user = get_current_identity(session)
+
+    if not user:
+        print("[bold red]Please login first: epic-events login[/bold red]")
+        return
+
+    export_to_path(session, user, entity, output, file_format=file_format, batch_size=batch_size)
+
+@app.command()
+def search(
+    terms: list[str] = typer.Argument(..., help="Words to look for (all must match, the last one as a prefix)"),
+    limit: int = typer.Option(20, "--limit", min=1, help="Maximum number of results")
+):
+    """Full-text search of client names, companies, emails and event locations/notes."""
+    from epic_events.search import search as run_search
+    from epic_events.auth import get_current_identity
+
+    session = next(get_db())
+    user = get_current_identity(session)
+
+    if not user:
+        print("[bold red]Please login first: epic-events login[/bold red]")
+        return
+
+    run_search(session, user, " ".join(terms), limit=limit)
+
+@app.command()
+def conflicts(
+    limit: int = typer.Option(None, "--limit", min=1, help="Show at most this many conflicts")
+):
+    """List events of the same support contact that overlap in time."""
+    from epic_events.scheduling import show_conflicts
+    from epic_events.auth import get_current_identity
+
+    session = next(get_db())
+    user = get_current_identity(session)
+
+    if not user:
+        print("[bold red]Please login first: epic-events login[/bold red]")
+        return
+
+    show_conflicts(session, user, limit=limit)
+
+@app.command()
+def auto_assign(
+    since: str = typer.Option(None, "--since", help="Events starting on or after (YYYY-MM-DD, default: today)"),
+    until: str = typer.Option(None, "--until", help="Events starting before (YYYY-MM-DD, default: no limit)"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Show the assignments without saving them")
+):
+    """Assign unassigned events to Support users, evenly and without overlaps (Admin or Gestion)."""
+    from epic_events.scheduling import auto_assign as run_auto_assign
+    from epic_events.auth import get_current_user
+
+    session = next(get_db())
+    user = get_current_user(session)
+
+    if not user:
+        print("[bold red]Please login first: epic-events login[/bold red]")
+        return
+
+    try:
+        start = datetime.strptime(since, "%Y-%m-%d") if since else datetime.combine(datetime.now().date(), datetime.min.time())
+        end = datetime.strptime(until, "%Y-%m-%d") if until else None
+    except ValueError:
+        print("[bold red]Error: Invalid date format. Use YYYY-MM-DD[/bold red]")
+        return
+
+    run_auto_assign(session, user, since=start, until=end, dry_run=dry_run)
+
+@app.command()
+def rebuild_search_index():
+    """Rebuild the full-text search index from the tables (Admin only)."""
+    from epic_events.search import rebuild_search_index as rebuild, is_supported
+    from epic_events.auth import get_current_user
+
+    session = next(get_db())
+    user = get_current_user(session)
+
+    if not user:
+        print("[bold red]Please login first: epic-events login[/bold red]")
+        return
+    if user.role_id != 1:
+        print("[bold red]Error: Only Admin can rebuild the search index.[/bold red]")
+        return
+    if not is_supported(session.get_bind()):
+        print("[bold red]Error: Search requires a SQLite database.[/bold red]")
+        return
+
+    rebuild(session.get_bind())
+    print("[bold green]Search index rebuilt.[/bold green]")
 
 @app.command()
-def filter_contracts():
-    """Filter contracts based on role (Commercial → Unsigned contracts)."""
+def seed(
+    clients: int = typer.Option(1000, "--clients", min=1, help="Clients to add (about 2 contracts and 4 events each)"),
+    seed_value: int = typer.Option(42, "--seed", help="Random seed: the same seed gives the same data"),
+    workers: int = typer.Option(None, "--workers", min=1, help="Processes generating the data (default: one per CPU)")
+):
+    """Add generated clients, contracts, events and users, for development and benchmarks (Admin only)."""
+    from epic_events.seeding import seed_database
+    from epic_events.auth import get_current_user
+
+    session = next(get_db())
+    user = get_current_user(session)
+
+    if not user:
+        print("[bold red]Please login first: epic-events login[/bold red]")
+        return
+    if user.role_id != 1:
+        print("[bold red]Error: Only Admin can seed the database.[/bold red]")
+        return
+
+    engine = session.get_bind()
+    session.close()
+    added_clients, added_contracts, added_events = seed_database(engine, clients, seed=seed_value, workers=workers)
+    print(f"[bold green]Added {added_clients} clients, {added_contracts} contracts "
+          f"and {added_events} events.[/bold green]")
+
+report_app = typer.Typer(help="Aggregate reports on contracts and events.")
+app.add_typer(report_app, name="report")
+
+@report_app.command("sales")
+def report_sales(
+    from_summary: bool = typer.Option(False, "--summary", help="Read the trigger-maintained summary table instead of scanning contracts")
+):
+    """Contracts, signing rate, total and remaining amounts per sales contact."""
+    from epic_events.reports import report_sales as run_report
+    from epic_events.auth import get_current_identity
+
+    session = next(get_db())
+    user = get_current_identity(session)
+
+    if not user:
+        print("[bold red]Please login first: epic-events login[/bold red]")
+        return
+
+    run_report(session, user, from_summary=from_summary)
+
+@report_app.command("clients")
+def report_clients(
+    limit: int = typer.Option(20, "--limit", min=1, help="Number of clients to show (largest first)")
+):
+    """Contracts, total and remaining amounts per client."""
+    from epic_events.reports import report_clients as run_report
+    from epic_events.auth import get_current_identity
+
+    session = next(get_db())
+    user = get_current_identity(session)
+
+    if not user:
+        print("[bold red]Please login first: epic-events login[/bold red]")
+        return
+
+    run_report(session, user, limit=limit)
+
+@report_app.command("monthly")
+def report_monthly(
+    months: int = typer.Option(12, "--months", min=1, help="Number of months to show (latest first)")
+):
+    """Contracts signed/unsigned and amounts per month."""
+    from epic_events.reports import report_monthly as run_report
+    from epic_events.auth import get_current_identity
+
+    session = next(get_db())
+    user = get_current_identity(session)
+
+    if not user:
+        print("[bold red]Please login first: epic-events login[/bold red]")
+        return
+
+    run_report(session, user, months=months)
+
+@report_app.command("support")
+def report_support():
+    """Events, upcoming events and attendees per support contact."""
+    from epic_events.reports import report_support as run_report
+    from epic_events.auth import get_current_identity
+
+    session = next(get_db())
+    user = get_current_identity(session)
+
+    if not user:
+        print("[bold red]Please login first: epic-events login[/bold red]")
+        return
+
+    run_report(session, user)
+
+@report_app.command("rebuild-summary")
+def report_rebuild_summary():
+    """Recompute the per sales contact summary table from the contracts (Admin only)."""
+    from epic_events.reports import rebuild_summary
+    from epic_events.auth import get_current_user
+
     session = next(get_db())
     user = get_current_user(session)
 
     if not user:
         print("[bold red]Please login first: epic-events login[/bold red]")
         return
+    if user.role_id != 1:
+        print("[bold red]Error: Only Admin can rebuild the summary.[/bold red]")
+        return
 
-    filter_contracts_by_role(session, user)
+    rebuild_summary(session.get_bind())
+    print("[bold green]Contract summary rebuilt.[/bold green]")
 
 @app.command()
 def test_sentry():
     """Test Sentry error tracking by raising a test error."""
+    from epic_events import telemetry
+
     try:
         print("[bold yellow]Testing Sentry integration [/bold yellow]")
         division_by_zero = 1 / 0
     except ZeroDivisionError as e:
         # Capture and send the error to Sentry
-        sentry_sdk.capture_exception(e)
+        telemetry.capture_exception(e)
         print("[bold red]Test error generated and sent to Sentry![/bold red]")
         # Re-raise the error to show the traceback
         raise
@@ -334,9 +714,13 @@ def update_user(
     target_email: str = typer.Option(..., prompt=True),
     new_name: str = typer.Option(None, "--name", help="New full name"),
     new_email: str = typer.Option(None, "--email", help="New email address"),
-    new_password: str = typer.Option(None, "--password", help="New password", hide_input=True)
+    new_password: str = typer.Option(None, "--password", help="New password", hide_input=True),
+    new_role_id: int = typer.Option(None, "--role", help="New role ID (1 Admin, 2 Commercial, 3 Support, 4 Gestion)")
 ):
     """Update user details (Admin only)."""
+    from epic_events.crud import update_user_details
+    from epic_events.auth import get_current_user
+
     session = next(get_db())
     user = get_current_user(session)
     
@@ -351,8 +735,26 @@ def update_user(
         updates['email'] = new_email
     if new_password:
         updates['password'] = new_password
+    if new_role_id:
+        updates['role_id'] = new_role_id
 
     update_user_details(session, user, target_email, **updates)
 
+@app.command()
+def shell():
+    """Interactive shell keeping the connection and login loaded between commands."""
+    from epic_events.shell import run_shell
+
+    run_shell(app)
+
+@app.command()
+def serve():
+    """Run a local daemon that read-only commands are forwarded to."""
+    from epic_events.daemon import serve as run_daemon
+
+    run_daemon(app)
+
 if __name__ == "__main__":
-    app()
+    from epic_events.daemon import main as run
+
+    run()
@@ -1,9 +1,6 @@
 import os
+from decimal import Decimal
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
-import sentry_sdk
-from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
 import secrets
 
 # Load environment variables
@@ -15,38 +12,276 @@ JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', secrets.token_urlsafe(32))
 # Database configuration
 DATABASE_URL = os.getenv('DATABASE_URL', "sqlite:///database.db")
 
-# Create the database engine
-engine = create_engine(DATABASE_URL, echo=True)
-
-# Create a session to interact with the database
-SessionLocal = sessionmaker(bind=engine)
-
-# Base class for our models
-Base = declarative_base()
-
-# Sentry configuration
-sentry_sdk.init(
-    dsn=os.getenv('SENTRY_DSN'),
-    traces_sample_rate=1.0,
-    enable_tracing=True,
-    integrations=[
-        SqlalchemyIntegration(),
-    ],
-    environment=os.getenv('ENVIRONMENT', 'development'),
-    send_default_pii=True,
-    _experiments={
-        "profiles_sample_rate": 1.0,
+
+def absolute_database_url(url: str) -> str:
+    """`url` with a relative SQLite path made absolute, so that it names the
+    same database whatever the current directory (other URLs are unchanged)."""
+    scheme, separator, rest = url.partition(':///')
+    if not separator or scheme.split('+')[0] != 'sqlite':
+        return url
+    path, query_separator, query = rest.partition('?')
+    if path in ('', ':memory:') or os.path.isabs(path):
+        return url
+    return f"{scheme}:///{os.path.abspath(path)}{query_separator}{query}"
+
+
+ENVIRONMENT = os.getenv('ENVIRONMENT', 'development')
+SENTRY_DSN = os.getenv('SENTRY_DSN')
+
+# Telemetry defaults per environment. Each value can be overridden with the
+# environment variable of the same name; unknown environments use the
+# production defaults.
+TELEMETRY_DEFAULTS = {
+    'development': {'SENTRY_TRACES_SAMPLE_RATE': 1.0, 'SENTRY_PROFILES_SAMPLE_RATE': 1.0, 'SQL_ECHO': True},
+    'staging': {'SENTRY_TRACES_SAMPLE_RATE': 0.2, 'SENTRY_PROFILES_SAMPLE_RATE': 0.1, 'SQL_ECHO': False},
+    'production': {'SENTRY_TRACES_SAMPLE_RATE': 0.05, 'SENTRY_PROFILES_SAMPLE_RATE': 0.0, 'SQL_ECHO': False},
+}
+_telemetry_defaults = TELEMETRY_DEFAULTS.get(ENVIRONMENT, TELEMETRY_DEFAULTS['production'])
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or value == '':
+        return default
+    return value.strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+# TELEMETRY=off disables Sentry entirely: no client, no integrations, and
+# sentry_sdk is never imported
+TELEMETRY_ENABLED = _env_flag('TELEMETRY', True)
+SENTRY_TRACES_SAMPLE_RATE = _env_float('SENTRY_TRACES_SAMPLE_RATE', _telemetry_defaults['SENTRY_TRACES_SAMPLE_RATE'])
+SENTRY_PROFILES_SAMPLE_RATE = _env_float('SENTRY_PROFILES_SAMPLE_RATE', _telemetry_defaults['SENTRY_PROFILES_SAMPLE_RATE'])
+
+# Log every SQL statement (to stderr, so piped output such as exports stays clean)
+SQL_ECHO = _env_flag('SQL_ECHO', _telemetry_defaults['SQL_ECHO'])
+
+# Seconds a cached identity is trusted by read-only commands before the user
+# is re-read from the database. A role change made by an Admin reaches the
+# other user's read-only commands after at most this long (their cache is in
+# their own home directory), so keep it short
+IDENTITY_CACHE_TTL = int(os.getenv('IDENTITY_CACHE_TTL', 30))
+
+# SQLite connection settings, applied as PRAGMAs to every new connection.
+#   stock     SQLite's own defaults: rollback journal (readers and the writer
+#             block each other), fsync on every commit. The journal mode is
+#             stored in the database file, so it is set back explicitly
+#   wal       write-ahead log, so readers don't block the writer nor it them;
+#             fsync only at checkpoints (a power loss may lose the last
+#             commits, never corrupt the file); memory-mapped reads
+#   wal-full  the same, with an fsync on every commit
+# Each PRAGMA can be overridden with SQLITE_<NAME> (e.g. SQLITE_BUSY_TIMEOUT);
+# unknown profiles use the wal profile.
+SQLITE_PROFILES = {
+    'stock': {'journal_mode': 'DELETE'},
+    'wal': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,        # ms to wait for a lock instead of failing with "database is locked"
+        'mmap_size': 268435456,      # 256 MiB
+        'cache_size': -65536,        # 64 MiB (negative: KiB)
+        'temp_store': 'MEMORY',
+    },
+}
+SQLITE_PROFILES['wal-full'] = dict(SQLITE_PROFILES['wal'], synchronous='FULL')
+SQLITE_PRAGMA_NAMES = ('journal_mode', 'synchronous', 'busy_timeout', 'mmap_size', 'cache_size', 'temp_store')
+
+
+def sqlite_pragmas(profile: str) -> dict:
+    """The PRAGMAs of `profile`, with the SQLITE_<NAME> overrides applied."""
+    pragmas = dict(SQLITE_PROFILES.get(profile, SQLITE_PROFILES['wal']))
+    for name in SQLITE_PRAGMA_NAMES:
+        value = os.getenv(f'SQLITE_{name.upper()}')
+        if value:
+            pragmas[name] = value
+    return pragmas
+
+
+SQLITE_PROFILE = os.getenv('SQLITE_PROFILE', 'wal')
+SQLITE_PRAGMAS = sqlite_pragmas(SQLITE_PROFILE)
+
+# Connection pool of server databases such as PostgreSQL (SQLite ignores
+# these). Connections are checked before use (pre-ping) and replaced after
+# DB_POOL_RECYCLE seconds, so a long-running daemon survives server restarts
+# and idle timeouts.
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 30))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+DB_POOL_PRE_PING = _env_flag('DB_POOL_PRE_PING', True)
+# Milliseconds after which PostgreSQL cancels a statement (0: never)
+DB_STATEMENT_TIMEOUT = int(os.getenv('DB_STATEMENT_TIMEOUT', 0))
+
+# Number of rows fetched and printed at once by the list views
+DEFAULT_PAGE_SIZE = 100
+
+# Number of rows per transaction for bulk import, per fetch for export
+DEFAULT_BATCH_SIZE = 1000
+
+# Largest contract amount: Money columns store integer cents in a signed
+# 64-bit BIGINT. Amounts have at most AMOUNT_PLACES decimal places
+MAX_AMOUNT = Decimal(2 ** 63 - 1) / 100
+AMOUNT_PLACES = 2
+
+# The engine, session factory and declarative base are built on
+# first use rather than at import time, so commands that never touch the
+# database (logout, --help) don't pay for SQLAlchemy or Sentry.
+# `from epic_events.config import engine, SessionLocal, Base` still works:
+# those names are resolved by the module-level __getattr__ below.
+_engine = None
+_session_factory = None
+_base = None
+_async_engine = None
+_async_session_factory = None
+
+# asyncio driver used for each database by the async engine (see async_crud.py)
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def get_engine():
+    """Create the database engine on first use."""
+    global _engine
+    if _engine is None:
+        from sqlalchemy import create_engine
+        from epic_events.telemetry import init_telemetry
+
+        # Sentry's SQLAlchemy integration must be set up before queries run
+        init_telemetry()
+        _engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+        if _engine.dialect.name == "sqlite":
+            apply_sqlite_pragmas(_engine, SQLITE_PRAGMAS)
+        if SQL_ECHO:
+            _log_sql_to_stderr()
+    return _engine
+
+
+def async_url(url: str) -> str:
+    """`url` with the asyncio driver of its database (sqlite+aiosqlite, postgresql+asyncpg)."""
+    from sqlalchemy.engine import make_url
+
+    url = make_url(url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver:
+        url = url.set(drivername=f"{url.get_backend_name()}+{driver}")
+    return url.render_as_string(hide_password=False)
+
+
+def get_async_engine():
+    """Create the asyncio engine for DATABASE_URL on first use.
+
+    Needs the driver from requirements-async.txt.
+    """
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        from epic_events.telemetry import init_telemetry
+
+        init_telemetry()
+        url = async_url(DATABASE_URL)
+        _async_engine = create_async_engine(url, **engine_options(url))
+        if _async_engine.dialect.name == "sqlite":
+            apply_sqlite_pragmas(_async_engine.sync_engine, SQLITE_PRAGMAS)
+        if SQL_ECHO:
+            _log_sql_to_stderr()
+    return _async_engine
+
+
+def get_async_session_factory():
+    """Create the AsyncSession factory on first use."""
+    global _async_session_factory
+    if _async_session_factory is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        # Objects stay readable after commit without another round trip
+        _async_session_factory = async_sessionmaker(get_async_engine(), expire_on_commit=False)
+    return _async_session_factory
+
+
+def engine_options(url: str) -> dict:
+    """create_engine() keyword arguments for `url`: the pool settings of server databases."""
+    from sqlalchemy.engine import make_url
+
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend == "sqlite":
+        return {}
+    options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
     }
-)
+    if backend == "postgresql" and DB_STATEMENT_TIMEOUT:
+        if url.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT}"}
+    return options
+
+
+def apply_sqlite_pragmas(engine, pragmas: dict):
+    """Run `PRAGMA name = value` for each of `pragmas` on every new connection of `engine`."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+
+def _log_sql_to_stderr():
+    """Same output as create_engine(echo=True), written to stderr instead of stdout."""
+    import logging
+    import sys
+
+    logger = logging.getLogger("sqlalchemy.engine.Engine")
+    if any(handler.get_name() == "epic_events" for handler in logger.handlers):
+        return  # both the sync and the async engine were created
+    handler = logging.StreamHandler(sys.stderr)
+    handler.set_name("epic_events")
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+
+def get_session_factory():
+    """Create the session factory on first use."""
+    global _session_factory
+    if _session_factory is None:
+        from sqlalchemy.orm import sessionmaker
+        _session_factory = sessionmaker(bind=get_engine())
+    return _session_factory
+
+
+def get_base():
+    """Base class for our models."""
+    global _base
+    if _base is None:
+        from sqlalchemy.orm import declarative_base
+        _base = declarative_base()
+    return _base
+
+
+def __getattr__(name):
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        return get_session_factory()
+    if name == "Base":
+        return get_base()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Set default tags after initialization
-sentry_sdk.set_tag("application", "epic_events")
-sentry_sdk.set_tag("version", "1.0.0")
 
 # Generator for database sessions
 def get_db():
-    db = SessionLocal()
+    db = get_session_factory()()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,41 @@
+"""The consoles commands print through.
+
+Commands print with `print` and `get_console()` from here instead of
+`rich.print` or a new `Console()`, so that `redirect_console` can send all of
+a command's output, tables included, to other files. The daemon uses it to
+capture a forwarded command's output formatted for the client's terminal.
+"""
+from contextlib import contextmanager
+
+from rich.console import Console
+
+# One console for stdout and one for stderr, created on first use
+_consoles = {}
+
+
+def get_console(stderr: bool = False) -> Console:
+    """The console commands print to (the stderr one for errors and profiles)."""
+    if stderr not in _consoles:
+        _consoles[stderr] = Console(stderr=stderr)
+    return _consoles[stderr]
+
+
+def print(*objects, sep: str = " ", end: str = "\n"):
+    """Drop-in for `rich.print`, writing through `get_console()`."""
+    get_console().print(*objects, sep=sep, end=end)
+
+
+@contextmanager
+def redirect_console(stdout, stderr, **options):
+    """Print to the `stdout` and `stderr` files instead while the block runs.
+
+    `options` (e.g. `width`, `force_terminal`) are passed to both consoles.
+    """
+    previous = dict(_consoles)
+    _consoles[False] = Console(file=stdout, **options)
+    _consoles[True] = Console(file=stderr, **options)
+    try:
+        yield
+    finally:
+        _consoles.clear()
+        _consoles.update(previous)
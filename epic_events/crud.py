@@ -1,15 +1,37 @@
-from rich import print
-from rich.console import Console
 from rich.table import Table
 import sys
 import os
-import sentry_sdk
+import base64
+import json
 
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__) + "/.."))
 
-from sqlalchemy.orm import Session
+from sqlalchemy import literal, tuple_
+from sqlalchemy.orm import Session, joinedload
+from epic_events import telemetry
+from epic_events.auth import invalidate_identity_cache
+from epic_events.config import DEFAULT_PAGE_SIZE
+from epic_events.console import get_console, print
 from epic_events.models import Client, Contract, Event, Role, User
+from epic_events.scheduling import find_overlap
+from epic_events.scoping import scope
 from datetime import datetime, timezone
+from decimal import Decimal
+
+# Eager loads for the list views. Every related row a table shows is fetched
+# in the same SELECT (all many-to-one joins), so printing N rows costs one
+# statement instead of 1 + N lazy loads (see check_queries.py).
+CLIENT_VIEW_OPTIONS = (joinedload(Client.sales_contact),)
+CONTRACT_VIEW_OPTIONS = (joinedload(Contract.client), joinedload(Contract.sales_contact))
+# list-events has no Support Contact column; filter-events does
+EVENT_LIST_OPTIONS = (
+    joinedload(Event.contract).joinedload(Contract.client),
+    joinedload(Event.contract).joinedload(Contract.sales_contact),
+)
+EVENT_VIEW_OPTIONS = EVENT_LIST_OPTIONS + (joinedload(Event.support_contact),)
+
+def _contract_status(contract):
+    return "[green]Signed[/green]" if contract.signed else "[red]Not Signed[/red]"
 
 def get_db_session(SessionLocal):
     """Create a new database session."""
@@ -77,15 +99,29 @@ def delete_client(session: Session, user: User, client_id: int):
     session.commit()
     print(f"[bold green]Client '{client.full_name}' deleted successfully![/bold green]")
 
-def get_all_clients(session: Session, user: User):
-    """GET all clients from the database. 
-    Everyone can read, but only authorized roles can edit."""
-    with sentry_sdk.start_span(op="db", description="fetch_all_clients"):
-        clients = session.query(Client).all()
-    
-    
+def _iter_pages(query, page_size: int = DEFAULT_PAGE_SIZE, limit: int = None):
+    """Yield lists of at most `page_size` rows, streaming them from the database.
+
+    Rows are fetched with `yield_per` (a server-side cursor where the driver
+    supports one), so only one page is held in memory at a time.
+    """
+    if limit:
+        query = query.limit(limit)
+
+    page = []
+    for row in query.yield_per(page_size):
+        page.append(row)
+        if len(page) == page_size:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def _clients_table(show_title: bool = True):
+    """Build an empty clients table (the title is only shown on the first page)."""
     table_of_clients = Table(
-        title=f"[bold bright_blue]Epic Events Clients[/bold bright_blue]",
+        title=f"[bold bright_blue]Epic Events Clients[/bold bright_blue]" if show_title else None,
         title_style="white on blue",
         title_justify="center",
         show_header=True,
@@ -98,18 +134,34 @@ def get_all_clients(session: Session, user: User):
     table_of_clients.add_column("Email", style="green")
     table_of_clients.add_column("Phone", style="yellow")
     table_of_clients.add_column("Company", style="blue")  # Fixed: Added as column
-    
-    for client in clients:
-        table_of_clients.add_row(
-            str(client.id), 
-            client.full_name, 
-            client.email, 
-            client.phone,
-            client.company_name  # Added company_name to the row
-        )
-    
-    console = Console()
-    console.print(table_of_clients)
+    table_of_clients.add_column("Sales Contact", style="cyan")
+    return table_of_clients
+
+
+def get_all_clients(session: Session, user: User, limit: int = None, page_size: int = DEFAULT_PAGE_SIZE):
+    """GET the clients the user may read (see scoping.py); only authorized roles can edit.
+    Rows are streamed and printed `page_size` at a time."""
+    console = get_console()
+    shown = 0
+
+    with telemetry.start_span(op="db", description="fetch_all_clients"):
+        query = scope(session.query(Client), user, Client).options(*CLIENT_VIEW_OPTIONS).order_by(Client.id)
+        for page in _iter_pages(query, page_size, limit):
+            table_of_clients = _clients_table(show_title=shown == 0)
+            for client in page:
+                table_of_clients.add_row(
+                    str(client.id), 
+                    client.full_name, 
+                    client.email, 
+                    client.phone,
+                    client.company_name,  # Added company_name to the row
+                    client.sales_contact.full_name
+                )
+            console.print(table_of_clients)
+            shown += len(page)
+
+    if not shown:
+        console.print(_clients_table())
 
     if user.role_id in [1, 2]:  # Admin or Commercial can modify
         print("[bold green]You have permission to edit clients.[/bold green]")
@@ -117,7 +169,7 @@ def get_all_clients(session: Session, user: User):
         print("[bold red]Read-only access: You cannot modify clients.[/bold red]")
 
 
-def add_contract(session: Session, user: User, client_id: int, total_amount: float, amount_due: float, signed: bool = False):
+def add_contract(session: Session, user: User, client_id: int, total_amount: Decimal, amount_due: Decimal, signed: bool = False):
     """Add a new contract to the database with role-based access control."""
     
     # 1. Permission check
@@ -144,15 +196,10 @@ def add_contract(session: Session, user: User, client_id: int, total_amount: flo
     print(f"[bold green]Contract for Client ID {client_id} added successfully![/bold green]")
 
 
-def get_all_contracts(session: Session, user: User):
-    """Retrieve all contracts from the database. Everyone can read, but only authorized roles can edit."""
-    contracts = session.query(Contract).all()
-    if not contracts:
-        print("[bold red]No contracts found.[/bold red]")
-        return
-    
+def _contracts_list_table(show_title: bool = True):
+    """Build an empty contracts table (the title is only shown on the first page)."""
     table_of_contracts = Table(
-        title="[bold magenta]Epic Events Contracts[/bold magenta]",
+        title="[bold magenta]Epic Events Contracts[/bold magenta]" if show_title else None,
         title_style="white on orange_red1",
         title_justify="center",
         show_header=True,
@@ -161,17 +208,40 @@ def get_all_contracts(session: Session, user: User):
     )
     
     table_of_contracts.add_column("ID", justify="right", style="cyan")
-    table_of_contracts.add_column("Client ID", style="magenta")
+    table_of_contracts.add_column("Client", style="magenta")
+    table_of_contracts.add_column("Company", style="blue")
+    table_of_contracts.add_column("Sales Contact", style="cyan")
     table_of_contracts.add_column("Total Amount", style="green")
     table_of_contracts.add_column("Amount Due", style="yellow")
     table_of_contracts.add_column("Status", style="cyan")
-    
-    for contract in contracts:
-        status = "[green]Signed[/green]" if contract.signed else "[red]Not Signed[/red]"
-        table_of_contracts.add_row(str(contract.id), str(contract.client_id), str(contract.total_amount), str(contract.amount_due), status)
-    
-    console = Console()
-    console.print(table_of_contracts)
+    return table_of_contracts
+
+
+def get_all_contracts(session: Session, user: User, limit: int = None, page_size: int = DEFAULT_PAGE_SIZE):
+    """Retrieve the contracts the user may read (see scoping.py); only authorized roles can edit.
+    Rows are streamed and printed `page_size` at a time."""
+    console = get_console()
+    shown = 0
+
+    query = scope(session.query(Contract), user, Contract).options(*CONTRACT_VIEW_OPTIONS).order_by(Contract.id)
+    for page in _iter_pages(query, page_size, limit):
+        table_of_contracts = _contracts_list_table(show_title=shown == 0)
+        for contract in page:
+            table_of_contracts.add_row(
+                str(contract.id),
+                f"{contract.client.full_name} (#{contract.client_id})",
+                contract.client.company_name,
+                contract.sales_contact.full_name,
+                f"${contract.total_amount:,.2f}",
+                f"${contract.amount_due:,.2f}",
+                _contract_status(contract)
+            )
+        console.print(table_of_contracts)
+        shown += len(page)
+
+    if not shown:
+        print("[bold red]No contracts found.[/bold red]")
+        return
 
     if user.role_id in [1, 2]:  # Admin or Commercial can modify
         print("[bold green]You have permission to edit contracts.[/bold green]")
@@ -179,7 +249,20 @@ def get_all_contracts(session: Session, user: User):
         print("[bold red]Read-only access: You cannot modify contracts.[/bold red]")
         
 
-def add_event(session: Session, user: User, contract_id: int, support_contact: str, 
+def _is_support_user(session: Session, user_id: int) -> bool:
+    return session.query(User.id).filter(User.id == user_id, User.role_id == 3).first() is not None
+
+def _check_schedule(session: Session, support_contact_id: int, start_date: datetime, end_date: datetime,
+                    exclude_event_id: int = None) -> bool:
+    """Print an error and return False if the support contact has an overlapping event."""
+    overlap = find_overlap(session, support_contact_id, start_date, end_date, exclude_event_id)
+    if overlap:
+        print(f"[bold red]Error: The support contact already has event {overlap.id} from "
+              f"{overlap.start_date:%d/%m/%Y %H:%M} to {overlap.end_date:%d/%m/%Y %H:%M}.[/bold red]")
+        return False
+    return True
+
+def add_event(session: Session, user: User, contract_id: int, support_contact_id: int, 
               start_date: datetime, end_date: datetime, location: str, 
               attendees: int, notes: str = None):
     """Add a new event to the database with role-based access control."""
@@ -198,15 +281,24 @@ def add_event(session: Session, user: User, contract_id: int, support_contact: s
         print("[bold red]Error: Contract is not signed yet! Cannot create an event.[/bold red]")
         return
 
-    # 3. Date validation
+    # 3. Support contact validation
+    if support_contact_id is not None and not _is_support_user(session, support_contact_id):
+        print("[bold red]Error: Support contact ID is not a Support user.[/bold red]")
+        return
+
+    # 4. Date validation
     if start_date >= end_date:
         print("[bold red]Error: Start date must be before end date.[/bold red]")
         return
 
-    # 4. Event creation
+    # 5. Schedule check: a support contact can't be at two events at once
+    if support_contact_id is not None and not _check_schedule(session, support_contact_id, start_date, end_date):
+        return
+
+    # 6. Event creation
     new_event = Event(
         contract_id=contract_id,
-        support_contact=support_contact,
+        support_contact_id=support_contact_id,
         start_date=start_date,
         end_date=end_date,
         location=location,
@@ -223,15 +315,10 @@ def add_event(session: Session, user: User, contract_id: int, support_contact: s
         print(f"[bold red]Error creating event: {str(e)}[/bold red]")
 
     
-def get_all_events(session: Session, user: User):
-    """Retrieve all events from the database. Everyone can read, but only authorized roles can edit."""
-    events = session.query(Event).all()
-    if not events:
-        print("[bold yellow]No events found.[/bold yellow]")
-        return
-
+def _events_list_table(show_title: bool = True):
+    """Build an empty events table (the title is only shown on the first page)."""
     table_of_events = Table(
-        title="[bold blue]Epic Events[/bold blue]",
+        title="[bold blue]Epic Events[/bold blue]" if show_title else None,
         title_style="white on bright_white",
         title_justify="center",
         show_header=True,
@@ -241,29 +328,62 @@ def get_all_events(session: Session, user: User):
     
     table_of_events.add_column("ID", justify="right", style="cyan")
     table_of_events.add_column("Contract ID", style="magenta")
+    table_of_events.add_column("Client", style="magenta")
+    table_of_events.add_column("Company", style="blue")
+    table_of_events.add_column("Sales Contact", style="cyan")
+    table_of_events.add_column("Contract Status")
     table_of_events.add_column("Location", style="green")
     table_of_events.add_column("Attendees", style="yellow")
     table_of_events.add_column("Start Date", style="cyan")
     table_of_events.add_column("End Date", style="magenta")
     table_of_events.add_column("Notes", style="green")
-    
-    for event in events:
-        table_of_events.add_row(str(event.id), str(event.contract_id), event.location, str(event.attendees), str(event.start_date), str(event.end_date), event.notes)
-    
-    console = Console()
-    console.print(table_of_events)
+    return table_of_events
+
+
+def get_all_events(session: Session, user: User, limit: int = None, page_size: int = DEFAULT_PAGE_SIZE):
+    """Retrieve the events the user may read (see scoping.py); only authorized roles can edit.
+    Rows are streamed and printed `page_size` at a time."""
+    console = get_console()
+    shown = 0
+
+    query = scope(session.query(Event), user, Event).options(*EVENT_LIST_OPTIONS).order_by(Event.id)
+    for page in _iter_pages(query, page_size, limit):
+        table_of_events = _events_list_table(show_title=shown == 0)
+        for event in page:
+            contract = event.contract
+            table_of_events.add_row(
+                str(event.id), str(event.contract_id),
+                contract.client.full_name, contract.client.company_name, contract.sales_contact.full_name, _contract_status(contract),
+                event.location, str(event.attendees), str(event.start_date), str(event.end_date), event.notes
+            )
+        console.print(table_of_events)
+        shown += len(page)
+
+    if not shown:
+        print("[bold yellow]No events found.[/bold yellow]")
+        return
 
     if user.role_id in [1, 3, 4]:  # Admin, Support, or Gestion can modify
         print("[bold green]You have permission to edit events.[/bold green]")
     else:
         print("[bold red]Read-only access: You cannot modify events.[/bold red]")
 
+# Roles are reference data written only by init_db.py: read them once per
+# process, so a long-running shell doesn't query them for every command
+_role_names = None
+
+def get_role_names(session: Session) -> dict:
+    """Role id -> role name."""
+    global _role_names
+    if _role_names is None:
+        _role_names = dict(session.query(Role.id, Role.name).all())
+    return _role_names
+
 def create_user(session: Session, full_name: str, email: str, password: str, role_id: int):
     """Create a new user with a hashed password."""
     try:
         # Check if role exists
-        role = session.query(Role).filter(Role.id == role_id).first()
-        if not role:
+        if role_id not in get_role_names(session):
             print("[bold red]Error: Invalid role ID.[/bold red]")
             return
 
@@ -273,14 +393,14 @@ def create_user(session: Session, full_name: str, email: str, password: str, rol
         session.commit()
         
         # Log successful user creation
-        sentry_sdk.capture_message(
+        telemetry.capture_message(
             f"New user created: {full_name}",
             level="info"
         )
         print(f"[bold green]User '{full_name}' created successfully![/bold green]")
     except Exception as e:
         session.rollback()
-        sentry_sdk.capture_exception(e)
+        telemetry.capture_exception(e)
         raise
 
 
@@ -288,14 +408,14 @@ def authenticate_user(session: Session, email: str, password: str):
     """Authenticate a user and log failed attempts to Sentry."""
     user = session.query(User).filter(User.email == email).first()
     if user and user.check_password(password):
-        print(f"[bold green]Welcome, {user.full_name}![/bold green] (Role: {user.role.name})")
+        print(f"[bold green]Welcome, {user.full_name}![/bold green] (Role: {get_role_names(session)[user.role_id]})")
         return user
     else:
-        sentry_sdk.capture_message(f"Failed login attempt for {email}", level="warning")
+        telemetry.capture_message(f"Failed login attempt for {email}", level="warning")
         print("[bold red]Error: Invalid email or password![/bold red]")
         return None
 
-def update_contract(session: Session, user: User, contract_id: int, total_amount: float, amount_due: float, signed: bool):
+def update_contract(session: Session, user: User, contract_id: int, total_amount: Decimal, amount_due: Decimal, signed: bool):
     """Update contract details with role-based access control."""
     try:
         contract = session.query(Contract).filter(Contract.id == contract_id).first()
@@ -314,7 +434,7 @@ def update_contract(session: Session, user: User, contract_id: int, total_amount
         contract.updated_at = datetime.now(timezone.utc)
         
         if signed and not contract.signed:  # Contract is being signed
-            sentry_sdk.capture_message(
+            telemetry.capture_message(
                 f"Contract #{contract_id} signed",
                 level="info",
                 extras={
@@ -326,10 +446,10 @@ def update_contract(session: Session, user: User, contract_id: int, total_amount
         print(f"[bold green]Contract #{contract_id} updated successfully![/bold green]")
     except Exception as e:
         session.rollback()
-        sentry_sdk.capture_exception(e)
+        telemetry.capture_exception(e)
         raise
 
-def update_event(session: Session, user: User, event_id: int, support_contact: str = None, start_date: datetime = None, end_date: datetime = None, location: str = None, attendees: int = None, notes: str = None):
+def update_event(session: Session, user: User, event_id: int, support_contact_id: int = None, start_date: datetime = None, end_date: datetime = None, location: str = None, attendees: int = None, notes: str = None):
     """Update event details with role-based access control."""
     
     event = session.query(Event).filter(Event.id == event_id).first()
@@ -338,13 +458,27 @@ def update_event(session: Session, user: User, event_id: int, support_contact: s
         return
 
     # Only Admin or assigned Support can update
-    if user.role_id not in [1, 3] or (user.role_id == 3 and event.support_contact != user.full_name):
+    if user.role_id not in [1, 3] or (user.role_id == 3 and event.support_contact_id != user.id):
         print("[bold red]Error: You do not have permission to update this event.[/bold red]")
         return
 
+    if support_contact_id is not None and not _is_support_user(session, support_contact_id):
+        print("[bold red]Error: Support contact ID is not a Support user.[/bold red]")
+        return
+
+    new_start, new_end = start_date or event.start_date, end_date or event.end_date
+    if new_start >= new_end:
+        print("[bold red]Error: Start date must be before end date.[/bold red]")
+        return
+    new_support_contact_id = support_contact_id if support_contact_id is not None else event.support_contact_id
+    reschedule = (new_support_contact_id, new_start, new_end) != (event.support_contact_id, event.start_date, event.end_date)
+    if reschedule and new_support_contact_id is not None and not _check_schedule(
+            session, new_support_contact_id, new_start, new_end, exclude_event_id=event.id):
+        return
+
     # Update only provided fields
-    if support_contact:
-        event.support_contact = support_contact
+    if support_contact_id is not None:
+        event.support_contact_id = support_contact_id
     if start_date:
         event.start_date = start_date
     if end_date:
@@ -359,169 +493,177 @@ def update_event(session: Session, user: User, event_id: int, support_contact: s
     session.commit()
     print(f"[bold green]Event {event.id} updated successfully![/bold green]")
 
+# Sort keys of the paginated filters. Both end with the primary key, so the
+# order is total and a row can be identified by its key values alone.
+EVENT_PAGE_KEYS = (Event.start_date, Event.id)
+CONTRACT_PAGE_KEYS = (Contract.created_at, Contract.id)
+
+def encode_cursor(row, keys) -> str:
+    """Opaque cursor pointing just after `row` in the `keys` order."""
+    values = [getattr(row, key.key) for key in keys]
+    payload = [keys[0].table.name, *(v.isoformat() if isinstance(v, datetime) else v for v in values)]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, keys) -> list:
+    """Key values of a cursor made by encode_cursor; ValueError if it is not one for `keys`."""
+    try:
+        table, *values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if table != keys[0].table.name or len(values) != len(keys):
+            raise ValueError
+        return [
+            datetime.fromisoformat(value) if key.type.python_type is datetime else key.type.python_type(value)
+            for key, value in zip(keys, values)
+        ]
+    except (ValueError, TypeError, AttributeError):
+        raise ValueError(f"Invalid cursor: {cursor}") from None
+
+def keyset_query(query, keys, after: str = None):
+    """Order `query` by `keys`, starting after the row `after` points to.
+
+    Uses a row-value comparison, (a, b) > (?, ?), which the database answers
+    from an index on the keys, so a page deep into the results costs the same
+    as the first one (unlike OFFSET, which reads and skips every earlier row).
+    """
+    query = query.order_by(*keys)
+    if after:
+        values = decode_cursor(after, keys)
+        query = query.filter(tuple_(*keys) > tuple_(*[literal(v, key.type) for key, v in zip(keys, values)]))
+    return query
+
+def _fetch_page(query, keys, limit: int = None, after: str = None):
+    """Return (rows, cursor of the next page or None)."""
+    query = keyset_query(query, keys, after)
+    if not limit:
+        return query.all(), None
+    # One extra row tells whether there is a next page
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        return rows[:limit], encode_cursor(rows[limit - 1], keys)
+    return rows, None
+
+def _print_next_cursor(cursor: str):
+    if cursor:
+        # Never wrapped, so it can be copied or parsed from the output
+        get_console().print(f"[bold]More results:[/bold] --after {cursor}", soft_wrap=True)
+
+def build_events_query(session: Session, user: User, **filters):
+    """Build the events query for the given criteria, scoped to the user's role.
+
+    Each filter maps onto an index declared on `Event`, so keep them in sync
+    (see check_queries.py).
+    """
+    # Start with base query
+    query = session.query(Event)
+
+    # Apply filters based on provided parameters
+    if filters.get('event_id'):
+        query = query.filter(Event.id == filters['event_id'])
+    if filters.get('contract_id'):
+        query = query.filter(Event.contract_id == filters['contract_id'])
+    if filters.get('support_contact_id'):
+        query = query.filter(Event.support_contact_id == filters['support_contact_id'])
+    if filters.get('start_date'):
+        query = query.filter(Event.start_date >= filters['start_date'])
+    if filters.get('end_date'):
+        query = query.filter(Event.end_date <= filters['end_date'])
+    if filters.get('location'):
+        query = query.filter(Event.location.ilike(f"%{filters['location']}%"))
+    if filters.get('attendees'):
+        query = query.filter(Event.attendees == filters['attendees'])
+
+    # Gestion's view: the events still waiting for a support contact
+    if user.role_id == 4:
+        query = query.filter(Event.support_contact_id == None)
+
+    return scope(query, user, Event)
+
 def filter_events(user: User, session: Session,
                  event_id: int = None,
                  contract_id: int = None,
-                 support_contact: str = None,
+                 support_contact_id: int = None,
                  start_date: datetime = None,
                  end_date: datetime = None,
                  location: str = None,
-                 attendees: int = None):
+                 attendees: int = None,
+                 limit: int = None,
+                 after: str = None):
     """Filter events by any criteria with role-based access."""
-    try:
-        # Start with base query
-        query = session.query(Event)
-
-        # Apply filters based on provided parameters
-        if event_id:
-            query = query.filter(Event.id == event_id)
-        if contract_id:
-            query = query.filter(Event.contract_id == contract_id)
-        if support_contact:
-            query = query.filter(Event.support_contact == support_contact)
-        if start_date:
-            query = query.filter(Event.start_date >= start_date)
-        if end_date:
-            query = query.filter(Event.end_date <= end_date)
-        if location:
-            query = query.filter(Event.location.ilike(f"%{location}%"))
-        if attendees:
-            query = query.filter(Event.attendees == attendees)
-
-        # Role-based filtering
-        if user.role_id == 3:  # Support
-            query = query.filter(Event.support_contact == user.full_name)
-        elif user.role_id == 4:  # Gestion
-            query = query.filter(Event.support_contact == None)
-
-        events = query.all()
-        if not events:
-            print("[bold yellow]No events found with these criteria.[/bold yellow]")
-            return
-
-        _display_events_table(events)
+    filter_events_by_role(
+        session, user,
+        event_id=event_id,
+        contract_id=contract_id,
+        support_contact_id=support_contact_id,
+        start_date=start_date,
+        end_date=end_date,
+        location=location,
+        attendees=attendees,
+        limit=limit,
+        after=after
+    )
 
-    except Exception as e:
-        print(f"[bold red]Error filtering events: {str(e)}[/bold red]")
+def filter_events_by_role(session: Session, user: User, limit: int = None, after: str = None, **filters):
+    """Filter events by any criteria with role-based access.
 
-def filter_events_by_role(session: Session, user: User, **filters):
-    """Filter events by any criteria with role-based access."""
+    Events are sorted by start date. With `limit`, at most that many are shown
+    along with a cursor to pass as `after` for the next page.
+    """
     try:
-        # Start with base query
-        query = session.query(Event)
-
-        # Apply filters based on provided parameters
-        if filters.get('event_id'):
-            query = query.filter(Event.id == filters['event_id'])
-        if filters.get('contract_id'):
-            query = query.filter(Event.contract_id == filters['contract_id'])
-        if filters.get('support_contact'):
-            query = query.filter(Event.support_contact == filters['support_contact'])
-        if filters.get('start_date'):
-            query = query.filter(Event.start_date >= filters['start_date'])
-        if filters.get('end_date'):
-            query = query.filter(Event.end_date <= filters['end_date'])
-        if filters.get('location'):
-            query = query.filter(Event.location.ilike(f"%{filters['location']}%"))
-        if filters.get('attendees'):
-            query = query.filter(Event.attendees == filters['attendees'])
-
-        # Add role-based filtering
-        if user.role_id == 3:  # Support
-            query = query.filter(Event.support_contact == user.full_name)
-        elif user.role_id == 4:  # Gestion
-            query = query.filter(Event.support_contact == None)
-
-        events = query.all()
+        query = build_events_query(session, user, **filters).options(*EVENT_VIEW_OPTIONS)
+        events, next_cursor = _fetch_page(query, EVENT_PAGE_KEYS, limit, after)
         if not events:
             print("[bold yellow]No events found with these criteria.[/bold yellow]")
             return
 
         _display_events_table(events)
+        _print_next_cursor(next_cursor)
 
     except Exception as e:
         print(f"[bold red]Error filtering events: {str(e)}[/bold red]")
 
-def filter_contracts_by_role(session: Session, user: User):
-    """Filter contracts based on user role."""
-    
-    try:
-        if user.role_id == 1:  # Admin
-            print("[bold green]As Admin, you can see all event filters:[/bold green]")
-            # Show both unassigned and all events
-            unassigned_events = session.query(Event).filter(
-                Event.support_contact == None
-            ).all()
-            all_events = session.query(Event).all()
-            
-            if unassigned_events:
-                print("\n[bold yellow]Unassigned events:[/bold yellow]")
-                _display_events_table(unassigned_events)
-            
-            print("\n[bold yellow]All events:[/bold yellow]")
-            _display_events_table(all_events)
-            
-        elif user.role_id == 3:  # Support
-            events = session.query(Event).filter(
-                Event.support_contact == user.full_name
-            ).all()
-            if not events:
-                print("[bold yellow]No events assigned to you.[/bold yellow]")
-                return
-                
-            print(f"[bold green]Events assigned to {user.full_name}:[/bold green]")
-            _display_events_table(events)
-            
-        elif user.role_id == 4:  # Gestion
-            events = session.query(Event).filter(
-                Event.support_contact == None
-            ).all()
-            if not events:
-                print("[bold yellow]No unassigned events found.[/bold yellow]")
-                return
-                
-            print("[bold green]Unassigned events:[/bold green]")
-            _display_events_table(events)
-            
-        else:
-            print("[bold red]Error: Your role cannot filter events.[/bold red]")
-            
-    except Exception as e:
-        print(f"[bold red]Error filtering events: {str(e)}[/bold red]")
-
 def _display_events_table(events):
     """Helper function to display events in a table."""
     table = Table(show_header=True, header_style="bold magenta")
     table.add_column("ID", style="dim")
     table.add_column("Contract")
+    table.add_column("Client")
+    table.add_column("Company")
+    table.add_column("Sales Contact")
+    table.add_column("Contract Status")
     table.add_column("Support Contact")
     table.add_column("Start Date")
     table.add_column("Location")
     table.add_column("Attendees")
     
     for event in events:
+        contract = event.contract
         table.add_row(
             str(event.id),
             str(event.contract_id),
-            event.support_contact or "Unassigned",
+            contract.client.full_name,
+            contract.client.company_name,
+            contract.sales_contact.full_name,
+            _contract_status(contract),
+            event.support_contact.full_name if event.support_contact else "Unassigned",
             event.start_date.strftime("%d/%m/%Y"),  # Changed to French format
             event.location,
             str(event.attendees)
         )
     
-    console = Console()
+    console = get_console()
     console.print(table)
 
+def build_unsigned_contracts_query(session: Session, user: User):
+    """Build the unsigned contracts query, scoped to the contracts the user may read."""
+    return scope(session.query(Contract).filter(Contract.signed == False), user, Contract)
+
 def filter_contracts_by_role(session: Session, user: User):
     """Filter contracts based on user role."""
     try:
         if user.role_id == 1:  # Admin
             print("[bold green]As Admin, you can see all contract filters:[/bold green]")
             # Show both unsigned and all contracts
-            unsigned_contracts = session.query(Contract).filter(
-                Contract.signed == False
-            ).all()
-            all_contracts = session.query(Contract).all()
+            unsigned_contracts = build_unsigned_contracts_query(session, user).options(*CONTRACT_VIEW_OPTIONS).all()
+            all_contracts = scope(session.query(Contract), user, Contract).options(*CONTRACT_VIEW_OPTIONS).all()
             
             if unsigned_contracts:
                 print("\n[bold yellow]Unsigned contracts:[/bold yellow]")
@@ -531,10 +673,7 @@ def filter_contracts_by_role(session: Session, user: User):
             _display_contracts_table(all_contracts)
             
         elif user.role_id == 2:  # Commercial
-            contracts = session.query(Contract).filter(
-                Contract.signed == False,
-                Contract.sales_contact_id == user.id
-            ).all()
+            contracts = build_unsigned_contracts_query(session, user).options(*CONTRACT_VIEW_OPTIONS).all()
             
             if not contracts:
                 print("[bold yellow]No unsigned contracts found.[/bold yellow]")
@@ -552,66 +691,87 @@ def _display_contracts_table(contracts):
     """Helper function to display contracts in a table."""
     table = Table(show_header=True, header_style="bold magenta")
     table.add_column("ID", style="dim")
-    table.add_column("Client ID")
+    table.add_column("Client")
+    table.add_column("Company")
+    table.add_column("Sales Contact")
     table.add_column("Total Amount")
     table.add_column("Amount Due")
     table.add_column("Status")
     
     for contract in contracts:
-        status = "[green]Signed[/green]" if contract.signed else "[red]Not Signed[/red]"
         table.add_row(
             str(contract.id),
-            str(contract.client_id),
+            f"{contract.client.full_name} (#{contract.client_id})",
+            contract.client.company_name,
+            contract.sales_contact.full_name,
             f"${contract.total_amount:,.2f}",
             f"${contract.amount_due:,.2f}",
-            status
+            _contract_status(contract)
         )
     
-    console = Console()
+    console = get_console()
     console.print(table)
 
+def build_contracts_query(session: Session, user: User, **filters):
+    """Build the contracts query for the given criteria, scoped to the contracts the user may read."""
+    # Start with base query
+    query = session.query(Contract)
+
+    # Apply filters based on provided parameters
+    if filters.get('contract_id'):
+        query = query.filter(Contract.id == filters['contract_id'])
+    if filters.get('client_id'):
+        query = query.filter(Contract.client_id == filters['client_id'])
+    if filters.get('total_amount_min') is not None:
+        query = query.filter(Contract.total_amount >= filters['total_amount_min'])
+    if filters.get('total_amount_max') is not None:
+        query = query.filter(Contract.total_amount <= filters['total_amount_max'])
+    if filters.get('signed') is not None:
+        query = query.filter(Contract.signed == filters['signed'])
+    if filters.get('date_min'):
+        query = query.filter(Contract.created_at >= filters['date_min'])
+    if filters.get('date_max'):
+        query = query.filter(Contract.created_at <= filters['date_max'])
+
+    return scope(query, user, Contract)
+
 def filter_contracts(session: Session, user: User,
                     contract_id: int = None,
                     client_id: int = None,
-                    total_amount_min: float = None,
-                    total_amount_max: float = None,
+                    total_amount_min: Decimal = None,
+                    total_amount_max: Decimal = None,
                     signed: bool = None,
                     date_min: datetime = None,
-                    date_max: datetime = None):
-    """Filter contracts by any parameter."""
+                    date_max: datetime = None,
+                    limit: int = None,
+                    after: str = None):
+    """Filter contracts by any parameter.
+
+    Contracts are sorted by creation date. With `limit`, at most that many are
+    shown along with a cursor to pass as `after` for the next page.
+    """
     try:
-        # Start with base query
-        query = session.query(Contract)
-
-        # Apply filters based on provided parameters
-        if contract_id:
-            query = query.filter(Contract.id == contract_id)
-        if client_id:
-            query = query.filter(Contract.client_id == client_id)
-        if total_amount_min:
-            query = query.filter(Contract.total_amount >= total_amount_min)
-        if total_amount_max:
-            query = query.filter(Contract.total_amount <= total_amount_max)
-        if signed is not None:
-            query = query.filter(Contract.signed == signed)
-        if date_min:
-            query = query.filter(Contract.created_at >= date_min)
-        if date_max:
-            query = query.filter(Contract.created_at <= date_max)
-
-        # Role-based filtering
-        if user.role_id == 2:  # Commercial
-            query = query.filter(Contract.sales_contact_id == user.id)
-        elif user.role_id != 1:  # Not Admin
+        if user.role_id not in [1, 2]:  # Only Admin and Commercial
             print("[bold red]Error: Your role cannot filter contracts.[/bold red]")
             return
 
-        contracts = query.all()
+        query = build_contracts_query(
+            session, user,
+            contract_id=contract_id,
+            client_id=client_id,
+            total_amount_min=total_amount_min,
+            total_amount_max=total_amount_max,
+            signed=signed,
+            date_min=date_min,
+            date_max=date_max
+        ).options(*CONTRACT_VIEW_OPTIONS)
+        contracts, next_cursor = _fetch_page(query, CONTRACT_PAGE_KEYS, limit, after)
         if not contracts:
             print("[bold yellow]No contracts found with these criteria.[/bold yellow]")
             return
 
         _display_contracts_table(contracts)
+        _print_next_cursor(next_cursor)
 
     except Exception as e:
         print(f"[bold red]Error filtering contracts: {str(e)}[/bold red]")
@@ -630,6 +790,11 @@ def update_user_details(session: Session, user: User, target_email: str, **updat
             print("[bold red]Error: User not found.[/bold red]")
             return
 
+        # Validate before changing anything, so a rejected update leaves the session clean
+        if 'role_id' in updates and updates['role_id'] not in get_role_names(session):
+            print("[bold red]Error: Invalid role ID.[/bold red]")
+            return
+
         # Update fields
         if 'full_name' in updates:
             target_user.full_name = updates['full_name']
@@ -637,11 +802,19 @@ def update_user_details(session: Session, user: User, target_email: str, **updat
             target_user.email = updates['email']
         if 'password' in updates:
             target_user.set_password(updates['password'])
+        if 'role_id' in updates:
+            target_user.role_id = updates['role_id']
 
         session.commit()
 
+        # Clears the cache of this process's user (an Admin editing themselves).
+        # The edited user's own cache expires after IDENTITY_CACHE_TTL seconds;
+        # until they log in again, their token's role no longer matches the
+        # database, so their identity is then re-read on every command
+        invalidate_identity_cache()
+
         # Log to Sentry
-        sentry_sdk.capture_message(
+        telemetry.capture_message(
             f"User updated: {target_user.full_name}",
             level="info"
         )
@@ -650,5 +823,5 @@ def update_user_details(session: Session, user: User, target_email: str, **updat
         
     except Exception as e:
         session.rollback()
-        sentry_sdk.capture_exception(e)
+        telemetry.capture_exception(e)
         raise
@@ -0,0 +1,180 @@
+"""Local daemon: run CLI commands in a long-lived server process.
+
+`epic-events serve` listens on a Unix domain socket and runs the commands it
+receives through the Typer app, with the engine, connection pool and login
+kept loaded between them (as in the shell). The entry point forwards the
+read-only, non-interactive commands to it when it is running; everything
+else, or everything when no daemon answers, runs in-process as before.
+
+The client side only imports the standard library and epic_events.config
+(for the database it would use), so a forwarded command starts without
+loading Typer, SQLAlchemy or Sentry.
+"""
+import json
+import os
+import shutil
+import socket
+import sys
+from typing import Optional
+
+SOCKET_PATH = os.path.expanduser("~/.epic_events/daemon.sock")
+# Read-only commands that never prompt: output is all they produce
+FORWARDED_COMMANDS = {"list-clients", "list-contracts", "list-events", "filter-events", "filter-contracts", "search", "conflicts"}
+# The read-only `report` subcommands (`report rebuild-summary` writes, so it runs in-process)
+FORWARDED_REPORTS = {"sales", "clients", "monthly", "support"}
+# Set to any value to never forward (e.g. to compare both modes)
+NO_DAEMON_ENV = "EPIC_EVENTS_NO_DAEMON"
+
+
+def _receive(sock: socket.socket) -> bytes:
+    chunks = []
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+def is_forwarded(args: list) -> bool:
+    """Whether the command of `args` is one the daemon runs."""
+    if not args:
+        return False
+    if args[0] == "report":
+        return len(args) > 1 and args[1] in FORWARDED_REPORTS
+    return args[0] in FORWARDED_COMMANDS
+
+
+def forward(args: list) -> Optional[int]:
+    """Run `args` in the daemon and return its exit code, or None to run in-process."""
+    if not is_forwarded(args) or os.getenv(NO_DAEMON_ENV) or not os.path.exists(SOCKET_PATH):
+        return None
+    # With .env loaded and a relative SQLite path resolved from this directory
+    from epic_events.config import DATABASE_URL, absolute_database_url
+
+    request = {
+        "args": args,
+        # How the output should look in this terminal (the width honours COLUMNS)
+        "terminal": sys.stdout.isatty() or bool(os.getenv("FORCE_COLOR")),
+        "width": shutil.get_terminal_size().columns,
+        "term": os.getenv("TERM"),
+        "colorterm": os.getenv("COLORTERM"),
+        "no_color": bool(os.getenv("NO_COLOR")),
+        # The daemon refuses unless it uses exactly this database
+        "database_url": absolute_database_url(DATABASE_URL),
+    }
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(SOCKET_PATH)
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+            response = json.loads(_receive(sock))
+    except (OSError, ValueError):
+        # Stale socket, or the daemon stopped: these commands only read, so
+        # running them again in-process is safe
+        return None
+
+    if response["exit_code"] is None:
+        return None
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    return response["exit_code"]
+
+
+def main(args: list = None):
+    """Entry point: forward to the daemon when possible, else run the CLI in-process."""
+    args = sys.argv[1:] if args is None else args
+    exit_code = forward(args)
+    if exit_code is None:
+        from epic_events.cli import app
+        app(args=args, prog_name="epic-events")
+    sys.exit(exit_code)
+
+
+def _color_system(request: dict) -> Optional[str]:
+    """The colours the client's terminal supports, judged from its TERM and COLORTERM."""
+    term = request.get("term") or ""
+    if not request["terminal"] or term in ("dumb", "unknown"):
+        return None
+    if request.get("colorterm") in ("truecolor", "24bit"):
+        return "truecolor"
+    return "256" if "256color" in term else "standard"
+
+
+def _run_request(command, request: dict) -> dict:
+    """Run one forwarded command, capturing what it prints."""
+    import io
+    from contextlib import redirect_stderr, redirect_stdout
+
+    from epic_events.config import DATABASE_URL, absolute_database_url
+    from epic_events.console import redirect_console
+    from epic_events.shell import run_command
+
+    # The client runs it in-process instead, against its own database
+    if not is_forwarded(request["args"]) or request.get("database_url") != absolute_database_url(DATABASE_URL):
+        return {"exit_code": None}
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    # Everything the commands print goes through epic_events.console: point it
+    # at the buffers, formatted for the client's terminal. Plain click/typer
+    # output goes through sys.stdout and sys.stderr.
+    with redirect_console(stdout, stderr, force_terminal=request["terminal"], width=request["width"],
+                          color_system=_color_system(request), no_color=request.get("no_color", False)), \
+            redirect_stdout(stdout), redirect_stderr(stderr):
+        exit_code = run_command(command, request["args"])
+    return {"exit_code": exit_code, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+
+def _is_running() -> bool:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(SOCKET_PATH)
+        return True
+    except OSError:
+        return False
+
+
+def serve(app):
+    """Serve forwarded commands one at a time until interrupted (Ctrl-C or SIGTERM)."""
+    import signal
+    import socketserver
+
+    import typer
+    from rich import print
+
+    from epic_events.config import get_engine
+
+    if _is_running():
+        print(f"[bold red]Error: A daemon is already running on {SOCKET_PATH}[/bold red]")
+        raise typer.Exit(1)
+    if os.path.exists(SOCKET_PATH):  # left behind by a daemon that was killed
+        os.remove(SOCKET_PATH)
+
+    command = typer.main.get_command(app)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            line = self.rfile.readline()
+            if not line:  # a client checking whether the daemon is up
+                return
+            request = json.loads(line)
+            self.wfile.write(json.dumps(_run_request(command, request)).encode())
+
+    # Connect (and initialize Sentry) now rather than on the first request
+    get_engine().connect().close()
+
+    os.makedirs(os.path.dirname(SOCKET_PATH), exist_ok=True)
+    umask = os.umask(0o177)  # socket only usable by this user
+    try:
+        server = socketserver.UnixStreamServer(SOCKET_PATH, Handler)
+    finally:
+        os.umask(umask)
+
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"[bold green]Serving on {SOCKET_PATH}[/bold green] (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.remove(SOCKET_PATH)
@@ -0,0 +1,189 @@
+"""Idempotent schema upgrades for databases created by an older init_db.py.
+
+`Base.metadata.create_all` only creates missing tables, so anything added to an
+existing table (indexes, columns...) is applied here. Every step checks the
+current schema first and can safely be run again.
+"""
+from sqlalchemy import inspect, types
+
+from epic_events.config import Base, DEFAULT_BATCH_SIZE
+from epic_events.console import print
+from epic_events.models import ContractSummary
+from epic_events.reports import SUMMARY_TRIGGERS, install_summary
+from epic_events.search import install_search
+
+
+# Indexes created by earlier versions that a wider index now covers
+OBSOLETE_INDEXES = {"events": ["ix_events_support_contact_id_start"]}
+
+
+def create_missing_indexes(engine):
+    """Create the indexes declared on the models that the database lacks."""
+    inspector = inspect(engine)
+    created = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(engine)
+                created.append(index.name)
+    return created
+
+
+def drop_obsolete_indexes(engine):
+    """Drop the OBSOLETE_INDEXES the database still has; return their names."""
+    inspector = inspect(engine)
+    dropped = []
+    with engine.begin() as conn:
+        for table, names in OBSOLETE_INDEXES.items():
+            if not inspector.has_table(table):
+                continue
+            existing = {index["name"] for index in inspector.get_indexes(table)}
+            for name in names:
+                if name in existing:
+                    conn.exec_driver_sql(f"DROP INDEX {name}")
+                    dropped.append(name)
+    return dropped
+
+
+# Money columns that older databases store as floating point amounts
+MONEY_COLUMNS = {"contracts": ("total_amount", "amount_due")}
+
+
+def _convert_column_to_cents(engine, table: str, column: str, batch_size: int):
+    """Replace a float amount column by integer cents: add, backfill in batches, drop, rename.
+
+    Each batch is its own transaction, so the table is never locked for long;
+    if the upgrade stops halfway, running it again carries on from where it was.
+    """
+    cents = f"{column}_cents"
+    columns = {col["name"] for col in inspect(engine).get_columns(table)}
+    if cents not in columns:
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {cents} BIGINT NOT NULL DEFAULT 0")
+    if column in columns:
+        with engine.connect() as conn:
+            low, high = conn.exec_driver_sql(f"SELECT min(id), max(id) FROM {table}").one()
+        for start in range(low or 0, (high or -1) + 1, batch_size):
+            with engine.begin() as conn:
+                conn.exec_driver_sql(
+                    f"UPDATE {table} SET {cents} = CAST(round({column} * 100) AS BIGINT) "
+                    f"WHERE id >= {start} AND id < {start + batch_size}"
+                )
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"ALTER TABLE {table} DROP COLUMN {column}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"ALTER TABLE {table} RENAME COLUMN {cents} TO {column}")
+
+
+def convert_money_to_cents(engine, batch_size: int = DEFAULT_BATCH_SIZE):
+    """Store the contract amounts as integer cents; return the columns converted."""
+    inspector = inspect(engine)
+    pending = []
+    for table, money_columns in MONEY_COLUMNS.items():
+        if not inspector.has_table(table):
+            continue
+        columns = {col["name"]: col["type"] for col in inspector.get_columns(table)}
+        pending += [(table, column) for column in money_columns
+                    if f"{column}_cents" in columns or not isinstance(columns.get(column), types.Integer)]
+    if not pending:
+        return []
+
+    # The summary triggers read the amount columns, which cannot be dropped
+    # while they exist: drop them, and the summary table (it only holds totals
+    # computed from contracts). install_summary recreates both.
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            for name in SUMMARY_TRIGGERS:
+                conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+        ContractSummary.__table__.drop(conn, checkfirst=True)
+        ContractSummary.__table__.create(conn)
+
+    for table, column in pending:
+        _convert_column_to_cents(engine, table, column, batch_size)
+    return [f"{table}.{column}" for table, column in pending]
+
+
+def link_support_contacts(engine, batch_size: int = DEFAULT_BATCH_SIZE):
+    """Replace the events.support_contact names by support_contact_id, a foreign key to users.
+
+    Each name is matched to the user with that full name (a Support user
+    first). The name column is only dropped once every name was matched;
+    otherwise the unmatched names are returned, so the users can be created or
+    renamed and the upgrade run again. Returns None when there is nothing to do,
+    else (number of events linked, [unmatched names]).
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table("events"):
+        return None
+    columns = {col["name"] for col in inspector.get_columns("events")}
+    if "support_contact" not in columns:
+        return None
+
+    if "support_contact_id" not in columns:
+        with engine.begin() as conn:
+            conn.exec_driver_sql("ALTER TABLE events ADD COLUMN support_contact_id INTEGER REFERENCES users (id)")
+
+    with engine.connect() as conn:
+        low, high = conn.exec_driver_sql("SELECT min(id), max(id) FROM events").one()
+    linked = 0
+    for start in range(low or 0, (high or -1) + 1, batch_size):
+        with engine.begin() as conn:
+            linked += conn.exec_driver_sql(
+                "UPDATE events SET support_contact_id = ("
+                "    SELECT users.id FROM users WHERE users.full_name = events.support_contact"
+                "    ORDER BY users.role_id != 3, users.id LIMIT 1"
+                f") WHERE id >= {start} AND id < {start + batch_size} "
+                "AND support_contact IS NOT NULL AND support_contact_id IS NULL"
+            ).rowcount
+
+    with engine.begin() as conn:
+        linked -= conn.exec_driver_sql(
+            "SELECT count(*) FROM events WHERE support_contact IS NOT NULL AND support_contact_id IS NULL"
+        ).scalar()
+        unmatched = [row[0] for row in conn.exec_driver_sql(
+            "SELECT DISTINCT support_contact FROM events "
+            "WHERE support_contact IS NOT NULL AND support_contact_id IS NULL ORDER BY support_contact"
+        )]
+        if not unmatched:
+            if "ix_events_support_contact_start" in {index["name"] for index in inspector.get_indexes("events")}:
+                conn.exec_driver_sql("DROP INDEX ix_events_support_contact_start")
+            conn.exec_driver_sql("ALTER TABLE events DROP COLUMN support_contact")
+    return linked, unmatched
+
+
+def upgrade_database(engine):
+    """Bring an existing database up to date with the models."""
+    converted = convert_money_to_cents(engine)
+    if converted:
+        print(f"[bold green]Converted to integer cents: {', '.join(converted)}[/bold green]")
+
+    support = link_support_contacts(engine)
+    if support:
+        linked, unmatched = support
+        if linked:
+            print(f"[bold green]Linked {linked} events to their support contact's user.[/bold green]")
+        if not unmatched:
+            print("[bold green]Replaced events.support_contact by support_contact_id.[/bold green]")
+        else:
+            names = ", ".join(map(repr, unmatched[:10])) + (f" and {len(unmatched) - 10} more" if len(unmatched) > 10 else "")
+            print(f"[bold yellow]No user named {names}: events.support_contact is kept "
+                  f"until these names match a user. Create or rename the users, then run init_db.py again.[/bold yellow]")
+
+    # After the column changes, which the new indexes may cover
+    created = create_missing_indexes(engine)
+    if created:
+        print(f"[bold green]Created indexes: {', '.join(created)}[/bold green]")
+    dropped = drop_obsolete_indexes(engine)
+    if dropped:
+        print(f"[bold green]Dropped indexes: {', '.join(dropped)}[/bold green]")
+
+    created = install_search(engine)
+    if created:
+        print(f"[bold green]Created search indexes: {', '.join(created)}[/bold green]")
+
+    created = install_summary(engine)
+    if created:
+        print(f"[bold green]Created contract summary triggers: {', '.join(created)}[/bold green]")
@@ -1,8 +1,37 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Float, LargeBinary
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Boolean, ForeignKey, LargeBinary, Index
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
 from datetime import datetime, timezone
+from decimal import Decimal, ROUND_HALF_UP
 from .config import Base
-from werkzeug.security import generate_password_hash, check_password_hash
+
+CENT = Decimal("0.01")
+
+
+def to_money(value) -> Decimal:
+    """`value` (Decimal, int, float or str) as a Decimal rounded to the cent."""
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))  # str() so 0.1 becomes 0.1, not its binary approximation
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+class Money(TypeDecorator):
+    """An amount stored as integer cents and handled as a Decimal in Python.
+
+    Sums and comparisons run on integers in the database, so they are exact.
+    """
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return int(to_money(value) * 100)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return (Decimal(value) / 100).quantize(CENT)
 
 
 class Role(Base):
@@ -27,10 +56,12 @@ class User(Base):
 
     def set_password(self, password):
         """Hashes the password before storing it."""
+        from werkzeug.security import generate_password_hash  # imported on use, werkzeug is slow to import
         self.password_hash = generate_password_hash(password)
 
     def check_password(self, password):
         """Checks if the entered password is correct."""
+        from werkzeug.security import check_password_hash
         return check_password_hash(self.password_hash, password)
 
 
@@ -48,6 +79,9 @@ class Client(Base):
 
     sales_contact = relationship("User")  # Establish a relationship with User
 
+    __table_args__ = (
+        Index("ix_clients_sales_contact_id", "sales_contact_id"),
+    )
 
 
 class Contract(Base):
@@ -56,8 +90,8 @@ class Contract(Base):
     id = Column(Integer, primary_key=True)
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
     sales_contact_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Changed from String
-    total_amount = Column(Float, nullable=False)
-    amount_due = Column(Float, nullable=False)
+    total_amount = Column(Money, nullable=False)  # cents
+    amount_due = Column(Money, nullable=False)  # cents
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     signed = Column(Boolean, default=False)
@@ -65,6 +99,15 @@ class Contract(Base):
     client = relationship("Client", back_populates="contracts")
     sales_contact = relationship("User")  # Add relationship to User model
 
+    # Indexes matching the filters used in crud.py
+    __table_args__ = (
+        Index("ix_contracts_sales_contact_signed_created", "sales_contact_id", "signed", "created_at"),  # Commercial: own unsigned contracts
+        Index("ix_contracts_sales_contact_created", "sales_contact_id", "created_at"),  # Commercial: own contracts, in keyset order
+        Index("ix_contracts_signed_created", "signed", "created_at"),  # Admin: unsigned contracts
+        Index("ix_contracts_client_id", "client_id"),
+        Index("ix_contracts_created_at", "created_at"),  # date ranges
+    )
+
     def __repr__(self):
         return f"<Contract {self.id} | Client {self.client_id} | Signed: {self.signed}>"
 
@@ -77,7 +120,7 @@ class Event(Base):
 
     id = Column(Integer, primary_key=True)
     contract_id = Column(Integer, ForeignKey("contracts.id"), nullable=False)
-    support_contact = Column(String, nullable=True)  # id of the support contact
+    support_contact_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # Support user, None while unassigned
     start_date = Column(DateTime, nullable=False)
     end_date = Column(DateTime, nullable=False)
     location = Column(String, nullable=False)
@@ -85,9 +128,31 @@ class Event(Base):
     notes = Column(String, nullable=True)
 
     contract = relationship("Contract", back_populates="events")
+    support_contact = relationship("User")
+
+    # Indexes matching the filters used in crud.py
+    __table_args__ = (
+        # Support: own events, Gestion: unassigned; with end_date, covers the overlap checks (scheduling.py)
+        Index("ix_events_support_contact_schedule", "support_contact_id", "start_date", "end_date"),
+        Index("ix_events_contract_id", "contract_id"),
+        Index("ix_events_start_date", "start_date"),
+    )
 
     def __repr__(self):
         return f"<Event {self.id} | Contract {self.contract_id} | Location: {self.location}>"
 
 # Add this to the Contract model to establish the relationship
 Contract.events = relationship("Event", back_populates="contract", cascade="all, delete-orphan")
+
+
+class ContractSummary(Base):
+    """Contract totals per sales contact, kept up to date by triggers on `contracts` (see reports.py)."""
+    __tablename__ = "contract_summary"
+
+    sales_contact_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    contracts = Column(Integer, nullable=False, default=0)
+    signed = Column(Integer, nullable=False, default=0)
+    total_amount = Column(Money, nullable=False, default=0)
+    amount_due = Column(Money, nullable=False, default=0)
+
+    sales_contact = relationship("User")
@@ -0,0 +1,204 @@
+"""Per-command profiling helpers, enabled from the global CLI options.
+
+SQLProfiler listens to SQLAlchemy engine events and aggregates, per statement
+fingerprint (the SQL with literals and IN lists collapsed), how many times it
+ran, how long the database took and how many rows it changed (INSERT,
+UPDATE and DELETE rowcount; rows returned by SELECTs are not counted, as
+that would take wrapping SQLAlchemy's private result internals).
+
+PythonProfiler runs the command under cProfile (saved as .pstats) and samples
+the main thread's stack in the background to write collapsed stacks, the
+input format of flamegraph.pl, speedscope and similar tools.
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from rich.table import Table
+
+from epic_events.console import get_console
+
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+))+\s*\)")
+
+
+def fingerprint(statement: str) -> str:
+    """Normalize a SQL statement so executions with different values group together."""
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    statement = _STRING.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    return _PLACEHOLDER_LIST.sub("(?, ...)", statement)
+
+
+class SQLProfiler:
+    """Collect statement counts, timings and row counts from every engine."""
+
+    def __init__(self):
+        self.stats = {}
+        self.started_at = None
+        self.elapsed_ms = 0.0
+
+    def start(self):
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        self.started_at = time.perf_counter()
+        event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def stop(self):
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        event.remove(Engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(Engine, "after_cursor_execute", self._after_cursor_execute)
+        self.elapsed_ms = (time.perf_counter() - self.started_at) * 1000
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profile_sql_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = (time.perf_counter() - conn.info["profile_sql_start"].pop()) * 1000
+        key = fingerprint(statement)
+        stats = self.stats.setdefault(key, {"count": 0, "total_ms": 0.0, "rows_changed": 0})
+        stats["count"] += 1
+        stats["total_ms"] += elapsed
+        # The DBAPI rowcount of INSERT/UPDATE/DELETE (-1 or 0 for SELECTs)
+        if cursor.description is None and cursor.rowcount > 0:
+            stats["rows_changed"] += cursor.rowcount
+
+    def summary(self):
+        """Statements sorted by total time, as a list of dicts."""
+        rows = [
+            {
+                "fingerprint": key,
+                "count": stats["count"],
+                "total_ms": round(stats["total_ms"], 3),
+                "avg_ms": round(stats["total_ms"] / stats["count"], 3),
+                "rows_changed": stats["rows_changed"],
+            }
+            for key, stats in self.stats.items()
+        ]
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    def print_summary(self, command: str = None, width: int = 90):
+        """Print the summary table to stderr, so command output can still be piped."""
+        summary = self.summary()
+        table = Table(
+            title=f"SQL profile: {command or 'command'}",
+            show_header=True,
+            header_style="bold magenta",
+            caption=f"{sum(row['count'] for row in summary)} statements, "
+                    f"{sum(row['total_ms'] for row in summary):.1f} ms in the database, "
+                    f"{self.elapsed_ms:.1f} ms total"
+        )
+        table.add_column("Statement", overflow="fold", max_width=width)
+        table.add_column("Count", justify="right")
+        table.add_column("Total (ms)", justify="right")
+        table.add_column("Avg (ms)", justify="right")
+        table.add_column("Rows Changed", justify="right")
+        for row in summary:
+            table.add_row(row["fingerprint"], str(row["count"]), f"{row['total_ms']:.2f}", f"{row['avg_ms']:.2f}", str(row["rows_changed"]))
+        get_console(stderr=True).print(table)
+
+    def write_json(self, path: str, command: str = None):
+        """Append this run's summary as one JSON line, for tracking trends over time."""
+        summary = self.summary()
+        record = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "command": command,
+            "statements": sum(row["count"] for row in summary),
+            "db_ms": round(sum(row["total_ms"] for row in summary), 3),
+            "elapsed_ms": round(self.elapsed_ms, 3),
+            "queries": summary,
+        }
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+class _StackSampler(threading.Thread):
+    """Sample a thread's Python stack every `interval` seconds."""
+
+    def __init__(self, thread_id: int, interval: float = 0.001):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+class PythonProfiler:
+    """cProfile plus a stack sampler around one command."""
+
+    def __init__(self, sample_interval: float = 0.001):
+        import cProfile
+
+        self.profile = cProfile.Profile()
+        self.sampler = _StackSampler(threading.get_ident(), sample_interval)
+
+    def start(self):
+        self.sampler.start()
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+        self.sampler.stop()
+
+    def write(self, prefix: str):
+        """Write <prefix>.pstats and <prefix>.collapsed; return both paths."""
+        pstats_path, collapsed_path = f"{prefix}.pstats", f"{prefix}.collapsed"
+        self.profile.dump_stats(pstats_path)
+        with open(collapsed_path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.sampler.stacks.items()):
+                f.write(f"{stack} {count}\n")
+        return pstats_path, collapsed_path
+
+    def hotspots(self, top: int = 15):
+        """Functions with the most time spent in their own code."""
+        import pstats
+
+        stats = pstats.Stats(self.profile).stats
+        rows = [
+            {
+                "function": f"{func} ({os.path.basename(filename)}:{line})",
+                "calls": calls,
+                "own_ms": own * 1000,
+                "cumulative_ms": cumulative * 1000,
+            }
+            for (filename, line, func), (_, calls, own, cumulative, _) in stats.items()
+        ]
+        return sorted(rows, key=lambda row: row["own_ms"], reverse=True)[:top]
+
+    def print_hotspots(self, command: str = None, top: int = 15):
+        """Print the top hotspots to stderr."""
+        table = Table(title=f"Python hotspots: {command or 'command'}", show_header=True, header_style="bold magenta")
+        table.add_column("Function", overflow="fold")
+        table.add_column("Calls", justify="right")
+        table.add_column("Own (ms)", justify="right")
+        table.add_column("Cumulative (ms)", justify="right")
+        for row in self.hotspots(top):
+            table.add_row(row["function"], str(row["calls"]), f"{row['own_ms']:.2f}", f"{row['cumulative_ms']:.2f}")
+        get_console(stderr=True).print(table)
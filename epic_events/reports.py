@@ -0,0 +1,251 @@
+"""Aggregate reports on contracts and events.
+
+Reports cover the contracts and events the user may read (see scoping.py).
+Every figure is computed by the database with GROUP BY, so a report reads
+one row per group instead of loading every Contract/Event object.
+
+The per sales contact figures can also be read from `contract_summary`,
+which SQLite triggers on `contracts` keep up to date on every insert, update
+and delete: dashboards polling that report then read a handful of rows
+instead of rescanning the contracts table.
+"""
+from rich.table import Table
+from sqlalchemy import case, func, select, text
+from sqlalchemy.orm import Session
+
+from epic_events.console import get_console, print
+from epic_events.models import Client, Contract, ContractSummary, Event, User
+from epic_events.scoping import is_scoped, scope
+
+_SUMMARY_UPSERT = """
+    INSERT INTO contract_summary (sales_contact_id, contracts, signed, total_amount, amount_due)
+    VALUES (new.sales_contact_id, 1, coalesce(new.signed, 0), new.total_amount, new.amount_due)
+    ON CONFLICT (sales_contact_id) DO UPDATE SET
+        contracts = contracts + 1,
+        signed = signed + excluded.signed,
+        total_amount = total_amount + excluded.total_amount,
+        amount_due = amount_due + excluded.amount_due;
+"""
+_SUMMARY_SUBTRACT = """
+    UPDATE contract_summary SET
+        contracts = contracts - 1,
+        signed = signed - coalesce(old.signed, 0),
+        total_amount = total_amount - old.total_amount,
+        amount_due = amount_due - old.amount_due
+    WHERE sales_contact_id = old.sales_contact_id;
+"""
+SUMMARY_TRIGGERS = {
+    "contract_summary_ai": f"AFTER INSERT ON contracts BEGIN {_SUMMARY_UPSERT} END",
+    "contract_summary_ad": f"AFTER DELETE ON contracts BEGIN {_SUMMARY_SUBTRACT} END",
+    "contract_summary_au": (
+        "AFTER UPDATE OF sales_contact_id, signed, total_amount, amount_due ON contracts "
+        f"BEGIN {_SUMMARY_SUBTRACT} {_SUMMARY_UPSERT} END"
+    ),
+}
+
+REBUILD_SUMMARY_SQL = """
+    INSERT INTO contract_summary (sales_contact_id, contracts, signed, total_amount, amount_due)
+    SELECT sales_contact_id, count(*), sum(coalesce(signed, 0)), sum(total_amount), sum(amount_due)
+    FROM contracts GROUP BY sales_contact_id
+"""
+
+
+def install_summary(engine):
+    """Create the triggers maintaining contract_summary (SQLite only); return the ones created.
+
+    When triggers are added, the summary is rebuilt from the existing contracts.
+    """
+    if engine.dialect.name != "sqlite":
+        return []
+    created = []
+    with engine.begin() as conn:
+        existing = {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'"))}
+        for name, body in SUMMARY_TRIGGERS.items():
+            if name not in existing:
+                conn.exec_driver_sql(f"CREATE TRIGGER {name} {body}")
+                created.append(name)
+    if created:
+        rebuild_summary(engine)
+    return created
+
+
+def rebuild_summary(engine):
+    """Recompute contract_summary from the contracts table."""
+    with engine.begin() as conn:
+        conn.execute(ContractSummary.__table__.delete())
+        conn.exec_driver_sql(REBUILD_SUMMARY_SQL)
+
+
+def _month(session: Session, column):
+    """`column` truncated to its month, as 'YYYY-MM'."""
+    if session.get_bind().dialect.name == "sqlite":
+        return func.strftime("%Y-%m", column)
+    return func.to_char(column, "YYYY-MM")
+
+
+def _signed_count():
+    return func.sum(case((Contract.signed == True, 1), else_=0))
+
+
+def sales_contact_totals_query(session: Session, user):
+    """Contracts, signed contracts, total and remaining amount per sales contact."""
+    totals = scope(
+        select(
+            Contract.sales_contact_id,
+            func.count().label("contracts"),
+            _signed_count().label("signed"),
+            func.sum(Contract.total_amount).label("total_amount"),
+            func.sum(Contract.amount_due).label("amount_due"),
+        )
+        .group_by(Contract.sales_contact_id),
+        user, Contract,
+    ).subquery()
+    return (
+        select(User.full_name, totals.c.contracts, totals.c.signed, totals.c.total_amount, totals.c.amount_due)
+        .join(totals, totals.c.sales_contact_id == User.id)
+        .order_by(totals.c.total_amount.desc())
+    )
+
+
+def sales_contact_summary_query(session: Session):
+    """Same columns as sales_contact_totals_query, read from contract_summary."""
+    return (
+        select(User.full_name, ContractSummary.contracts, ContractSummary.signed,
+               ContractSummary.total_amount, ContractSummary.amount_due)
+        .join(ContractSummary, ContractSummary.sales_contact_id == User.id)
+        .where(ContractSummary.contracts > 0)
+        .order_by(ContractSummary.total_amount.desc())
+    )
+
+
+def client_totals_query(session: Session, user, limit: int = None):
+    """Contracts, total and remaining amount per client, largest first."""
+    totals = scope(
+        select(
+            Contract.client_id,
+            func.count().label("contracts"),
+            _signed_count().label("signed"),
+            func.sum(Contract.total_amount).label("total_amount"),
+            func.sum(Contract.amount_due).label("amount_due"),
+        )
+        .group_by(Contract.client_id)
+        .order_by(func.sum(Contract.total_amount).desc())
+        .limit(limit),
+        user, Contract,
+    ).subquery()
+    return (
+        select(Client.full_name, Client.company_name, totals.c.contracts, totals.c.signed,
+               totals.c.total_amount, totals.c.amount_due)
+        .join(totals, totals.c.client_id == Client.id)
+        .order_by(totals.c.total_amount.desc())
+    )
+
+
+def monthly_totals_query(session: Session, user, months: int = None):
+    """Contracts signed/unsigned and amounts per creation month, latest first."""
+    month = _month(session, Contract.created_at).label("month")
+    query = scope(
+        select(
+            month,
+            func.count().label("contracts"),
+            _signed_count().label("signed"),
+            func.sum(Contract.total_amount).label("total_amount"),
+            func.sum(Contract.amount_due).label("amount_due"),
+        )
+        .group_by(month)
+        .order_by(month.desc()),
+        user, Contract,
+    )
+    return query.limit(months) if months else query
+
+
+def support_totals_query(session: Session, user):
+    """Events, attendees and upcoming events per support contact (unassigned last)."""
+    from datetime import datetime
+
+    upcoming = func.sum(case((Event.start_date >= datetime.now(), 1), else_=0))
+    totals = scope(
+        select(
+            Event.support_contact_id,
+            func.count().label("events"),
+            func.sum(Event.attendees).label("attendees"),
+            upcoming.label("upcoming"),
+        )
+        .group_by(Event.support_contact_id),
+        user, Event,
+    ).subquery()
+    return (
+        select(User.full_name, totals.c.events, totals.c.attendees, totals.c.upcoming)
+        .select_from(totals)
+        .outerjoin(User, User.id == totals.c.support_contact_id)
+        .order_by(totals.c.support_contact_id.is_(None), totals.c.events.desc())
+    )
+
+
+def _money(value) -> str:
+    return f"${value or 0:,.2f}"
+
+
+def _rate(signed, contracts) -> str:
+    return f"{signed / contracts:.0%}" if contracts else "-"
+
+
+def _contracts_table(title: str, first_columns):
+    table = Table(title=f"[bold blue]{title}[/bold blue]", show_header=True, header_style="bold magenta")
+    for column in first_columns:
+        table.add_column(column)
+    table.add_column("Contracts", justify="right")
+    table.add_column("Signed", justify="right")
+    table.add_column("Unsigned", justify="right")
+    table.add_column("Signing Rate", justify="right")
+    table.add_column("Total Amount", justify="right", style="green")
+    table.add_column("Remaining", justify="right", style="yellow")
+    return table
+
+
+def _add_contract_row(table, first_values, contracts, signed, total_amount, amount_due):
+    table.add_row(*first_values, str(contracts), str(signed), str(contracts - signed),
+                  _rate(signed, contracts), _money(total_amount), _money(amount_due))
+
+
+def report_sales(session: Session, user, from_summary: bool = False):
+    """Print totals per sales contact."""
+    if from_summary and session.get_bind().dialect.name != "sqlite":
+        print("[bold yellow]The summary table is only maintained on SQLite: computing live totals.[/bold yellow]")
+        from_summary = False
+    if from_summary and is_scoped(user):
+        print("[bold yellow]The summary table covers every contract: computing the totals of yours.[/bold yellow]")
+        from_summary = False
+    query = sales_contact_summary_query(session) if from_summary else sales_contact_totals_query(session, user)
+    table = _contracts_table("Contracts per sales contact", ["Sales Contact"])
+    for name, contracts, signed, total_amount, amount_due in session.execute(query):
+        _add_contract_row(table, [name], contracts, signed, total_amount, amount_due)
+    get_console().print(table)
+
+
+def report_clients(session: Session, user, limit: int = None):
+    """Print totals per client, largest first."""
+    table = _contracts_table("Contracts per client", ["Client", "Company"])
+    for name, company, contracts, signed, total_amount, amount_due in session.execute(client_totals_query(session, user, limit)):
+        _add_contract_row(table, [name, company], contracts, signed, total_amount, amount_due)
+    get_console().print(table)
+
+
+def report_monthly(session: Session, user, months: int = None):
+    """Print totals per month of creation."""
+    table = _contracts_table("Contracts per month", ["Month"])
+    for month, contracts, signed, total_amount, amount_due in session.execute(monthly_totals_query(session, user, months)):
+        _add_contract_row(table, [month or "Unknown"], contracts, signed, total_amount, amount_due)
+    get_console().print(table)
+
+
+def report_support(session: Session, user):
+    """Print event counts and attendees per support contact."""
+    table = Table(title="[bold blue]Events per support contact[/bold blue]", show_header=True, header_style="bold magenta")
+    table.add_column("Support Contact")
+    table.add_column("Events", justify="right")
+    table.add_column("Upcoming", justify="right")
+    table.add_column("Attendees", justify="right", style="green")
+    for support_contact, events, attendees, upcoming in session.execute(support_totals_query(session, user)):
+        table.add_row(support_contact or "Unassigned", str(events), str(upcoming), f"{attendees or 0:,}")
+    get_console().print(table)
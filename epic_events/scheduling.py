@@ -0,0 +1,295 @@
+"""Scheduling: events of the same support contact must not overlap in time.
+
+Two events overlap when each starts before the other ends (an event ending
+at 12:00 and one starting at 12:00 do not).
+
+- On write, `find_overlap` looks for one event of the support contact that
+  overlaps the new dates. It reads a range of the
+  (support_contact_id, start_date, end_date) index, not the table.
+- Imports check many rows at once against a `Timeline` per support contact,
+  built from one range query per batch, in O(log n) per row.
+- The `conflicts` audit streams every assigned event in that index order and
+  sweeps each support contact's events by start date, keeping the events
+  still running in a heap ordered by end date. That costs O(n log n + k) for
+  n events and k overlapping pairs, instead of comparing every pair.
+- `auto-assign` gives unassigned events to Support users with a greedy
+  interval scheduling pass that never creates such an overlap.
+"""
+import heapq
+from bisect import bisect_left
+from datetime import datetime
+from typing import Iterable, Iterator, Optional, Tuple
+
+from rich.table import Table
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from epic_events.config import DEFAULT_BATCH_SIZE, DEFAULT_PAGE_SIZE
+from epic_events.console import get_console, print
+from epic_events.models import Event, User
+from epic_events.scoping import scope
+
+# (event id, support contact id, start, end)
+Interval = Tuple[int, int, datetime, datetime]
+
+
+def find_overlap(session: Session, support_contact_id: int, start_date: datetime, end_date: datetime,
+                 exclude_event_id: int = None) -> Optional[Event]:
+    """An event of `support_contact_id` overlapping [start_date, end_date), or None."""
+    query = session.query(Event).filter(
+        Event.support_contact_id == support_contact_id,
+        Event.start_date < end_date,
+        Event.end_date > start_date,
+    )
+    if exclude_event_id is not None:
+        query = query.filter(Event.id != exclude_event_id)
+    return query.order_by(Event.start_date).first()
+
+
+class Timeline:
+    """Intervals of one support contact, answering "what overlaps [start, end)?" in O(log n).
+
+    Intervals are kept sorted by start along with the running maximum of
+    their ends, so intervals that overlap each other (conflicts already in the
+    database) are handled too. `add` only takes intervals that overlap
+    nothing, which leaves the running maximum of the later ones unchanged.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[datetime, datetime, object]] = ()):
+        self.starts, self.max_ends, self.labels = [], [], []  # labels: of the interval reaching max_ends
+        for start, end, label in sorted(intervals, key=lambda interval: interval[:2]):
+            if self.max_ends and self.max_ends[-1] >= end:
+                end, label = self.max_ends[-1], self.labels[-1]
+            self.starts.append(start)
+            self.max_ends.append(end)
+            self.labels.append(label)
+
+    def overlap(self, start: datetime, end: datetime):
+        """The label of an interval overlapping [start, end), or None."""
+        i = bisect_left(self.starts, end)  # intervals [0, i) start before `end`
+        if i and self.max_ends[i - 1] > start:
+            return self.labels[i - 1]
+        return None
+
+    def add(self, start: datetime, end: datetime, label):
+        """Add an interval for which `overlap` returned None."""
+        i = bisect_left(self.starts, start)
+        self.starts.insert(i, start)
+        self.max_ends.insert(i, end)
+        self.labels.insert(i, label)
+
+
+def overlapping_pairs(intervals: Iterable[Interval]) -> Iterator[Tuple[Interval, Interval]]:
+    """Yield every pair of overlapping intervals of the same support contact.
+
+    `intervals` must be sorted by (support contact, start). Only the intervals
+    still running at the current start are kept, so memory is bounded by the
+    largest number of simultaneous events, not by the number of events.
+    """
+    running = []  # heap of (end, interval) for the current support contact
+    current = None
+    for interval in intervals:
+        _, contact, start, end = interval
+        if contact != current:
+            running, current = [], contact
+        while running and running[0][0] <= start:
+            heapq.heappop(running)
+        for _, other in running:
+            yield other, interval
+        heapq.heappush(running, (end, interval))
+
+
+def assigned_intervals(session: Session, user=None, batch_size: int = DEFAULT_BATCH_SIZE,
+                       support_contact_ids: Iterable[int] = None) -> Iterator[Interval]:
+    """Stream the assigned events `user` may read, in (support contact, start) order.
+
+    With `support_contact_ids`, only the events of those support contacts.
+    """
+    query = (
+        select(Event.id, Event.support_contact_id, Event.start_date, Event.end_date)
+        .where(Event.support_contact_id != None)
+        .order_by(Event.support_contact_id, Event.start_date, Event.id)
+        .execution_options(yield_per=batch_size)
+    )
+    if support_contact_ids is not None:
+        query = query.where(Event.support_contact_id.in_(support_contact_ids))
+    if user is not None:
+        query = scope(query, user, Event)
+    for row in session.execute(query):
+        yield tuple(row)
+
+
+def find_conflicts(session: Session, user=None,
+                   support_contact_ids: Iterable[int] = None) -> Iterator[Tuple[Interval, Interval]]:
+    """Stream every overlapping pair of events (as Interval tuples) among the events `user` may read."""
+    return overlapping_pairs(assigned_intervals(session, user, support_contact_ids=support_contact_ids))
+
+
+def _format(date: datetime) -> str:
+    return date.strftime("%d/%m/%Y %H:%M")
+
+
+def _conflicts_table(show_title: bool = True):
+    table = Table(title="[bold red]Scheduling conflicts[/bold red]" if show_title else None,
+                  show_header=True, header_style="bold magenta")
+    table.add_column("Support Contact")
+    table.add_column("Event", justify="right")
+    table.add_column("From - To")
+    table.add_column("Overlaps Event", justify="right")
+    table.add_column("From - To")
+    return table
+
+
+def show_conflicts(session: Session, user, limit: int = None, page_size: int = DEFAULT_PAGE_SIZE):
+    """Print the overlapping pairs of events per support contact, `page_size` at a time.
+
+    Pairs are printed as the sweep finds them, so the first ones appear
+    immediately and memory use does not grow with their number.
+    """
+    console = get_console()
+    names = dict(session.execute(select(User.id, User.full_name)).all())
+    shown = total = 0
+    table = _conflicts_table()
+    for first, second in find_conflicts(session, user):
+        total += 1
+        if limit and shown >= limit:
+            continue  # keep counting
+        table.add_row(
+            names.get(first[1], str(first[1])),
+            str(first[0]), f"{_format(first[2])} - {_format(first[3])}",
+            str(second[0]), f"{_format(second[2])} - {_format(second[3])}",
+        )
+        shown += 1
+        if shown % page_size == 0:
+            console.print(table)
+            table = _conflicts_table(show_title=False)
+    if table.row_count:
+        console.print(table)
+
+    if not total:
+        print("[bold green]No scheduling conflicts.[/bold green]")
+    elif total > shown:
+        print(f"[bold red]{total} scheduling conflicts[/bold red] ({total - shown} not shown)")
+    else:
+        print(f"[bold red]{total} scheduling conflicts[/bold red]")
+
+
+def plan_assignments(events: Iterable[Tuple[int, datetime, datetime]], support_ids: Iterable[int],
+                     busy: dict = None, load: dict = None) -> dict:
+    """Greedily assign events to support contacts without overlaps, balancing their load.
+
+    `events` are (id, start, end) sorted by start. `busy` maps a support
+    contact to the (start, end) of the events they already have, sorted by
+    start; `load` to how many they already have. Each event goes to the least
+    loaded support contact who is free for its whole duration, so the load
+    stays even and nobody gets two events at once. Returns {event id:
+    support contact id}; events nobody is free for are left out.
+
+    Contacts wait in two heaps: the free ones by (load, id) and the busy ones
+    by the time they become free, so each event costs O(log m) for m support
+    contacts, plus the events already assigned it skips.
+    """
+    busy = busy or {}
+    load = dict.fromkeys(support_ids, 0) | (load or {})
+    position = dict.fromkeys(load, 0)  # first busy interval of each contact not yet over
+    free = [(count, contact) for contact, count in load.items()]
+    heapq.heapify(free)
+    waiting = []  # (free from, contact)
+    plan = {}
+
+    for event_id, start, end in events:
+        while waiting and waiting[0][0] <= start:
+            _, contact = heapq.heappop(waiting)
+            heapq.heappush(free, (load[contact], contact))
+        while free:
+            _, contact = heapq.heappop(free)
+            intervals = busy.get(contact, ())
+            i = position[contact]
+            while i < len(intervals) and intervals[i][1] <= start:
+                i += 1
+            position[contact] = i
+            if i < len(intervals) and intervals[i][0] < end:
+                # Already has an event then: free again when it ends
+                heapq.heappush(waiting, (intervals[i][1], contact))
+                continue
+            plan[event_id] = contact
+            load[contact] += 1
+            heapq.heappush(waiting, (end, contact))
+            break
+    return plan
+
+
+def auto_assign(session: Session, user, since: datetime = None, until: datetime = None, dry_run: bool = False):
+    """Assign the unassigned events starting in [since, until) to Support users.
+
+    The plan (see plan_assignments) is written with a single executemany
+    UPDATE in one transaction; an event assigned meanwhile by someone else is
+    left as it is.
+    """
+    if user.role_id not in [1, 4]:  # Admin and Gestion assign events
+        print("[bold red]Error: Only Admin and Gestion can assign events.[/bold red]")
+        return
+
+    window = []
+    if since:
+        window.append(Event.start_date >= since)
+    if until:
+        window.append(Event.start_date < until)
+    events = session.execute(
+        select(Event.id, Event.start_date, Event.end_date)
+        .where(Event.support_contact_id == None, *window)
+        .order_by(Event.start_date, Event.id)
+    ).all()
+    if not events:
+        print("[bold yellow]No unassigned events in this window.[/bold yellow]")
+        return
+
+    supports = dict(session.execute(select(User.id, User.full_name).where(User.role_id == 3)).all())
+    if not supports:
+        print("[bold red]Error: There are no Support users to assign events to.[/bold red]")
+        return
+
+    # What each support contact already has during the window
+    first_start, last_end = events[0][1], max(end for _, _, end in events)
+    busy, load = {}, dict.fromkeys(supports, 0)
+    for contact, start, end in session.execute(
+        select(Event.support_contact_id, Event.start_date, Event.end_date)
+        .where(Event.support_contact_id.in_(supports), Event.start_date < last_end, Event.end_date > first_start)
+        .order_by(Event.support_contact_id, Event.start_date)
+    ):
+        busy.setdefault(contact, []).append((start, end))
+        load[contact] += 1
+
+    plan = plan_assignments(events, supports, busy, load)
+
+    table = Table(title="[bold blue]Assignments[/bold blue]" + (" (dry run)" if dry_run else ""),
+                  show_header=True, header_style="bold magenta")
+    table.add_column("Support Contact")
+    table.add_column("New Events", justify="right")
+    table.add_column("Events in Window", justify="right")
+    assigned = {contact: 0 for contact in supports}
+    for contact in plan.values():
+        assigned[contact] += 1
+    for contact, name in sorted(supports.items(), key=lambda item: item[1]):
+        table.add_row(name, str(assigned[contact]), str(load[contact] + assigned[contact]))
+    get_console().print(table)
+
+    left = len(events) - len(plan)
+    if left:
+        print(f"[bold yellow]{left} events could not be assigned: every Support user is busy then.[/bold yellow]")
+    if dry_run:
+        print(f"[bold]Dry run:[/bold] {len(plan)} of {len(events)} events would be assigned, nothing was written.")
+        return
+    if not plan:
+        return
+
+    statement = (
+        update(Event.__table__)
+        .where(Event.__table__.c.id == bindparam("event_id"), Event.__table__.c.support_contact_id == None)
+        .values(support_contact_id=bindparam("contact_id"))
+    )
+    result = session.connection().execute(
+        statement, [{"event_id": event_id, "contact_id": contact} for event_id, contact in plan.items()]
+    )
+    session.commit()
+    print(f"[bold green]Assigned {result.rowcount} of {len(events)} events.[/bold green]")
@@ -0,0 +1,64 @@
+"""Row-level scoping: the rows each role may read, as SQL predicates.
+
+    Admin, Gestion   every row
+    Commercial       the clients and contracts they manage, and the events of those contracts
+    Support          the events assigned to them, and the contracts and clients of those events
+
+`scope()` adds the predicate to any query on one of these models, so the
+database only returns (and the CLI only renders) the rows the user may see.
+Every predicate compares user IDs on indexed columns (see models.py).
+"""
+from sqlalchemy import false, select
+
+from epic_events.models import Client, Contract, Event
+
+UNSCOPED_ROLES = {1, 4}  # Admin, Gestion
+
+
+def _contracts_of_commercial(user_id: int):
+    return select(Contract.id).where(Contract.sales_contact_id == user_id)
+
+
+def _contracts_of_support(user_id: int):
+    return select(Event.contract_id).where(Event.support_contact_id == user_id)
+
+
+# model -> role_id -> predicate for the user with that ID
+RULES = {
+    Client: {
+        2: lambda user_id: Client.sales_contact_id == user_id,
+        3: lambda user_id: Client.id.in_(
+            select(Contract.client_id).where(Contract.id.in_(_contracts_of_support(user_id)))
+        ),
+    },
+    Contract: {
+        2: lambda user_id: Contract.sales_contact_id == user_id,
+        3: lambda user_id: Contract.id.in_(_contracts_of_support(user_id)),
+    },
+    Event: {
+        2: lambda user_id: Event.contract_id.in_(_contracts_of_commercial(user_id)),
+        3: lambda user_id: Event.support_contact_id == user_id,
+    },
+}
+
+
+def is_scoped(user) -> bool:
+    """Whether `user` only sees part of the rows."""
+    return user.role_id not in UNSCOPED_ROLES
+
+
+def predicate(user, model):
+    """SQL condition on `model` selecting the rows `user` may read, or None for every row.
+
+    Roles without a rule for the model read nothing.
+    """
+    if not is_scoped(user):
+        return None
+    rule = RULES[model].get(user.role_id)
+    return rule(user.id) if rule else false()
+
+
+def scope(query, user, model):
+    """`query` (an ORM Query or a select()) restricted to the rows of `model` that `user` may read."""
+    condition = predicate(user, model)
+    return query if condition is None else query.filter(condition)
@@ -0,0 +1,222 @@
+"""Full-text search over clients and events (SQLite FTS5).
+
+Two external-content FTS5 tables index the text columns without storing a
+second copy of them:
+
+    clients_fts: clients.full_name, company_name, email
+    events_fts:  events.location, notes
+
+Triggers on the source tables keep them in sync on every insert, update and
+delete, including the bulk Core inserts of `import`. `rebuild_search_index`
+re-reads the source tables, e.g. after rows were changed with triggers off.
+
+Hits are limited to the clients and events the user may read (see scoping.py).
+"""
+import re
+
+from rich.markup import escape
+from rich.table import Table
+from sqlalchemy import select, text
+
+from epic_events.console import get_console, print
+from epic_events.models import Client, Event
+from epic_events.scoping import predicate
+
+# (FTS table, source table, indexed columns)
+SEARCH_TABLES = [
+    ("clients_fts", "clients", ("full_name", "company_name", "email")),
+    ("events_fts", "events", ("location", "notes")),
+]
+
+DEFAULT_SEARCH_LIMIT = 20
+# Matches ranked per table. Ranking (bm25) costs time for every match, so for
+# words found in more rows than this, only the most recent ones are ranked
+# (ranking them all is 10-15x slower for common words, more than a LIKE scan)
+# and search says so.
+SEARCH_CANDIDATES = 500
+
+
+def _ddl(fts: str, source: str, columns: tuple):
+    """CREATE statements for one FTS table and the triggers that sync it."""
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{col}" for col in columns)
+    old = ", ".join(f"old.{col}" for col in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{source}', content_rowid='id', "
+        f"prefix='2 3', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {source} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {source} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {source} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+    ]
+
+
+def is_supported(engine) -> bool:
+    return engine.dialect.name == "sqlite"
+
+
+def install_search(engine):
+    """Create the FTS tables and triggers that are missing; return the tables created.
+
+    New tables are filled from the existing rows. Safe to run again.
+    """
+    if not is_supported(engine):
+        return []
+    created = []
+    with engine.begin() as conn:
+        for fts, source, columns in SEARCH_TABLES:
+            exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": fts}).first()
+            for statement in _ddl(fts, source, columns):
+                conn.exec_driver_sql(statement)
+            if not exists:
+                conn.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+                created.append(fts)
+    return created
+
+
+def rebuild_search_index(engine, tables=None):
+    """Re-index every row of the source tables (of the FTS `tables` only, if given)."""
+    with engine.begin() as conn:
+        for fts, _, _ in SEARCH_TABLES:
+            if tables is None or fts in tables:
+                conn.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def to_match_query(terms: str) -> str:
+    """Turn free text into an FTS5 query: every word must match, the last one as a prefix.
+
+    Words are quoted, so characters with a meaning in the FTS5 syntax
+    (-, :, *, parentheses...) are searched for literally.
+    """
+    words = ['"{}"'.format(word.replace('"', '""')) for word in terms.split()]
+    if words:
+        words[-1] += "*"
+    return " ".join(words)
+
+
+# Each FTS table returns its newest SEARCH_CANDIDATES matches (walking the
+# index backwards by rowid, which stops early) and ranks only those; the best
+# hits of both tables are then merged. rank is bm25(): lower is better.
+# {restrict} keeps the candidates to the rows the user may read. One more
+# candidate is read to tell whether some matches were left out (`truncated`,
+# set on every hit when either table was cut).
+_TABLE_HITS = """
+    SELECT '{entity}' AS entity, {source}.id AS id, {name} AS name, {detail} AS detail,
+           {text} AS text, hits.rank AS rank, hits.truncated AS truncated
+    FROM (
+        SELECT rowid, rank, truncated FROM (
+            SELECT rowid, rank, count(*) OVER () > :candidates AS truncated FROM (
+                SELECT rowid, rank FROM {fts} WHERE {fts} MATCH :query {restrict}
+                ORDER BY rowid DESC LIMIT :candidates + 1
+            )
+        ) ORDER BY rank LIMIT :limit
+    ) AS hits
+    JOIN {source} ON {source}.id = hits.rowid
+"""
+
+
+def search_sql(client_restrict: str = "", event_restrict: str = ""):
+    return text(
+        "SELECT entity, id, name, detail, text, rank, max(truncated) OVER () AS truncated FROM (SELECT * FROM ("
+        + _TABLE_HITS.format(entity="client", source="clients", fts="clients_fts", restrict=client_restrict,
+                             name="clients.full_name", detail="clients.company_name",
+                             text="clients.full_name || ' · ' || clients.company_name || ' · ' || clients.email")
+        + ") UNION ALL SELECT * FROM ("
+        + _TABLE_HITS.format(entity="event", source="events", fts="events_fts", restrict=event_restrict,
+                             name="events.location", detail="strftime('%d/%m/%Y', events.start_date)",
+                             text="events.location || coalesce(' · ' || events.notes, '')")
+        + ")) ORDER BY rank LIMIT :limit"
+    )
+
+
+SEARCH_SQL = search_sql()
+
+
+def _restrict(session, user, model) -> str:
+    """SQL limiting FTS rowids to the rows of `model` that `user` may read ('' for all)."""
+    condition = predicate(user, model)
+    if condition is None:
+        return ""
+    # The predicates only hold integer user IDs, so they can be inlined
+    ids = select(model.id).where(condition).compile(session.get_bind(), compile_kwargs={"literal_binds": True})
+    return f"AND rowid IN ({ids})"
+
+
+def scoped_search_sql(session, user):
+    """SEARCH_SQL restricted to the clients and events `user` may read."""
+    if user is None:
+        return SEARCH_SQL
+    client_restrict, event_restrict = _restrict(session, user, Client), _restrict(session, user, Event)
+    if not client_restrict and not event_restrict:
+        return SEARCH_SQL
+    return search_sql(client_restrict, event_restrict)
+
+
+def highlight(text: str, terms: str, width: int = 60) -> str:
+    """Rich markup for the part of `text` around the first searched word, with the words in bold.
+
+    Done here rather than with FTS5's snippet(), which would re-read the
+    match information of every hit.
+    """
+    words = [re.escape(word) for word in terms.split()]
+    pattern = re.compile(r"\b(?:" + "|".join(words) + r")\w*", re.IGNORECASE) if words else None
+    first = pattern.search(text) if pattern else None
+    start = max(first.start() - width // 3, 0) if first else 0
+    excerpt = text[start:start + width]
+    prefix, suffix = ("…" if start else ""), ("…" if start + width < len(text) else "")
+    if not pattern:
+        return escape(prefix + excerpt + suffix)
+    parts, last = [], 0
+    for match in pattern.finditer(excerpt):
+        parts.append(escape(excerpt[last:match.start()]))
+        parts.append(f"[bold yellow]{escape(match.group())}[/bold yellow]")
+        last = match.end()
+    parts.append(escape(excerpt[last:]))
+    return escape(prefix) + "".join(parts) + escape(suffix)
+
+
+def find(session, terms: str, limit: int = DEFAULT_SEARCH_LIMIT, user=None):
+    """Best matching clients and events `user` may read (all of them without a user),
+    as rows (entity, id, name, detail, text, rank, truncated).
+
+    `truncated` is true when only the newest SEARCH_CANDIDATES matches of a
+    table were ranked."""
+    query = to_match_query(terms)
+    if not query:
+        return []
+    return session.execute(scoped_search_sql(session, user), {"query": query, "limit": limit, "candidates": SEARCH_CANDIDATES}).all()
+
+
+def search(session, user, terms: str, limit: int = DEFAULT_SEARCH_LIMIT):
+    """Print the best matching clients and events the user may read."""
+    if not is_supported(session.get_bind()):
+        print("[bold red]Error: Search requires a SQLite database.[/bold red]")
+        return
+
+    try:
+        hits = find(session, terms, limit, user)
+    except Exception as e:
+        if "no such table" in str(e):
+            print("[bold red]Error: Search index missing. Run: python init_db.py[/bold red]")
+            return
+        raise
+
+    if not hits:
+        print(f"[bold yellow]No results for '{escape(terms)}'.[/bold yellow]")
+        return
+
+    table = Table(title=f"[bold blue]Search: {escape(terms)}[/bold blue]", show_header=True, header_style="bold magenta")
+    table.add_column("Type", style="cyan")
+    table.add_column("ID", justify="right", style="dim")
+    table.add_column("Name / Location", style="green")
+    table.add_column("Company / Date", style="blue")
+    table.add_column("Match")
+    for entity, id_, name, detail, text_, _, _ in hits:
+        table.add_row(entity.capitalize(), str(id_), escape(name), escape(detail), highlight(text_, terms))
+    get_console().print(table)
+    if hits[0].truncated:
+        print(f"[yellow]More than {SEARCH_CANDIDATES} clients or events match: only the "
+              f"{SEARCH_CANDIDATES} most recent of each were ranked. Add words to narrow the search.[/yellow]")
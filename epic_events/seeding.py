@@ -0,0 +1,275 @@
+"""Deterministic test data at any scale, for development and benchmarks.
+
+The data is generated in chunks of CHUNK_CLIENTS clients. Each chunk has its
+own Commercial and Support users, its own range of ids and its own random
+generator, seeded from the seed and the chunk number, so the same seed gives
+the same rows whatever the number of worker processes.
+
+Worker processes do all the per-row work: drawing the values, assigning the
+events and converting them to driver parameters (the bind processors of the
+column types). The main process only runs one executemany per table and
+chunk while the workers prepare the next chunks. Faker is only used to fill
+small pools of names, companies, cities and sentences per chunk; rows draw
+from those pools.
+
+Distributions:
+    - 1 to 3 contracts per client, SIGNED_RATE of them signed,
+    - 1 to 5 events per signed contract (unsigned contracts have none),
+    - events over the year after their contract, 2 to 8 hours long,
+    - ASSIGNED_RATE of the events given to a Support user of the chunk
+      without overlaps (see scheduling.plan_assignments), the others unassigned.
+
+Each client has room for MAX_CONTRACTS_PER_CLIENT contract ids and each
+contract for MAX_EVENTS_PER_CONTRACT event ids, so those ids have gaps.
+"""
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import make_url
+
+from epic_events.console import print
+from epic_events.models import Client, Contract, Event, User
+from epic_events.reports import SUMMARY_TRIGGERS, install_summary
+from epic_events.search import SEARCH_TABLES, install_search, rebuild_search_index
+
+DEFAULT_SEED = 42
+CHUNK_CLIENTS = 5000
+COMMERCIALS_PER_CHUNK = 10
+SUPPORTS_PER_CHUNK = 20
+MAX_CONTRACTS_PER_CLIENT = 3
+MAX_EVENTS_PER_CONTRACT = 5
+SIGNED_RATE = 0.7
+ASSIGNED_RATE = 0.8
+# Contracts are created during the year after SEED_START (fixed, so the
+# dates do not depend on the day the data is generated)
+SEED_START = datetime(2025, 1, 1)
+# Password of every generated user
+SEED_PASSWORD = "password"
+POOL_SIZE = 500
+
+# Columns of the generated rows, in the order of their tuples (the order of the tables)
+COLUMNS = {
+    Client: ("id", "full_name", "email", "phone", "company_name", "sales_contact_id", "created_at", "updated_at"),
+    Contract: ("id", "client_id", "sales_contact_id", "total_amount", "amount_due", "created_at", "updated_at",
+               "signed"),
+    Event: ("id", "contract_id", "support_contact_id", "start_date", "end_date", "location", "attendees", "notes"),
+}
+
+
+def _pools(faker) -> dict:
+    """Values the rows of a chunk are drawn from."""
+    names = [faker.name() for _ in range(POOL_SIZE)]
+    return {
+        "names": names,
+        "slugs": [_slug(name) for name in names],
+        "companies": [faker.company() for _ in range(POOL_SIZE)],
+        "domains": [faker.free_email_domain() for _ in range(20)],
+        "phones": [faker.phone_number() for _ in range(POOL_SIZE)],
+        "cities": [faker.city() for _ in range(POOL_SIZE)],
+        "notes": [faker.sentence(nb_words=12) for _ in range(POOL_SIZE)],
+    }
+
+
+def _slug(name: str) -> str:
+    return "".join(c for c in name.lower().replace(" ", ".") if c.isalnum() or c == ".")
+
+
+def _statement(model, dialect):
+    """(INSERT SQL, row converter) for `model`, in the parameter format of the driver."""
+    table = model.__table__
+    columns = COLUMNS[model]
+    compiled = insert(table).compile(dialect=dialect, column_keys=list(columns))
+    if compiled.positional and tuple(compiled.positiontup) != columns:
+        raise RuntimeError(f"Unexpected parameter order for {table.name}: {compiled.positiontup}")
+    processors = [(i, processor) for i, processor in enumerate(
+        table.c[name].type.dialect_impl(dialect).bind_processor(dialect) for name in columns
+    ) if processor]
+
+    def convert(row):
+        row = list(row)
+        for i, processor in processors:
+            if row[i] is not None:
+                row[i] = processor(row[i])
+        return tuple(row) if compiled.positional else dict(zip(columns, row))
+
+    return compiled.string, convert
+
+
+def generate_chunk(task):
+    """Rows of one chunk, as parameters of the database driver.
+
+    `task` is (database URL, seed, chunk number, number of clients, first
+    client/contract/event ids, Commercial user ids, Support user ids).
+    Returns an (INSERT SQL, rows) pair for clients, contracts and events.
+    """
+    from faker import Faker
+    from epic_events.scheduling import plan_assignments
+
+    url, seed, number, client_count, first_ids, commercial_ids, support_ids = task
+    first_client, first_contract, first_event = first_ids
+    rng = random.Random(f"{seed}-{number}")
+    faker = Faker(["fr_FR"])
+    faker.seed_instance(rng.random())
+    pools = _pools(faker)
+    names, slugs, companies, domains, phones, cities, notes = (
+        pools[key] for key in ("names", "slugs", "companies", "domains", "phones", "cities", "notes")
+    )
+
+    # random() scaled to a range is several times faster than randint()
+    draw = rng.random
+
+    def below(n):
+        return int(draw() * n)
+
+    clients, contracts, events = [], [], []
+    for k in range(client_count):
+        client_id = first_client + k
+        n = below(POOL_SIZE)
+        sales_contact_id = commercial_ids[below(len(commercial_ids))]
+        created = SEED_START + timedelta(minutes=below(365 * 24 * 60))
+        clients.append((
+            client_id, names[n], f"{slugs[n]}.{client_id}@{domains[below(len(domains))]}",
+            phones[below(POOL_SIZE)], companies[below(POOL_SIZE)], sales_contact_id, created, created,
+        ))
+        for j in range(1 + below(MAX_CONTRACTS_PER_CLIENT)):
+            slot = k * MAX_CONTRACTS_PER_CLIENT + j
+            contract_id = first_contract + slot
+            signed = draw() < SIGNED_RATE
+            total = 100_000 + below(4_900_000)  # cents
+            due = (0 if draw() < 0.5 else below(total)) if signed else total
+            signed_at = created + timedelta(minutes=below(60 * 24 * 60))
+            contracts.append((
+                contract_id, client_id, sales_contact_id, Decimal(total) / 100, Decimal(due) / 100,
+                signed_at, signed_at, signed,
+            ))
+            if not signed:
+                continue
+            day = signed_at.replace(minute=0, second=0, microsecond=0)
+            for m in range(1 + below(MAX_EVENTS_PER_CONTRACT)):
+                start = day + timedelta(days=1 + below(365), hours=below(11))
+                events.append([
+                    first_event + slot * MAX_EVENTS_PER_CONTRACT + m, contract_id, None,
+                    start, start + timedelta(hours=2 + below(7)), cities[below(POOL_SIZE)],
+                    10 + below(191), notes[below(POOL_SIZE)] if draw() < 0.5 else None,
+                ])
+
+    to_assign = sorted(
+        ((i, event[3], event[4]) for i, event in enumerate(events) if draw() < ASSIGNED_RATE),
+        key=lambda interval: (interval[1], interval[0]),
+    )
+    for i, contact in plan_assignments(to_assign, support_ids).items():
+        events[i][2] = contact
+
+    dialect = make_url(url).get_dialect()()
+    statements = []
+    for model, rows in ((Client, clients), (Contract, contracts), (Event, events)):
+        sql, convert = _statement(model, dialect)
+        statements.append((sql, [convert(row) for row in rows]))
+    return statements
+
+
+def _next_ids(conn) -> dict:
+    return {model: (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+            for model in (User, Client, Contract, Event)}
+
+
+def _create_users(conn, first_id: int, chunks: int):
+    """Commercial and Support users of every chunk; return their ids per chunk."""
+    hasher = User()
+    hasher.set_password(SEED_PASSWORD)  # hashed once: password hashing is slow on purpose
+
+    users, per_chunk = [], []
+    next_id = first_id
+    for _ in range(chunks):
+        ids = {}
+        for role_id, role, count in ((2, "commercial", COMMERCIALS_PER_CHUNK), (3, "support", SUPPORTS_PER_CHUNK)):
+            ids[role_id] = list(range(next_id, next_id + count))
+            users += [{"id": user_id, "full_name": f"Seed {role.capitalize()} {user_id}",
+                       "email": f"{role}{user_id}@seed.local", "role_id": role_id,
+                       "password_hash": hasher.password_hash} for user_id in ids[role_id]]
+            next_id += count
+        per_chunk.append((ids[2], ids[3]))
+    conn.execute(insert(User), users)
+    return per_chunk
+
+
+def _drop_triggers(engine):
+    """Drop the search and summary triggers (SQLite), which would otherwise run for every row inserted."""
+    names = [f"{fts}_{suffix}" for fts, _, _ in SEARCH_TABLES for suffix in ("ai", "ad", "au")]
+    with engine.begin() as conn:
+        for name in names + list(SUMMARY_TRIGGERS):
+            conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def _restore_triggers(engine):
+    """Recreate the triggers and rebuild, once, what they maintain."""
+    created = install_search(engine)  # fills the FTS tables it creates
+    existing = [fts for fts, _, _ in SEARCH_TABLES if fts not in created]
+    if existing:
+        rebuild_search_index(engine, existing)
+    install_summary(engine)  # rebuilds the summary
+
+
+def seed_database(engine, clients: int, seed: int = DEFAULT_SEED, workers: int = None):
+    """Add `clients` clients with their contracts and events to the database.
+
+    Returns the number of (clients, contracts, events) inserted.
+    """
+    chunks = -(-clients // CHUNK_CLIENTS)
+    start = time.perf_counter()
+
+    with engine.begin() as conn:
+        next_ids = _next_ids(conn)
+        users = _create_users(conn, next_ids[User], chunks)
+    url = engine.url.render_as_string(hide_password=False)
+    tasks = []
+    for number, (commercial_ids, support_ids) in enumerate(users):
+        offset = number * CHUNK_CLIENTS
+        first_ids = (
+            next_ids[Client] + offset,
+            next_ids[Contract] + offset * MAX_CONTRACTS_PER_CLIENT,
+            next_ids[Event] + offset * MAX_CONTRACTS_PER_CLIENT * MAX_EVENTS_PER_CONTRACT,
+        )
+        tasks.append((url, seed, number, min(CHUNK_CLIENTS, clients - offset), first_ids,
+                      commercial_ids, support_ids))
+
+    if engine.dialect.name == "sqlite":
+        _drop_triggers(engine)
+    workers = workers or os.cpu_count() or 1
+    pool = None
+    if workers > 1 and chunks > 1:
+        import multiprocessing
+        pool = multiprocessing.Pool(min(workers, chunks))
+        results = pool.imap(generate_chunk, tasks)
+    else:
+        results = map(generate_chunk, tasks)
+
+    totals = [0, 0, 0]
+    try:
+        for number, statements in enumerate(results, start=1):
+            with engine.begin() as conn:
+                for i, (sql, rows) in enumerate(statements):
+                    if rows:
+                        conn.exec_driver_sql(sql, rows)
+                    totals[i] += len(rows)
+            print(f"Chunk {number}/{chunks}: {totals[0]} clients, {totals[1]} contracts, {totals[2]} events "
+                  f"({time.perf_counter() - start:.1f} s)")
+    finally:
+        if pool is not None:
+            pool.terminate()
+        if engine.dialect.name == "sqlite":
+            _restore_triggers(engine)
+
+    if engine.dialect.name == "postgresql":
+        # Rows were inserted with explicit ids: move the sequences past them
+        with engine.begin() as conn:
+            for model in (User, Client, Contract, Event):
+                table = model.__tablename__
+                conn.exec_driver_sql(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+                )
+    return tuple(totals)
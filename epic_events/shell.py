@@ -0,0 +1,127 @@
+"""Interactive shell: run CLI commands in one long-lived process.
+
+Every command typed at the prompt goes through the same Typer app as the
+command line, but the imports, the engine and its connection pool, Sentry,
+the decoded token, the validated identity and the role names stay loaded
+between commands, so each one costs little more than its queries.
+"""
+import os
+import shlex
+
+import click
+import typer
+
+from epic_events.console import print
+
+HISTORY_FILE = os.path.expanduser("~/.epic_events/history")
+HISTORY_LENGTH = 1000
+PROMPT = "epic-events> "
+EXIT_COMMANDS = {"exit", "quit"}
+
+
+def _completer(command: click.Group):
+    """Readline completer for command names, then the options of that command."""
+    import readline
+
+    def complete(text: str, state: int):
+        words = readline.get_line_buffer()[:readline.get_begidx()].split()
+        if not words:
+            candidates = sorted([*command.commands, *EXIT_COMMANDS, "help"])
+        elif words[0] in command.commands:
+            subcommand = command.commands[words[0]]
+            candidates = sorted(opt for param in subcommand.params for opt in param.opts if opt.startswith("-"))
+            candidates.append("--help")
+        else:
+            candidates = []
+        matches = [candidate for candidate in candidates if candidate.startswith(text)]
+        return matches[state] if state < len(matches) else None
+
+    return complete
+
+
+def _setup_readline(command: click.Group):
+    """Load the history and enable tab completion; return False if readline is unavailable."""
+    try:
+        import readline
+    except ImportError:  # e.g. Windows without pyreadline
+        return False
+
+    os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
+    try:
+        readline.read_history_file(HISTORY_FILE)
+    except (FileNotFoundError, OSError):
+        pass
+    readline.set_history_length(HISTORY_LENGTH)
+    readline.set_completer_delims(" \t\n")
+    readline.set_completer(_completer(command))
+    # libedit (macOS) and GNU readline use different syntax for the same binding
+    if "libedit" in (readline.__doc__ or ""):
+        readline.parse_and_bind("bind ^I rl_complete")
+    else:
+        readline.parse_and_bind("tab: complete")
+    return True
+
+
+def run_command(command: click.Group, args: list) -> int:
+    """Run one command line through the CLI without letting it exit the process.
+
+    Returns the exit code the command would have had on its own.
+    """
+    try:
+        result = command.main(args, prog_name="epic-events", standalone_mode=False)
+        # --help and typer.Exit return their exit code instead of raising
+        return result if isinstance(result, int) else 0
+    except click.exceptions.Abort:
+        print("[bold yellow]Aborted.[/bold yellow]")
+        return 1
+    except click.ClickException as e:
+        e.show()
+        return e.exit_code
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else 1
+    except Exception as e:
+        # The command already reported it to Sentry if it wanted to: keep the shell alive
+        print(f"[bold red]Error: {e}[/bold red]")
+        return 1
+
+
+def run_shell(app: typer.Typer):
+    """Read commands until exit/quit or Ctrl-D."""
+    from epic_events.config import get_engine
+
+    command = typer.main.get_command(app)
+    history = _setup_readline(command)
+    # Connect (and initialize Sentry) now rather than on the first command
+    get_engine().connect().close()
+
+    print("[bold green]Epic Events shell.[/bold green] Type 'help' for the commands, 'exit' to quit.")
+    try:
+        while True:
+            try:
+                line = input(PROMPT)
+            except KeyboardInterrupt:
+                print()
+                continue
+            except EOFError:
+                print()
+                break
+
+            try:
+                args = shlex.split(line)
+            except ValueError as e:
+                print(f"[bold red]Error: {e}[/bold red]")
+                continue
+            if not args:
+                continue
+            if args[0] in EXIT_COMMANDS:
+                break
+            if args[0] == "help":
+                args = args[1:] + ["--help"]
+            if args[0] == "shell":
+                print("[bold yellow]Already in the shell.[/bold yellow]")
+                continue
+            run_command(command, args)
+    finally:
+        if history:
+            import readline
+            readline.write_history_file(HISTORY_FILE)
@@ -0,0 +1,80 @@
+"""Sentry error tracking and performance monitoring.
+
+Sampling rates come from config.py (per environment, overridable from the
+environment). With TELEMETRY=off no Sentry client or integration is installed
+and sentry_sdk is never imported: the helpers below then do nothing.
+"""
+from contextlib import nullcontext
+
+from epic_events import config
+
+_initialized = False
+
+
+def init_telemetry():
+    """Initialize Sentry once, on the first command that needs it."""
+    global _initialized
+    if _initialized:
+        return
+    _initialized = True
+    if not config.TELEMETRY_ENABLED:
+        return
+
+    import sentry_sdk
+
+    # The SQLAlchemy integration hooks every statement, only install it when traces are sampled
+    integrations = []
+    if config.SENTRY_TRACES_SAMPLE_RATE > 0:
+        from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+        integrations.append(SqlalchemyIntegration())
+
+    # Sentry configuration
+    sentry_sdk.init(
+        dsn=config.SENTRY_DSN,
+        traces_sample_rate=config.SENTRY_TRACES_SAMPLE_RATE,
+        integrations=integrations,
+        environment=config.ENVIRONMENT,
+        send_default_pii=True,
+        _experiments={
+            "profiles_sample_rate": config.SENTRY_PROFILES_SAMPLE_RATE,
+        }
+    )
+
+    # Set default tags after initialization
+    sentry_sdk.set_tag("application", "epic_events")
+    sentry_sdk.set_tag("version", "1.0.0")
+
+
+def capture_message(message: str, level: str = None, **kwargs):
+    """Send a message to Sentry (no-op when telemetry is off)."""
+    if not config.TELEMETRY_ENABLED:
+        return None
+    init_telemetry()
+    import sentry_sdk
+    return sentry_sdk.capture_message(message, level=level, **kwargs)
+
+
+def capture_exception(error: BaseException = None):
+    """Send an exception to Sentry (no-op when telemetry is off)."""
+    if not config.TELEMETRY_ENABLED:
+        return None
+    init_telemetry()
+    import sentry_sdk
+    return sentry_sdk.capture_exception(error)
+
+
+def start_transaction(**kwargs):
+    """Context manager for a Sentry transaction (does nothing when telemetry is off)."""
+    if not config.TELEMETRY_ENABLED:
+        return nullcontext()
+    init_telemetry()
+    import sentry_sdk
+    return sentry_sdk.start_transaction(**kwargs)
+
+
+def start_span(**kwargs):
+    """Context manager for a Sentry span (does nothing when telemetry is off)."""
+    if not config.TELEMETRY_ENABLED:
+        return nullcontext()
+    import sentry_sdk
+    return sentry_sdk.start_span(**kwargs)
@@ -0,0 +1,525 @@
+"""Bulk import and export of clients, contracts and events as CSV or JSONL.
+
+Import: rows are streamed from the file, validated, and inserted in batches
+with one executemany INSERT and one commit per batch. Foreign keys are checked
+with a single IN (...) query per batch rather than one lookup per row, and
+events that would overlap another event of their support contact are
+refused like add_event does. Rows that cannot be imported are written to a
+side file with the reason.
+
+Export: plain columns (no ORM objects) are streamed from a server-side cursor
+and written as they arrive, so memory use does not depend on the table size.
+"""
+import csv
+import json
+import os
+import sys
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from epic_events.config import AMOUNT_PLACES, DEFAULT_BATCH_SIZE, MAX_AMOUNT
+from epic_events.console import get_console, print
+from epic_events.models import Client, Contract, Event, User
+from epic_events.scheduling import Timeline
+from epic_events.scoping import scope
+
+MODELS = {"clients": Client, "contracts": Contract, "events": Event}
+
+# Same rules as add_client / add_contract / add_event
+IMPORT_ROLES = {
+    "clients": [1, 2],  # Admin and Commercial
+    "contracts": [1, 2],  # Admin and Commercial
+    "events": [1, 3, 4],  # Admin, Support and Gestion
+}
+
+
+def detect_format(path: str, file_format: str = None) -> str:
+    """Return 'csv' or 'jsonl', from the explicit format or the file extension."""
+    if file_format:
+        file_format = file_format.lower()
+    else:
+        extension = os.path.splitext(path)[1].lower()
+        file_format = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}.get(extension)
+    if file_format not in ("csv", "jsonl"):
+        raise ValueError("Unknown file format, use --format csv or --format jsonl")
+    return file_format
+
+
+def _read_rows(path: str, file_format: str):
+    """Yield (row dict or None if unparseable, raw record) for each record in the file."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if file_format == "csv":
+            for row in csv.DictReader(f):
+                yield row, row
+        else:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    yield None, line.rstrip("\n")
+                    continue
+                yield (row if isinstance(row, dict) else None), line.rstrip("\n")
+
+
+# Field parsers, raising ValueError with a readable message
+
+def _text(row, field, required=True):
+    value = row.get(field)
+    value = str(value).strip() if value is not None else ""
+    if not value:
+        if required:
+            raise ValueError(f"missing {field}")
+        return None
+    return value
+
+
+def _int(row, field, required=True):
+    value = _text(row, field, required)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"invalid {field}: {value!r}")
+
+
+def _amount(row, field):
+    value = _text(row, field)
+    try:
+        amount = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"invalid {field}: {value!r}")
+    if not amount.is_finite():
+        raise ValueError(f"invalid {field}: {value!r}")
+    if abs(amount) > MAX_AMOUNT:
+        raise ValueError(f"invalid {field}: {value!r} is too large (at most {MAX_AMOUNT})")
+    if amount != round(amount, AMOUNT_PLACES):
+        raise ValueError(f"invalid {field}: {value!r} has more than {AMOUNT_PLACES} decimal places")
+    return amount
+
+
+def _bool(row, field):
+    value = row.get(field)
+    if isinstance(value, bool):
+        return value
+    value = _text(row, field, required=False)
+    if value is None:
+        return False
+    if value.lower() in ("1", "true", "yes", "y", "signed"):
+        return True
+    if value.lower() in ("0", "false", "no", "n", "unsigned"):
+        return False
+    raise ValueError(f"invalid {field}: {value!r}")
+
+
+def _datetime(row, field):
+    value = _text(row, field)
+    for parse in (datetime.fromisoformat, lambda v: datetime.strptime(v, "%d/%m/%Y %H:%M"), lambda v: datetime.strptime(v, "%d/%m/%Y")):
+        try:
+            return parse(value)
+        except ValueError:
+            pass
+    raise ValueError(f"invalid {field}: {value!r} (use YYYY-MM-DD HH:MM or DD/MM/YYYY HH:MM)")
+
+
+def _parse_client(row, user):
+    values = {
+        "full_name": _text(row, "full_name"),
+        "email": _text(row, "email"),
+        "phone": _text(row, "phone"),
+        "company_name": _text(row, "company_name"),
+        "sales_contact_id": user.id,
+    }
+    if user.role_id == 1:  # Admin can import clients for another Commercial
+        values["sales_contact_id"] = _int(row, "sales_contact_id", required=False) or user.id
+    return values
+
+
+def _parse_contract(row, user):
+    values = {
+        "client_id": _int(row, "client_id"),
+        "total_amount": _amount(row, "total_amount"),
+        "amount_due": _amount(row, "amount_due"),
+        "signed": _bool(row, "signed"),
+        "sales_contact_id": user.id,
+    }
+    if user.role_id == 1:  # Admin can import contracts for another Commercial
+        values["sales_contact_id"] = _int(row, "sales_contact_id", required=False) or user.id
+    return values
+
+
+def _parse_event(row, user):
+    values = {
+        "contract_id": _int(row, "contract_id"),
+        "support_contact_id": _int(row, "support_contact_id", required=False),
+        "start_date": _datetime(row, "start_date"),
+        "end_date": _datetime(row, "end_date"),
+        "location": _text(row, "location"),
+        "attendees": _int(row, "attendees"),
+        "notes": _text(row, "notes", required=False),
+    }
+    if values["start_date"] >= values["end_date"]:
+        raise ValueError("start date must be before end date")
+    return values
+
+
+PARSERS = {"clients": _parse_client, "contracts": _parse_contract, "events": _parse_event}
+
+
+def _existing(session: Session, column, values):
+    """Return the subset of `values` present in `column`, with one IN query."""
+    if not values:
+        return set()
+    return set(session.execute(select(column).where(column.in_(values))).scalars())
+
+
+def _check_schedules(session: Session, batch, booked: dict):
+    """Split parsed events into (valid rows, [(record, error)]) by the overlap rule of add_event.
+
+    A row is rejected when it overlaps an event of its support contact in the
+    database, or a row accepted earlier in the file. `booked` maps each support
+    contact to the Timeline of the rows accepted so far; it is shared by the
+    batches of an import, which may not be committed yet.
+    """
+    assigned = [values for _, values in batch if values["support_contact_id"] is not None]
+    if not assigned:
+        return batch, []
+
+    # Events of these support contacts during the batch, with one range query
+    existing = {}
+    for event_id, contact, start, end in session.execute(
+        select(Event.id, Event.support_contact_id, Event.start_date, Event.end_date).where(
+            Event.support_contact_id.in_({values["support_contact_id"] for values in assigned}),
+            Event.start_date < max(values["end_date"] for values in assigned),
+            Event.end_date > min(values["start_date"] for values in assigned),
+        )
+    ):
+        existing.setdefault(contact, []).append((start, end, f"event {event_id}"))
+    timelines = {contact: Timeline(intervals) for contact, intervals in existing.items()}
+
+    checked, rejected = [], []
+    for record, values in batch:
+        contact, start, end = values["support_contact_id"], values["start_date"], values["end_date"]
+        if contact is None:
+            checked.append((record, values))
+            continue
+        overlap = timelines[contact].overlap(start, end) if contact in timelines else None
+        if overlap is None and contact in booked:
+            overlap = booked[contact].overlap(start, end)
+        if overlap is not None:
+            rejected.append((record, f"overlaps {overlap} of support contact {contact}"))
+            continue
+        booked.setdefault(contact, Timeline()).add(start, end, f"line {record[0]}")
+        checked.append((record, values))
+    return checked, rejected
+
+
+def _check_references(session: Session, entity: str, batch, seen_emails: set, booked: dict):
+    """Split a parsed batch into (valid rows, [(record, error)]) using set-based lookups."""
+    rejected = []
+
+    if entity in ("clients", "contracts"):
+        known_users = _existing(session, User.id, {values["sales_contact_id"] for _, values in batch})
+        checked = []
+        for record, values in batch:
+            if values["sales_contact_id"] not in known_users:
+                rejected.append((record, f"unknown sales_contact_id {values['sales_contact_id']}"))
+            else:
+                checked.append((record, values))
+        batch = checked
+
+    if entity == "clients":
+        taken = _existing(session, Client.email, {values["email"] for _, values in batch})
+        checked = []
+        for record, values in batch:
+            if values["email"] in taken or values["email"] in seen_emails:
+                rejected.append((record, f"duplicate email {values['email']}"))
+            else:
+                seen_emails.add(values["email"])
+                checked.append((record, values))
+        batch = checked
+
+    elif entity == "contracts":
+        known_clients = _existing(session, Client.id, {values["client_id"] for _, values in batch})
+        checked = []
+        for record, values in batch:
+            if values["client_id"] not in known_clients:
+                rejected.append((record, f"unknown client_id {values['client_id']}"))
+            else:
+                checked.append((record, values))
+        batch = checked
+
+    elif entity == "events":
+        support_ids = {values["support_contact_id"] for _, values in batch} - {None}
+        support_users = set(session.execute(
+            select(User.id).where(User.id.in_(support_ids), User.role_id == 3)
+        ).scalars()) if support_ids else set()
+        contract_ids = {values["contract_id"] for _, values in batch}
+        signed = dict(session.execute(
+            select(Contract.id, Contract.signed).where(Contract.id.in_(contract_ids))
+        ).all()) if contract_ids else {}
+        checked = []
+        for record, values in batch:
+            if values["contract_id"] not in signed:
+                rejected.append((record, f"unknown contract_id {values['contract_id']}"))
+            elif not signed[values["contract_id"]]:
+                rejected.append((record, f"contract {values['contract_id']} is not signed"))
+            elif values["support_contact_id"] is not None and values["support_contact_id"] not in support_users:
+                rejected.append((record, f"support_contact_id {values['support_contact_id']} is not a Support user"))
+            else:
+                checked.append((record, values))
+        batch, overlapping = _check_schedules(session, checked, booked)
+        rejected += overlapping
+
+    return batch, rejected
+
+
+def _insert_batch(session: Session, model, batch):
+    """Insert a batch with one executemany; isolate failing rows if the batch is refused.
+
+    Returns (number inserted, [(record, error)]).
+    """
+    if not batch:
+        return 0, []
+    try:
+        session.execute(insert(model), [values for _, values in batch])
+        session.commit()
+        return len(batch), []
+    except IntegrityError:
+        session.rollback()
+
+    # Retry row by row so one bad row doesn't reject the whole batch
+    inserted, rejected = 0, []
+    for record, values in batch:
+        try:
+            with session.begin_nested():
+                session.execute(insert(model), [values])
+            inserted += 1
+        except IntegrityError as e:
+            rejected.append((record, f"rejected by database: {e.orig}"))
+    session.commit()
+    return inserted, rejected
+
+
+class RejectsWriter:
+    """Append rejected records to a JSONL side file, created on first use.
+
+    The rejects of each batch (parse errors and check failures) are written
+    together in line order as the batch finishes. The batches of an async
+    import may finish out of order, so their groups can interleave.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._file = None
+
+    def write_batch(self, rejected):
+        """Write the (record, error) pairs rejected from one batch, sorted by line."""
+        if not rejected:
+            return
+        if self._file is None:
+            self._file = open(self.path, "w", encoding="utf-8")
+        for (line_number, raw), error in sorted(rejected, key=lambda reject: reject[0][0]):
+            self._file.write(json.dumps({"line": line_number, "error": error, "row": raw}, default=str) + "\n")
+        self.count += len(rejected)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def start_import(user: User, entity: str, path: str, file_format: str = None):
+    """Check that `user` may import `entity` from `path`; return the file format, or None after printing why not."""
+    if entity not in MODELS:
+        print(f"[bold red]Error: Unknown entity '{entity}', use clients, contracts or events.[/bold red]")
+        return None
+
+    # Permission check, once for the whole file
+    if user.role_id not in IMPORT_ROLES[entity]:
+        print(f"[bold red]Error: You do not have permission to import {entity}.[/bold red]")
+        return None
+
+    try:
+        file_format = detect_format(path, file_format)
+    except ValueError as e:
+        print(f"[bold red]Error: {e}[/bold red]")
+        return None
+    if not os.path.exists(path):
+        print(f"[bold red]Error: File '{path}' not found.[/bold red]")
+        return None
+    return file_format
+
+
+def parsed_batches(user: User, entity: str, path: str, file_format: str,
+                   batch_size: int = DEFAULT_BATCH_SIZE):
+    """Yield (batch, unparsed) for each run of `batch_size` records of the file.
+
+    `batch` lists the (record, values) parsed, `unparsed` the (record, error)
+    of the records that could not be.
+    """
+    parse = PARSERS[entity]
+    batch, unparsed = [], []
+    # Line 1 is the CSV header
+    first_line = 2 if file_format == "csv" else 1
+    for line_number, (row, raw) in enumerate(_read_rows(path, file_format), start=first_line):
+        record = (line_number, raw)
+        if row is None:
+            unparsed.append((record, "not a JSON object"))
+        else:
+            try:
+                batch.append((record, parse(row, user)))
+            except ValueError as e:
+                unparsed.append((record, str(e)))
+        if len(batch) + len(unparsed) >= batch_size:
+            yield batch, unparsed
+            batch, unparsed = [], []
+    if batch or unparsed:
+        yield batch, unparsed
+
+
+def import_batch(session: Session, entity: str, batch, seen_emails: set, booked: dict):
+    """Check the references of a parsed batch and insert the valid rows.
+
+    `seen_emails` and `booked` (see _check_schedules) carry what the earlier
+    batches of the file accepted. Returns (number inserted, [(record, error)]).
+    """
+    if not batch:  # none of its records could be parsed
+        return 0, []
+    valid, rejected = _check_references(session, entity, batch, seen_emails, booked)
+    inserted, failed = _insert_batch(session, MODELS[entity], valid)
+    return inserted, rejected + failed
+
+
+def print_import_summary(entity: str, imported: int, rejects: RejectsWriter):
+    print(f"[bold green]Imported {imported} {entity}.[/bold green]")
+    if rejects.count:
+        print(f"[bold yellow]{rejects.count} rows rejected, see {rejects.path}[/bold yellow]")
+
+
+def import_rows(session: Session, user: User, entity: str, path: str,
+                file_format: str = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                rejects_path: str = None):
+    """Import clients, contracts or events from a CSV/JSONL file in batches.
+
+    Returns (imported, rejected) counts, or None if the import could not start.
+    """
+    file_format = start_import(user, entity, path, file_format)
+    if file_format is None:
+        return None
+
+    rejects = RejectsWriter(rejects_path or f"{path}.rejects.jsonl")
+    seen_emails, booked = set(), {}
+    imported = 0
+    try:
+        for batch, unparsed in parsed_batches(user, entity, path, file_format, batch_size):
+            inserted, rejected = import_batch(session, entity, batch, seen_emails, booked)
+            imported += inserted
+            rejects.write_batch(unparsed + rejected)
+    finally:
+        rejects.close()
+
+    print_import_summary(entity, imported, rejects)
+    return imported, rejects.count
+
+
+# Columns written by export, in order; the names match what import expects
+EXPORT_COLUMNS = {
+    "clients": [Client.id, Client.full_name, Client.email, Client.phone, Client.company_name,
+                Client.sales_contact_id, Client.created_at, Client.updated_at],
+    "contracts": [Contract.id, Contract.client_id, Contract.sales_contact_id, Contract.total_amount,
+                  Contract.amount_due, Contract.signed, Contract.created_at, Contract.updated_at],
+    "events": [Event.id, Event.contract_id, Event.support_contact_id, Event.start_date, Event.end_date,
+               Event.location, Event.attendees, Event.notes],
+}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    # Anything else, including Decimal amounts: a string such as "1234.50",
+    # which import reads back exactly (a float could change the cents)
+    return str(value)
+
+
+def _write_csv(result, out):
+    writer = csv.writer(out)
+    writer.writerow(result.keys())
+    count = 0
+    for rows in result.partitions():
+        writer.writerows(rows)
+        count += len(rows)
+    return count
+
+
+def _write_jsonl(result, out):
+    names = list(result.keys())
+    count = 0
+    for rows in result.partitions():
+        out.writelines(json.dumps(dict(zip(names, row)), default=_json_default) + "\n" for row in rows)
+        count += len(rows)
+    return count
+
+
+def _exportable(entity: str) -> bool:
+    """Whether `entity` can be exported; prints why not to stderr."""
+    if entity not in EXPORT_COLUMNS:
+        get_console(stderr=True).print(f"[bold red]Error: Unknown entity '{entity}', use clients, contracts or events.[/bold red]")
+        return False
+    return True
+
+
+def export_rows(session: Session, user: User, entity: str, out,
+                file_format: str = "csv", batch_size: int = DEFAULT_BATCH_SIZE):
+    """Stream every row of `entity` that `user` may read to the open text file `out` as CSV or JSONL.
+
+    Returns the number of rows written, or None if the export could not start.
+    """
+    if not _exportable(entity):
+        return None
+
+    columns = EXPORT_COLUMNS[entity]
+    statement = scope(select(*columns), user, MODELS[entity]).order_by(columns[0]).execution_options(yield_per=batch_size)
+    result = session.execute(statement)
+    try:
+        if file_format == "jsonl":
+            return _write_jsonl(result, out)
+        return _write_csv(result, out)
+    finally:
+        result.close()
+
+
+def export_to_path(session: Session, user: User, entity: str, output: str = "-",
+                   file_format: str = None, batch_size: int = DEFAULT_BATCH_SIZE):
+    """Export `entity` to a file, or to stdout when `output` is '-'.
+
+    Status messages go to stderr so stdout can be piped into other tools.
+    """
+    # Before opening `output`, which would truncate an existing file
+    if not _exportable(entity):
+        return None
+
+    console = get_console(stderr=True)
+    try:
+        if file_format or output != "-":
+            file_format = detect_format(output, file_format)
+        else:
+            file_format = "csv"
+    except ValueError as e:
+        console.print(f"[bold red]Error: {e}[/bold red]")
+        return None
+
+    if output == "-":
+        return export_rows(session, user, entity, sys.stdout, file_format, batch_size)
+
+    with open(output, "w", newline="", encoding="utf-8") as out:
+        count = export_rows(session, user, entity, out, file_format, batch_size)
+    if count is not None:
+        console.print(f"[bold green]Exported {count} {entity} to {output}.[/bold green]")
+    return count
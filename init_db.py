@@ -1,6 +1,7 @@
 from epic_events.config import engine, Base, SessionLocal
 from epic_events.models import Role, User
 from epic_events.crud import create_user, get_db_session
+from epic_events.migrations import upgrade_database
 
 def init_database():
     """Initialize database with tables and required initial data."""
@@ -8,6 +9,9 @@ def init_database():
     Base.metadata.create_all(engine)
     print("[bold green]Database tables created successfully![/bold green]")
 
+    # Apply schema changes that create_all does not make to existing tables
+    upgrade_database(engine)
+
     # Initialize session
     session = get_db_session(SessionLocal)
 
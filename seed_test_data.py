@@ -1,91 +1,25 @@
-from datetime import datetime, timedelta
-from faker import Faker
-import random
-from epic_events.config import SessionLocal
-from epic_events.crud import (
-    add_client, get_db_session, authenticate_user,
-    add_contract, add_event
-)
+"""Populate the database with generated test data (see epic_events/seeding.py).
 
-fake = Faker(['fr_FR'])  # French locale
+Same as `epic-events seed`, without logging in, for a fresh development database:
 
-def generate_random_client():
-    """Generate random client data"""
-    return {
-        'full_name': fake.name(),
-        'email': fake.email(),
-        'phone': fake.phone_number(),
-        'company_name': fake.company()
-    }
+    python seed_test_data.py [--clients 1000] [--seed 42] [--workers N]
+"""
+import argparse
 
-def generate_random_contract():
-    """Generate random contract data"""
-    total = round(random.uniform(1000.0, 10000.0), 2)
-    return {
-        'total_amount': total,
-        'amount_due': round(random.uniform(0, total), 2),
-        'signed': random.choice([True, False])
-    }
+from epic_events.config import engine
+from epic_events.seeding import DEFAULT_SEED, seed_database
 
-def generate_random_event():
-    """Generate random event data"""
-    start = fake.date_time_between(start_date='+1d', end_date='+1y')
-    return {
-        'support_contact': fake.name(),
-        'start_date': start,
-        'end_date': start + timedelta(hours=random.randint(2, 8)),
-        'location': fake.city(),
-        'attendees': random.randint(10, 200),
-        'notes': fake.text(max_nb_chars=200)
-    }
 
-def seed_test_data(num_clients=5):
-    """Seed the database with random test data."""
-    session = get_db_session(SessionLocal)
-    
-    try:
-        # Login as admin
-        user = authenticate_user(session, "email", "password")  # Your current admin credentials
-        if not user:
-            print("[bold red]Error: Please run init_db.py first to create admin user[/bold red]")
-            return
+def main():
+    parser = argparse.ArgumentParser(description="Seed the database with test data")
+    parser.add_argument("--clients", type=int, default=1000, help="Clients to add (about 2 contracts and 4 events each)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Random seed: the same seed gives the same data")
+    parser.add_argument("--workers", type=int, default=None, help="Processes generating the data (default: one per CPU)")
+    args = parser.parse_args()
 
-        # Add multiple test clients
-        for _ in range(num_clients):
-            client_data = generate_random_client()
-            add_client(
-                session=session,
-                user=user,
-                **client_data
-            )
-            
-            # Add 1-3 contracts per client
-            for _ in range(random.randint(1, 3)):
-                contract_data = generate_random_contract()
-                add_contract(
-                    session=session,
-                    user=user,
-                    client_id=_ + 1,
-                    **contract_data
-                )
-                
-                # Add 1-5 events per contract
-                for _ in range(random.randint(1, 5)):
-                    event_data = generate_random_event()
-                    add_event(
-                        session=session,
-                        user=user,
-                        contract_id=_ + 1,
-                        **event_data
-                    )
+    clients, contracts, events = seed_database(engine, args.clients, seed=args.seed, workers=args.workers)
+    print(f"Added {clients} clients, {contracts} contracts and {events} events.")
 
-        print("[bold green]Random test data seeded successfully![/bold green]")
-
-    except Exception as e:
-        print(f"[bold red]Error seeding test data: {str(e)}[/bold red]")
-        session.rollback()
-    finally:
-        session.close()
 
 if __name__ == "__main__":
-    seed_test_data()
\ No newline at end of file
+    main()